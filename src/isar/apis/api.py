@@ -12,10 +12,17 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.routing import APIRouter
 from pydantic import AnyHttpUrl
 
-from isar.apis.models.models import ControlMissionResponse, StartMissionResponse
+from isar.apis.inspections.inspection_controller import InspectionController
+from isar.apis.models.models import (
+    ControlMissionResponse,
+    InspectionResponse,
+    StartMissionResponse,
+    UploadStatusResponse,
+)
 from isar.apis.robot_control.robot_controller import RobotController
 from isar.apis.schedule.scheduling_controller import SchedulingController
 from isar.apis.security.authentication import Authenticator
+from isar.apis.uploads.upload_controller import UploadController
 from isar.config.settings import settings
 from robot_interface.telemetry.mqtt_client import MqttClientInterface
 from robot_interface.telemetry.payloads import StartUpMessagePayload
@@ -27,12 +34,16 @@ class API:
         authenticator: Authenticator,
         scheduling_controller: SchedulingController,
         robot_controller: RobotController,
+        inspection_controller: InspectionController,
+        upload_controller: UploadController,
         mqtt_publisher: MqttClientInterface,
         port: int = settings.API_PORT,
     ) -> None:
         self.authenticator: Authenticator = authenticator
         self.scheduling_controller: SchedulingController = scheduling_controller
         self.robot_controller: RobotController = robot_controller
+        self.inspection_controller: InspectionController = inspection_controller
+        self.upload_controller: UploadController = upload_controller
         self.host: str = "0.0.0.0"  # Locking uvicorn to use 0.0.0.0
         self.port: int = port
         self.mqtt_publisher: MqttClientInterface = mqtt_publisher
@@ -100,6 +111,10 @@ class API:
 
         app.include_router(router=self._create_media_control_router())
 
+        app.include_router(router=self._create_inspection_router())
+
+        app.include_router(router=self._create_upload_router())
+
         return app
 
     def _create_scheduler_router(self) -> APIRouter:
@@ -342,6 +357,77 @@ class API:
 
         return router
 
+    def _create_inspection_router(self) -> APIRouter:
+        router: APIRouter = APIRouter(tags=["Inspections"])
+
+        authentication_dependency: Any = Security(self.authenticator.get_scheme())
+
+        router.add_api_route(
+            path="/inspections",
+            endpoint=self.inspection_controller.get_inspections,
+            methods=["GET"],
+            dependencies=[authentication_dependency],
+            summary="Query the inspections in local storage, newest first",
+            responses={
+                HTTPStatus.OK.value: {
+                    "description": "Inspections matching the query",
+                    "model": list[InspectionResponse],
+                },
+                HTTPStatus.NOT_FOUND.value: {
+                    "description": "Local storage is not enabled",
+                },
+            },
+        )
+        router.add_api_route(
+            path="/inspections/{inspection_id}/data",
+            endpoint=self.inspection_controller.get_inspection_data,
+            methods=["GET"],
+            dependencies=[authentication_dependency],
+            summary="Download the data of an inspection in local storage",
+            responses={
+                HTTPStatus.OK.value: {"description": "Inspection data"},
+                HTTPStatus.NOT_FOUND.value: {
+                    "description": "Inspection not found in local storage",
+                },
+            },
+        )
+        router.add_api_route(
+            path="/inspections/{inspection_id}/metadata",
+            endpoint=self.inspection_controller.get_inspection_metadata,
+            methods=["GET"],
+            dependencies=[authentication_dependency],
+            summary="Download the metadata of an inspection in local storage",
+            responses={
+                HTTPStatus.OK.value: {"description": "Inspection metadata"},
+                HTTPStatus.NOT_FOUND.value: {
+                    "description": "Inspection not found in local storage",
+                },
+            },
+        )
+
+        return router
+
+    def _create_upload_router(self) -> APIRouter:
+        router: APIRouter = APIRouter(tags=["Uploads"])
+
+        authentication_dependency: Any = Security(self.authenticator.get_scheme())
+
+        router.add_api_route(
+            path="/uploads/status",
+            endpoint=self.upload_controller.get_upload_status,
+            methods=["GET"],
+            dependencies=[authentication_dependency],
+            summary="Summarize the inspections which are pending upload",
+            responses={
+                HTTPStatus.OK.value: {
+                    "description": "Pending uploads and throughput per storage handler",
+                    "model": UploadStatusResponse,
+                },
+            },
+        )
+
+        return router
+
     def _log_startup_message(self) -> None:
         address_format = "%s://%s:%d/docs"
         message = f"Uvicorn running on {address_format} (Press CTRL+C to quit)"
@@ -0,0 +1,92 @@
+import logging
+from datetime import datetime
+from pathlib import Path
+
+from fastapi import HTTPException, Query
+from fastapi.responses import FileResponse
+from opentelemetry import trace
+
+from isar.apis.models.models import InspectionResponse
+from isar.storage.local_catalog import CatalogEntry, LocalInspectionCatalog
+from isar.storage.local_retention import LocalStorageRetention
+
+tracer = trace.get_tracer(__name__)
+
+
+class InspectionController:
+    def __init__(
+        self,
+        catalog: LocalInspectionCatalog | None = None,
+        retention: LocalStorageRetention | None = None,
+    ):
+        self.catalog: LocalInspectionCatalog | None = catalog
+        self.retention: LocalStorageRetention | None = retention
+        self.logger = logging.getLogger("api")
+
+    @tracer.start_as_current_span("get_inspections")
+    def get_inspections(
+        self,
+        mission_id: str | None = None,
+        tag_id: str | None = None,
+        inspection_type: str | None = None,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+        x: float | None = None,
+        y: float | None = None,
+        radius: float | None = Query(
+            default=None, gt=0, description="Radius around (x, y) in meters"
+        ),
+        limit: int = Query(default=100, ge=1, le=1000),
+    ) -> list[InspectionResponse]:
+        entries: list[CatalogEntry] = self._get_catalog().query(
+            mission_id=mission_id,
+            tag_id=tag_id,
+            inspection_type=inspection_type,
+            start_time=start_time,
+            end_time=end_time,
+            x=x,
+            y=y,
+            radius=radius,
+            limit=limit,
+        )
+        return [
+            InspectionResponse(
+                **entry.model_dump(exclude={"data_path", "metadata_path"})
+            )
+            for entry in entries
+        ]
+
+    @tracer.start_as_current_span("get_inspection_data")
+    def get_inspection_data(self, inspection_id: str) -> FileResponse:
+        return self._file_response(self._get_entry(inspection_id).data_path)
+
+    @tracer.start_as_current_span("get_inspection_metadata")
+    def get_inspection_metadata(self, inspection_id: str) -> FileResponse:
+        return self._file_response(self._get_entry(inspection_id).metadata_path)
+
+    def _get_catalog(self) -> LocalInspectionCatalog:
+        if self.catalog is None:
+            raise HTTPException(
+                status_code=404,
+                detail="Local storage is not enabled",
+            )
+        return self.catalog
+
+    def _get_entry(self, inspection_id: str) -> CatalogEntry:
+        entry: CatalogEntry | None = self._get_catalog().get(inspection_id)
+        if entry is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Inspection {inspection_id} not found in local storage",
+            )
+        return entry
+
+    def _file_response(self, path: Path) -> FileResponse:
+        if not path.is_file():
+            raise HTTPException(
+                status_code=404,
+                detail="Inspection has been removed from local storage",
+            )
+        if self.retention is not None:
+            self.retention.touch(path)
+        return FileResponse(path, filename=path.name)
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from alitra import Frame, Orientation, Pose, Position
 from pydantic import BaseModel, Field
 
@@ -88,3 +90,34 @@ class InputPose(BaseModel):
             orientation=self.orientation.to_alitra_orientation(),
             frame=Frame(self.frame_name),
         )
+
+
+class InspectionResponse(BaseModel):
+    inspection_id: str
+    mission_id: str
+    mission_name: str
+    tag_id: str | None = None
+    inspection_type: str
+    inspection_description: str | None = None
+    timestamp: datetime
+    x: float
+    y: float
+    z: float
+
+
+class UploadHandlerStatusResponse(BaseModel):
+    handler: str
+    pending_inspections: int
+    pending_bytes: int
+    oldest_pending_seconds: float | None = None
+    throughput_bytes_per_second: float | None = None
+    uploaded: int
+    retries: int
+    failures: int
+
+
+class UploadStatusResponse(BaseModel):
+    pending_inspections: int
+    pending_bytes: int
+    estimated_seconds_to_drain: float | None = None
+    handlers: list[UploadHandlerStatusResponse]
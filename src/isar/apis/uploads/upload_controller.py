@@ -0,0 +1,42 @@
+import logging
+
+from opentelemetry import trace
+
+from isar.apis.models.models import UploadHandlerStatusResponse, UploadStatusResponse
+from isar.storage.upload_metrics import UploadMetrics
+
+tracer = trace.get_tracer(__name__)
+
+
+class UploadController:
+    def __init__(self, upload_metrics: UploadMetrics):
+        self.upload_metrics: UploadMetrics = upload_metrics
+        self.logger = logging.getLogger("api")
+
+    @tracer.start_as_current_span("get_upload_status")
+    def get_upload_status(self) -> UploadStatusResponse:
+        statuses: list[UploadHandlerStatusResponse] = self.upload_metrics.status()
+        return UploadStatusResponse(
+            pending_inspections=sum(status.pending_inspections for status in statuses),
+            pending_bytes=sum(status.pending_bytes for status in statuses),
+            estimated_seconds_to_drain=_estimated_seconds_to_drain(statuses),
+            handlers=statuses,
+        )
+
+
+def _estimated_seconds_to_drain(
+    statuses: list[UploadHandlerStatusResponse],
+) -> float | None:
+    """The handlers upload in parallel, so the backlog is drained once the slowest
+    handler is done. Unknown while a handler with pending uploads has no measured
+    throughput yet."""
+    estimate: float = 0.0
+    for status in statuses:
+        if status.pending_bytes == 0:
+            continue
+        if not status.throughput_bytes_per_second:
+            return None
+        estimate = max(
+            estimate, status.pending_bytes / status.throughput_bytes_per_second
+        )
+    return estimate
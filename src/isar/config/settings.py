@@ -27,6 +27,21 @@ class Settings(BaseSettings):
     # Determines the local path in which results from missions are stored
     LOCAL_STORAGE_PATH: str = Field(default="./results")
 
+    # Maximum number of bytes used by results in local storage. When exceeded, the
+    # least recently used results which have been uploaded to blob storage are
+    # evicted. Results are only evicted when this or LOCAL_STORAGE_MIN_FREE_SPACE is
+    # set above zero, and never without blob storage as the local copy is then the
+    # only copy of a result
+    LOCAL_STORAGE_QUOTA: int = Field(default=0)
+
+    # Minimum number of free bytes to keep on the local storage volume
+    LOCAL_STORAGE_MIN_FREE_SPACE: int = Field(default=0)
+
+    # Seconds to collect writes to a mission folder before the folder is synced to
+    # disk. A single directory sync then covers every result written in the period.
+    # Set to zero to sync the folder on every write
+    LOCAL_STORAGE_DIRECTORY_SYNC_INTERVAL: float = Field(default=1.0)
+
     # Timeout in seconds for direct HTTP requests made through the RequestHandler
     REQUEST_TIMEOUT: int = Field(default=30)
 
@@ -53,15 +68,89 @@ class Settings(BaseSettings):
     # Number of attempts for requests to the robot interface
     ROBOT_REQUEST_ATTEMPTS_LIMIT: int = Field(default=3)
 
-    # Number of attempts to stop the robot before giving up
+    # Number of attempts to upload an inspection before giving up
     UPLOAD_FAILURE_ATTEMPTS_LIMIT: int = Field(default=10)
 
-    # Number of attempts to stop the robot before giving up
+    # Maximum wait in seconds between attempts to upload an inspection
     UPLOAD_FAILURE_MAX_WAIT: int = Field(default=60)
 
-    # ISAR telemetry intervals
+    # Number of worker threads used to re-attempt failed uploads once their backoff
+    # delay has passed
+    UPLOAD_RETRY_WORKERS: int = Field(default=2)
+
+    # Compression applied to inspection data before it is stored, per inspection
+    # type, e.g. {"Audio": "zstd", "AcousticMeasurement": "gzip"}. Supported
+    # compressions are gzip and zstd. Inspections of other types are stored as is
+    UPLOAD_COMPRESSION: dict[str, str] = Field(default={})
+
+    # Compression applied to metadata files uploaded to blob storage, either gzip,
+    # zstd or empty for no compression
+    UPLOAD_METADATA_COMPRESSION: str = Field(default="")
+
+    # Maximum bandwidth in bytes per second shared by all uploads to blob storage.
+    # Set to zero for no limit
+    UPLOAD_BANDWIDTH_LIMIT: int = Field(default=0)
+
+    # Number of bytes uploads may send at once after the bandwidth has been unused.
+    # Defaults to one second worth of UPLOAD_BANDWIDTH_LIMIT when set to zero
+    UPLOAD_BANDWIDTH_BURST: int = Field(default=0)
+
+    # Priority lanes of uploads per inspection type when the bandwidth is limited.
+    # Lower lanes are sent first. Metadata files are sent in lane 0 and inspection
+    # types which are not listed in lane 1
+    UPLOAD_PRIORITY_LANES: dict[str, int] = Field(
+        default={"InspectionPreview": 0, "Video": 2, "ThermalVideo": 2}
+    )
+
+    # MQTT publish latency in seconds above which the upload bandwidth is reduced,
+    # so that uploads do not hold back status messages on a shared uplink. Set to
+    # zero to disable adaptive throttling
+    UPLOAD_THROTTLE_MQTT_LATENCY: float = Field(default=0.5)
+
+    # Lowest fraction of UPLOAD_BANDWIDTH_LIMIT that uploads are throttled down to
+    UPLOAD_THROTTLE_MIN_FRACTION: float = Field(default=0.1)
+
+    # Upload a downscaled JPEG preview of image inspections to blob storage and
+    # announce it over MQTT before uploading the full resolution image. Requires
+    # Pillow to be installed
+    UPLOAD_PREVIEW_ENABLED: bool = Field(default=False)
+
+    # Longest edge in pixels of inspection previews
+    UPLOAD_PREVIEW_MAX_SIZE: int = Field(default=480)
+
+    # JPEG quality of inspection previews, from 1 to 95
+    UPLOAD_PREVIEW_QUALITY: int = Field(default=60)
+
+    # Maximum number of inspection bytes held in memory between fetching an
+    # inspection from the robot and finishing its upload. New fetches wait while the
+    # budget is exhausted and inspections which do not fit are spilled to disk
+    INSPECTION_MEMORY_BUDGET: int = Field(default=512 * 1024 * 1024)
+
+    # Seconds a new fetch waits for the inspection memory budget before fetching
+    # regardless
+    INSPECTION_MEMORY_BUDGET_WAIT: float = Field(default=30)
+
+    # Folder for inspections spilled to disk. Defaults to a folder in the system
+    # temporary directory when empty
+    INSPECTION_SPILL_PATH: str = Field(default="")
+
+    # Inspections of at least this many bytes are hashed and compressed in worker
+    # processes rather than threads, so that the work does not compete for the GIL
+    # with the state machine, the MQTT client and the API. Payloads which are not
+    # files, and the compressed output, are handed over in shared memory, so
+    # /dev/shm must be large enough to hold them. Disabled when zero, which is the
+    # default
+    INSPECTION_PROCESS_POOL_MIN_SIZE: int = Field(default=0)
+
+    # Number of worker processes for processing large inspections
+    INSPECTION_PROCESS_WORKERS: int = Field(default=2)
+
+    # ISAR telemetry intervals. The robot info is checked for changes at its interval
+    # and only published when it has changed or MQTT_TELEMETRY_MAX_SILENCE seconds
+    # have passed since it was last published
     ROBOT_HEARTBEAT_PUBLISH_INTERVAL: float = Field(default=1)
     ROBOT_INFO_PUBLISH_INTERVAL: float = Field(default=30)
+
     ROBOT_API_BATTERY_POLL_INTERVAL: float = Field(default=5)
     ROBOT_API_STATUS_POLL_INTERVAL: float = Field(default=5)
 
@@ -93,6 +182,24 @@ class Settings(BaseSettings):
     STORAGE_LOCAL_ENABLED: bool = Field(default=True)
     STORAGE_BLOB_ENABLED: bool = Field(default=False)
 
+    # Determines whether local and blob storage are used as tiers. Inspections are
+    # then written to local storage first and replicated to blob storage in the
+    # background, so uploads never wait on the cloud. Requires both local and blob
+    # storage to be enabled
+    STORAGE_TIERED_ENABLED: bool = Field(default=False)
+
+    # Determines whether the local copy of an inspection is deleted once it has been
+    # replicated to blob storage when tiered storage is enabled
+    STORAGE_TIERED_DELETE_LOCAL_AFTER_REPLICATION: bool = Field(default=False)
+
+    # Determines whether inspection metadata files are written as compact JSON
+    # instead of JSON indented by four spaces
+    METADATA_COMPACT_JSON: bool = Field(default=False)
+
+    # JSON library used to serialize compact metadata files, either "json" or
+    # "orjson". Using orjson requires the orjson package to be installed
+    METADATA_JSON_BACKEND: str = Field(default="json")
+
     # Determines whether certificate based encryption will be used for the MQTT
     # communication.
     MQTT_SSL_ENABLED: bool = Field(default=True)
@@ -142,6 +249,75 @@ class Settings(BaseSettings):
     MQTT_HOST: str = Field(default="localhost")
     MQTT_PORT: int = Field(default=1883)
 
+    # Maximum number of messages waiting to be published to the MQTT broker, for
+    # instance during an outage. The oldest telemetry is dropped first when full
+    MQTT_QUEUE_MAX_SIZE: int = Field(default=10000)
+
+    # Path of an SQLite database where status, mission, task and inspection result
+    # messages waiting to be published are kept across restarts. Not persisted when
+    # empty
+    MQTT_QUEUE_PERSISTENCE_PATH: str = Field(default="")
+
+    # Keep only the newest unsent message per topic for telemetry which is not
+    # retained, such as pose and battery, when messages queue up for the broker.
+    # Every message is published when disabled
+    MQTT_COALESCE_TELEMETRY: bool = Field(default=False)
+
+    # Maximum number of messages published to the MQTT broker which have not yet
+    # been acknowledged. Limits the burst of messages replayed after an outage.
+    # Disabled when set to zero, leaving the limits of the MQTT client in place
+    MQTT_MAX_INFLIGHT: int = Field(default=0)
+
+    # Seconds to wait for acknowledgements when MQTT_MAX_INFLIGHT is reached before
+    # publishing is resumed regardless
+    MQTT_INFLIGHT_TIMEOUT: float = Field(default=10.0)
+
+    # Maximum number of MQTTv5 topic aliases used for QoS 0 messages such as
+    # telemetry, limited further by the broker. Disabled when set to zero. Some
+    # subscribers and bridges do not handle aliases, so they are not used by default
+    MQTT_TOPIC_ALIAS_MAXIMUM: int = Field(default=0)
+
+    # Additional connections to the MQTT broker by name, and the topic classes they
+    # publish. The topic class is the level of the topic after isar/<ISAR_ID>, such
+    # as "pose" or "inspection_result". Every lane has its own outbound queue and
+    # in-flight window and shares the configuration above, while the topics which
+    # are not listed are published on the default connection. For instance
+    # {"bulk": ["pose", "inspection_result"]} keeps status and mission messages from
+    # waiting behind telemetry and inspection results
+    MQTT_CONNECTION_LANES: dict[str, list[str]] = Field(default={})
+
+    # Encoding of telemetry per topic class, which is the level of the topic after
+    # isar/<ISAR_ID> such as "pose" or "battery". Either "json" or the more compact
+    # "cbor", which is announced through the content type of the messages. Topics
+    # which are not listed are published as JSON
+    MQTT_TELEMETRY_ENCODING: dict[str, str] = Field(default={})
+
+    # Determines whether robot telemetry is only published when it has changed
+    # beyond the deadbands below since it was last published
+    MQTT_TELEMETRY_DEADBAND_ENABLED: bool = Field(default=False)
+
+    # Maximum seconds between published readings on a telemetry topic when unchanged
+    # readings are suppressed
+    MQTT_TELEMETRY_MAX_SILENCE: float = Field(default=10.0)
+
+    # Meters the robot must move and degrees it must turn before its pose is
+    # published again
+    MQTT_DEADBAND_POSITION: float = Field(default=0.05)
+    MQTT_DEADBAND_ORIENTATION: float = Field(default=2.0)
+
+    # Change in battery percentage and pressure level before they are published again
+    MQTT_DEADBAND_BATTERY: float = Field(default=1.0)
+    MQTT_DEADBAND_PRESSURE: float = Field(default=0.0)
+
+    # Seconds of robot telemetry samples collected into one message, holding an
+    # array of the samples. The batches are published on the topic of the telemetry
+    # followed by /batch. Disabled when set to zero
+    MQTT_TELEMETRY_BATCH_WINDOW: float = Field(default=0.0)
+
+    # Maximum seconds a telemetry sample is held back to be batched. Telemetry
+    # sampled less often is published one sample at a time
+    MQTT_TELEMETRY_BATCH_MAX_LATENCY: float = Field(default=2.0)
+
     # Determines whether inspections are uploaded asynchronously or get_inspections in robotinterface
     UPLOAD_INSPECTIONS_ASYNC: bool = Field(default=False)
 
@@ -181,12 +357,18 @@ class Settings(BaseSettings):
         default="aborted_mission", validate_default=True
     )
     TOPIC_ISAR_TASK: str = Field(default="task", validate_default=True)
+    TOPIC_ISAR_LATEST_MISSION: str = Field(
+        default="latest_mission", validate_default=True
+    )
     TOPIC_ISAR_INSPECTION_RESULT: str = Field(
         default="inspection_result", validate_default=True
     )
     TOPIC_ISAR_INSPECTION_VALUE: str = Field(
         default="inspection_value", validate_default=True
     )
+    TOPIC_ISAR_INSPECTION_PREVIEW: str = Field(
+        default="inspection_preview", validate_default=True
+    )
     TOPIC_ISAR_ROBOT_INFO: str = Field(default="robot_info", validate_default=True)
     TOPIC_ISAR_ROBOT_HEARTBEAT: str = Field(
         default="robot_heartbeat", validate_default=True
@@ -201,6 +383,19 @@ class Settings(BaseSettings):
     MQTT_TELEMETRY_EXPIRY: int = Field(default=10)
     MQTT_MISSION_TASK_AND_STATUS_EXPIRY: int = Field(default=86400)
 
+    # Publish the status of the latest mission and each of its tasks as a single
+    # retained message on TOPIC_ISAR_LATEST_MISSION
+    MQTT_LATEST_MISSION_ENABLED: bool = Field(default=False)
+
+    # Retain the messages on the topic of each mission and task. May be disabled
+    # when subscribers rely on TOPIC_ISAR_LATEST_MISSION instead
+    MQTT_RETAIN_MISSION_AND_TASK_TOPICS: bool = Field(default=True)
+
+    # Seconds after a mission has finished until the retained messages on the topics
+    # of the mission and its tasks are cleared from the broker. Left to expire when
+    # negative, which is the default
+    MQTT_RETAINED_MISSION_TOPICS_LIFETIME: float = Field(default=-1.0)
+
     # Logging
 
     #   Log handlers
@@ -220,10 +415,12 @@ class Settings(BaseSettings):
         "TOPIC_ISAR_STATUS",
         "TOPIC_ISAR_MISSION",
         "TOPIC_ISAR_TASK",
+        "TOPIC_ISAR_LATEST_MISSION",
         "TOPIC_ISAR_ROBOT_INFO",
         "TOPIC_ISAR_ROBOT_HEARTBEAT",
         "TOPIC_ISAR_INSPECTION_RESULT",
         "TOPIC_ISAR_INSPECTION_VALUE",
+        "TOPIC_ISAR_INSPECTION_PREVIEW",
         "TOPIC_ISAR_STARTUP",
         "TOPIC_ISAR_INTERVENTION_NEEDED",
         "TOPIC_ISAR_MISSION_ABORTED",
@@ -232,6 +429,51 @@ class Settings(BaseSettings):
     def prefix_isar_topics(cls, v: Any, info: ValidationInfo) -> str:
         return f"isar/{info.data['ISAR_ID']}/{v}"
 
+    @field_validator("MQTT_TELEMETRY_ENCODING")
+    @classmethod
+    def validate_telemetry_encoding(cls, v: dict[str, str]) -> dict[str, str]:
+        for topic_class, encoding in v.items():
+            if encoding not in ("json", "cbor"):
+                raise ValueError(
+                    f"Unknown telemetry encoding {encoding} for {topic_class}, "
+                    f"expected json or cbor"
+                )
+        return v
+
+    @field_validator("UPLOAD_METADATA_COMPRESSION")
+    @classmethod
+    def validate_metadata_compression(cls, v: str) -> str:
+        if v not in ("", "gzip", "zstd"):
+            raise ValueError(
+                f"Unknown metadata compression {v}, expected gzip, zstd or empty"
+            )
+        return v
+
+    @field_validator("METADATA_JSON_BACKEND")
+    @classmethod
+    def validate_metadata_json_backend(cls, v: str) -> str:
+        if v not in ("json", "orjson"):
+            raise ValueError(
+                f"Unknown metadata JSON backend {v}, expected json or orjson"
+            )
+        return v
+
+    @field_validator("MQTT_CONNECTION_LANES")
+    @classmethod
+    def validate_connection_lanes(cls, v: dict[str, list[str]]) -> dict[str, list[str]]:
+        lanes: dict[str, str] = {}
+        for lane, topic_classes in v.items():
+            if not lane or lane == "default":
+                raise ValueError(f"Invalid MQTT connection lane name '{lane}'")
+            for topic_class in topic_classes:
+                if topic_class in lanes:
+                    raise ValueError(
+                        f"Topic class {topic_class} is in both the "
+                        f"{lanes[topic_class]} and {lane} MQTT connection lanes"
+                    )
+                lanes[topic_class] = lane
+        return v
+
     @property
     def allowed_auth_methods(self) -> list[str]:
         return [m.strip() for m in self.ALLOWED_AUTH_METHODS.split(",") if m.strip()]
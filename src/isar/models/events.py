@@ -8,13 +8,13 @@ from isar.apis.models.models import (
     MaintenanceResponse,
     MissionStartResponse,
 )
+from isar.services.service_connections.mqtt.mqtt_outbound_queue import MqttOutboundQueue
 from isar.state_machine.states_enum import States
 from robot_interface.models.exceptions.robot_exceptions import ErrorMessage
 from robot_interface.models.inspection.inspection import Inspection
 from robot_interface.models.mission.mission import Mission
 from robot_interface.models.mission.status import RobotStatus
 from robot_interface.models.mission.task import InspectionTask
-from robot_interface.telemetry.mqtt_client import MQTTQueueType
 
 
 class EmptyMessage:
@@ -92,7 +92,7 @@ class Events:
             "uploader", maxsize=10
         )
 
-        self.mqtt_queue: Queue[MQTTQueueType] = Queue[MQTTQueueType]()
+        self.mqtt_queue: MqttOutboundQueue = MqttOutboundQueue()
 
         self.state: Event[States] = Event("state")
 
@@ -3,9 +3,11 @@ from importlib import import_module
 from dependency_injector import containers, providers
 
 from isar.apis.api import API
+from isar.apis.inspections.inspection_controller import InspectionController
 from isar.apis.robot_control.robot_controller import RobotController
 from isar.apis.schedule.scheduling_controller import SchedulingController
 from isar.apis.security.authentication import Authenticator
+from isar.apis.uploads.upload_controller import UploadController
 from isar.config.settings import settings
 from isar.models.events import Events
 from isar.robot.robot_inspection_service import RobotInspectionService
@@ -13,8 +15,18 @@ from isar.robot.robot_service import RobotService
 from isar.services.utilities.robot_utilities import RobotUtilities
 from isar.services.utilities.scheduling_utilities import SchedulingUtilities
 from isar.state_machine.state_machine import StateMachine
+from isar.storage.bandwidth_limiter import UploadBandwidthLimiter
+from isar.storage.blob_replicator import BlobReplicator
 from isar.storage.blob_storage import BlobStorage
+from isar.storage.compression import InspectionCompressor
+from isar.storage.local_catalog import LocalInspectionCatalog
+from isar.storage.local_retention import LocalStorageRetention
 from isar.storage.local_storage import LocalStorage
+from isar.storage.memory_budget import InspectionMemoryBudget
+from isar.storage.preview import PreviewGenerator
+from isar.storage.process_pool import InspectionProcessPool
+from isar.storage.retry_scheduler import UploadRetryScheduler
+from isar.storage.upload_metrics import UploadMetrics
 from isar.storage.uploader import Uploader
 from robot_interface.telemetry.mqtt_client import MqttPublisher
 
@@ -59,23 +71,61 @@ class ApplicationContainer(containers.DeclarativeContainer):
     robot_controller = providers.Singleton(
         RobotController, robot_utilities=robot_utilities
     )
-    api = providers.Singleton(
-        API,
-        authenticator=authenticator,
-        scheduling_controller=scheduling_controller,
-        robot_controller=robot_controller,
-        mqtt_publisher=mqtt_client,
-    )
 
     # Storage
     storage_handlers_temp: list = []  # noqa: RUF012
+    tiered_storage: bool = (
+        settings.STORAGE_TIERED_ENABLED
+        and settings.STORAGE_LOCAL_ENABLED
+        and settings.STORAGE_BLOB_ENABLED
+    )
+    inspection_process_pool = providers.Singleton(InspectionProcessPool)
+    upload_bandwidth_limiter = providers.Singleton(UploadBandwidthLimiter)
+    upload_metrics = providers.Singleton(UploadMetrics)
+    local_storage_retention = providers.Object(None)
+    local_inspection_catalog = providers.Object(None)
     if settings.STORAGE_LOCAL_ENABLED:
-        local_storage = providers.Singleton(LocalStorage)
+        local_storage_retention = providers.Singleton(LocalStorageRetention)
+        local_inspection_catalog = providers.Singleton(LocalInspectionCatalog)
+        local_storage = providers.Singleton(
+            LocalStorage,
+            retention=local_storage_retention,
+            catalog=local_inspection_catalog,
+        )
         storage_handlers_temp.append(local_storage)
     if settings.STORAGE_BLOB_ENABLED:
-        blob_storage = providers.Singleton(BlobStorage)
-        storage_handlers_temp.append(blob_storage)
+        blob_storage = providers.Singleton(
+            BlobStorage,
+            process_pool=inspection_process_pool,
+            bandwidth_limiter=upload_bandwidth_limiter,
+        )
+        if not tiered_storage:
+            storage_handlers_temp.append(blob_storage)
     storage_handlers = providers.List(*storage_handlers_temp)
+    preview_generator = providers.Object(None)
+    preview_storage = providers.Object(None)
+    if settings.UPLOAD_PREVIEW_ENABLED and settings.STORAGE_BLOB_ENABLED:
+        preview_generator = providers.Singleton(PreviewGenerator)
+        preview_storage = blob_storage
+
+    # API
+    inspection_controller = providers.Singleton(
+        InspectionController,
+        catalog=local_inspection_catalog,
+        retention=local_storage_retention,
+    )
+    upload_controller = providers.Singleton(
+        UploadController, upload_metrics=upload_metrics
+    )
+    api = providers.Singleton(
+        API,
+        authenticator=authenticator,
+        scheduling_controller=scheduling_controller,
+        robot_controller=robot_controller,
+        inspection_controller=inspection_controller,
+        upload_controller=upload_controller,
+        mqtt_publisher=mqtt_client,
+    )
 
     # Robot
     robot = providers.Singleton(
@@ -86,10 +136,33 @@ class ApplicationContainer(containers.DeclarativeContainer):
     )
 
     # Uploader
+    upload_retry_scheduler = providers.Singleton(UploadRetryScheduler)
+    inspection_memory_budget = providers.Singleton(InspectionMemoryBudget)
+    inspection_compressor = providers.Singleton(
+        InspectionCompressor, process_pool=inspection_process_pool
+    )
+    if tiered_storage:
+        blob_replicator = providers.Singleton(
+            BlobReplicator,
+            blob_storage=blob_storage,
+            retry_scheduler=upload_retry_scheduler,
+            retention=local_storage_retention,
+            metrics=upload_metrics,
+        )
+    else:
+        blob_replicator = providers.Object(None)
     uploader = providers.Singleton(
         Uploader,
         storage_handlers=storage_handlers,
         mqtt_publisher=mqtt_client,
+        retry_scheduler=upload_retry_scheduler,
+        memory_budget=inspection_memory_budget,
+        blob_replicator=blob_replicator,
+        local_storage_retention=local_storage_retention,
+        compressor=inspection_compressor,
+        metrics=upload_metrics,
+        preview_generator=preview_generator,
+        preview_storage=preview_storage,
     )
 
     # Inspection data service
@@ -1,4 +1,5 @@
 import logging
+import time
 from collections.abc import Callable
 from threading import Event as ThreadEvent
 from threading import Thread
@@ -6,6 +7,7 @@ from threading import Thread
 from isar.config.settings import settings
 from isar.models.events import Event, EventConflictError, Events, EventTimeoutError
 from isar.robot.function_thread import FunctionThread
+from isar.storage.memory_budget import InspectionMemoryBudget
 from isar.storage.uploader import Uploader
 from robot_interface.models.exceptions.robot_exceptions import (
     RobotException,
@@ -20,10 +22,14 @@ from robot_interface.robot_interface import RobotInterface
 def fetch_and_upload_inspection(
     get_inspection_function: Callable[[InspectionTask], Inspection],
     logger: logging.Logger,
-    upload_function: Callable[[Inspection, Mission], None],
+    upload_function: Callable[[Inspection, Mission, float, int], None],
     task: InspectionTask,
     mission: Mission,
+    memory_budget: InspectionMemoryBudget,
 ) -> None:
+    # The upload is requested as soon as the task has completed
+    task_completed_at: float = time.monotonic()
+    fetch_reservation: int = memory_budget.reserve_fetch()
     try:
         inspection: Inspection = get_inspection_function(task)
         if task.id != inspection.id:
@@ -34,17 +40,24 @@ def fetch_and_upload_inspection(
             )
 
     except (RobotRetrieveInspectionException, RobotException) as e:
+        memory_budget.release_fetch(fetch_reservation)
         logger.error(f"Failed to retrieve inspections because: {e.error_description}")
         return
+    except Exception:
+        # Robot packages may raise anything, and the reservation would otherwise
+        # shrink the memory budget until restart
+        memory_budget.release_fetch(fetch_reservation)
+        raise
 
     if not inspection:
+        memory_budget.release_fetch(fetch_reservation)
         logger.error(f"No inspection result data retrieved for task {str(task.id)[:8]}")
         return
 
     inspection.metadata.tag_id = task.tag_id
     inspection.metadata.analysis_types = task.analysis_types
 
-    upload_function(inspection, mission)
+    upload_function(inspection, mission, task_completed_at, fetch_reservation)
 
 
 class RobotInspectionService:
@@ -125,6 +138,7 @@ class RobotInspectionService:
                             self.uploader.upload_inspection,
                             upload_task_request[0],
                             upload_task_request[1],
+                            self.uploader.memory_budget,
                         )
                     )
 
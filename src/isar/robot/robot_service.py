@@ -106,6 +106,7 @@ class RobotService:
                         id=aborted_mission.id,
                         name=aborted_mission.name,
                         tasks=unfinished_tasks,
+                        start_time=aborted_mission.start_time,
                     )
                     self.robot_service_events.mission_successfully_stopped.trigger_event(
                         continued_mission
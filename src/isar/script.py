@@ -14,7 +14,9 @@ from isar.models.events import Events
 from isar.modules import ApplicationContainer, get_injector
 from isar.robot.robot_inspection_service import RobotInspectionService
 from isar.robot.robot_service import RobotService
+from isar.services.service_connections.mqtt.mission_topics import mission_topics
 from isar.services.service_connections.mqtt.mqtt_client import MqttClient
+from isar.services.service_connections.mqtt.mqtt_outbound_queue import DEFAULT_LANE
 from isar.services.service_connections.mqtt.robot_heartbeat_publisher import (
     RobotHeartbeatPublisher,
 )
@@ -25,6 +27,7 @@ from isar.state_machine.state_machine import StateMachine
 from robot_interface.models.inspection.inspection import Inspection
 from robot_interface.models.mission.mission import Mission
 from robot_interface.robot_interface import RobotInterface
+from robot_interface.telemetry.scheduler import TelemetryScheduler
 
 
 def print_setting(
@@ -62,6 +65,7 @@ def print_startup_info() -> None:
     print_setting("Running on port", settings.API_PORT)
     print_setting("Using local storage", settings.STORAGE_LOCAL_ENABLED)
     print_setting("Using blob storage", settings.STORAGE_BLOB_ENABLED)
+    print_setting("Using tiered storage", settings.STORAGE_TIERED_ENABLED)
     print_setting("Blob storage account data", settings.BLOB_STORAGE_ACCOUNT_DATA)
     print_setting(
         "Blob storage account metadata", settings.BLOB_STORAGE_ACCOUNT_METADATA
@@ -123,36 +127,65 @@ def start() -> None:
             inspections_callback
         )
 
-    mqtt_client: MqttClient = MqttClient(mqtt_queue=events.mqtt_queue)
-
-    mqtt_thread: Thread = Thread(
-        target=mqtt_client.run, name="ISAR MQTT Client", daemon=True
-    )
-    mqtt_thread.start()
-    threads.append(mqtt_thread)
+    mqtt_clients: list[MqttClient] = [
+        MqttClient(
+            mqtt_queue=events.mqtt_queue,
+            publish_latency_listeners=[
+                injector.upload_bandwidth_limiter().observe_publish_latency
+            ],
+        )
+    ]
+    for lane, topic_classes in settings.MQTT_CONNECTION_LANES.items():
+        mqtt_clients.append(
+            MqttClient(
+                mqtt_queue=events.mqtt_queue.add_lane(lane, topic_classes),
+                publish_latency_listeners=[
+                    injector.upload_bandwidth_limiter().observe_publish_latency
+                ],
+                lane=lane,
+            )
+        )
 
-    robot_info_publisher: RobotInfoPublisher = RobotInfoPublisher(
-        mqtt_queue=events.mqtt_queue
+    for mqtt_client in mqtt_clients:
+        mqtt_thread: Thread = Thread(
+            target=mqtt_client.run,
+            name=(
+                "ISAR MQTT Client"
+                if mqtt_client.lane == DEFAULT_LANE
+                else f"ISAR MQTT Client {mqtt_client.lane}"
+            ),
+            daemon=True,
+        )
+        mqtt_thread.start()
+        threads.append(mqtt_thread)
+
+    # The periodic publishers of ISAR share a thread, which is kept apart from the
+    # telemetry sources of the robot so that the heartbeat is published even while
+    # the robot is slow to respond
+    isar_scheduler: TelemetryScheduler = TelemetryScheduler()
+    isar_scheduler.add(
+        RobotInfoPublisher(mqtt_queue=events.mqtt_queue).telemetry_source()
     )
-    robot_info_thread: Thread = Thread(
-        target=robot_info_publisher.run,
-        name="ISAR Robot Info Publisher",
-        daemon=True,
+    isar_scheduler.add(
+        RobotHeartbeatPublisher(mqtt_queue=events.mqtt_queue).telemetry_source()
     )
-    robot_info_thread.start()
-    threads.append(robot_info_thread)
+    isar_scheduler.add(mission_topics.telemetry_source(events.mqtt_queue))
 
-    robot_heartbeat_publisher: RobotHeartbeatPublisher = RobotHeartbeatPublisher(
-        mqtt_queue=events.mqtt_queue
-    )
-
-    robot_heartbeat_thread: Thread = Thread(
-        target=robot_heartbeat_publisher.run,
-        name="ISAR Robot Heartbeat Publisher",
-        daemon=True,
-    )
-    robot_heartbeat_thread.start()
-    threads.append(robot_heartbeat_thread)
+    robot_scheduler: TelemetryScheduler = TelemetryScheduler()
+    for source in robot_interface.get_telemetry_sources(
+        queue=events.mqtt_queue,
+        isar_id=settings.ISAR_ID,
+        robot_name=settings.ROBOT_NAME,
+    ):
+        robot_scheduler.add(source)
+
+    for name, scheduler in (
+        ("ISAR Telemetry Scheduler", isar_scheduler),
+        ("ISAR Robot Telemetry Scheduler", robot_scheduler),
+    ):
+        scheduler_thread: Thread = Thread(target=scheduler.run, name=name, daemon=True)
+        scheduler_thread.start()
+        threads.append(scheduler_thread)
 
     publishers: list[Thread] = robot_interface.get_telemetry_publishers(
         queue=events.mqtt_queue,
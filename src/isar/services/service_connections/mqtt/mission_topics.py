@@ -0,0 +1,145 @@
+import logging
+import time
+from logging import Logger
+from queue import Queue
+from threading import Lock
+from typing import Any
+
+from isar.config.settings import settings
+from robot_interface.models.mission.status import MissionStatus
+from robot_interface.telemetry.mqtt_client import MqttPublisher
+from robot_interface.telemetry.scheduler import TelemetrySource
+
+FINISHED_MISSION_STATUSES: frozenset[MissionStatus] = frozenset(
+    {
+        MissionStatus.Successful,
+        MissionStatus.PartiallySuccessful,
+        MissionStatus.Failed,
+        MissionStatus.Cancelled,
+    }
+)
+
+# Seconds between checks for retained mission topics which are due to be cleared
+CLEANUP_INTERVAL: float = 10.0
+
+# Number of cleared missions remembered, so that messages published on their topics
+# after they were cleared do not start tracking them again
+CLEARED_MISSIONS_KEPT: int = 100
+
+
+class MissionTopics:
+    """Keeps track of the retained messages ISAR has published on the topic of each
+    mission and task, and of the status of the latest mission and its tasks.
+
+    The broker keeps a retained message until it expires and replays it to every
+    subscriber which connects, so a large mission leaves many retained topics
+    behind. Once a mission has finished, the retained messages on the topics of the
+    mission and its tasks are cleared with an empty retained message after
+    MQTT_RETAINED_MISSION_TOPICS_LIFETIME seconds. Retained messages published on
+    the topic of a mission once it is scheduled to be cleared are cleared with it,
+    while those published after it was cleared are not tracked. The latest mission,
+    with the status of each of its tasks, is given by a single retained message on
+    TOPIC_ISAR_LATEST_MISSION instead, which is never cleared.
+    """
+
+    def __init__(self) -> None:
+        self.logger: Logger = logging.getLogger("mqtt_client")
+        self._lock: Lock = Lock()
+        # Retained topics by mission id
+        self._topics: dict[str, set[str]] = {}
+        # Monotonic time at which the topics of finished missions are cleared
+        self._cleanup_due: dict[str, float] = {}
+        # Ids of the most recently cleared missions, oldest first
+        self._cleared: dict[str, None] = {}
+        self._latest_mission: dict[str, Any] = {}
+        self._latest_tasks: dict[str, dict[str, Any]] = {}
+
+    def mission_published(
+        self,
+        topic: str,
+        retained: bool,
+        mission: dict[str, Any],
+        now: float | None = None,
+    ) -> dict[str, Any]:
+        """Record a message published on the topic of a mission, given by the fields
+        of its MissionPayload apart from the timestamp. Returns the fields of the
+        LatestMissionPayload apart from the timestamp"""
+        mission_id: str = mission["mission_id"]
+        with self._lock:
+            self._track(mission_id, topic, retained)
+            if mission.get("status") in FINISHED_MISSION_STATUSES:
+                self._schedule_cleanup(mission_id, now)
+
+            if self._latest_mission.get("mission_id") != mission_id:
+                self._latest_tasks = {}
+            self._latest_mission = dict(mission)
+            return self._latest()
+
+    def task_published(
+        self, topic: str, retained: bool, mission_id: str, task: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """Record a message published on the topic of a task, given by the fields of
+        its TaskPayload apart from the mission id and timestamp. Returns the fields
+        of the LatestMissionPayload apart from the timestamp, or None if the task is
+        not part of the latest mission"""
+        with self._lock:
+            self._track(mission_id, topic, retained)
+            if self._latest_mission.get("mission_id") != mission_id:
+                return None
+            self._latest_tasks[task["task_id"]] = dict(task)
+            return self._latest()
+
+    def take_due(self, now: float | None = None) -> list[str]:
+        """Returns the retained topics which are due to be cleared and stops keeping
+        track of them"""
+        if now is None:
+            now = time.monotonic()
+        topics: list[str] = []
+        with self._lock:
+            for mission_id, due in list(self._cleanup_due.items()):
+                if due <= now:
+                    del self._cleanup_due[mission_id]
+                    topics.extend(sorted(self._topics.pop(mission_id, ())))
+                    self._cleared[mission_id] = None
+            while len(self._cleared) > CLEARED_MISSIONS_KEPT:
+                del self._cleared[next(iter(self._cleared))]
+        return topics
+
+    def telemetry_source(self, mqtt_queue: Queue) -> TelemetrySource:
+        mqtt_publisher: MqttPublisher = MqttPublisher(mqtt_queue=mqtt_queue)
+
+        def clear_retained_topics() -> None:
+            topics: list[str] = self.take_due()
+            if topics:
+                self.logger.debug(f"Clearing {len(topics)} retained mission topics")
+            # An empty retained message removes the retained message of the topic
+            for topic in topics:
+                mqtt_publisher.publish(topic=topic, payload="", qos=1, retain=True)
+
+        return TelemetrySource(
+            name="mission_topics_cleanup",
+            interval=CLEANUP_INTERVAL,
+            publish=clear_retained_topics,
+        )
+
+    def _track(self, mission_id: str, topic: str, retained: bool) -> None:
+        if not retained or settings.MQTT_RETAINED_MISSION_TOPICS_LIFETIME < 0:
+            return
+        if mission_id in self._cleared:
+            return
+        self._topics.setdefault(mission_id, set()).add(topic)
+
+    def _schedule_cleanup(self, mission_id: str, now: float | None) -> None:
+        if mission_id not in self._topics or mission_id in self._cleanup_due:
+            return
+        if now is None:
+            now = time.monotonic()
+        self._cleanup_due[mission_id] = (
+            now + settings.MQTT_RETAINED_MISSION_TOPICS_LIFETIME
+        )
+
+    def _latest(self) -> dict[str, Any]:
+        return {**self._latest_mission, "tasks": list(self._latest_tasks.values())}
+
+
+mission_topics: MissionTopics = MissionTopics()
@@ -1,26 +1,34 @@
 import logging
 import os
 import time
-from queue import Empty, Queue
+from collections.abc import Callable
+from threading import Condition, Event, Lock
 from typing import Any
 
 import backoff
 from backoff.types import Details
+from opentelemetry import metrics
+from opentelemetry.metrics import Histogram, Meter
 from paho.mqtt import client as mqtt
 from paho.mqtt.client import Client
 from paho.mqtt.enums import CallbackAPIVersion
-from paho.mqtt.packettypes import PacketTypes
 from paho.mqtt.properties import Properties
 from paho.mqtt.reasoncodes import ReasonCode
 
 from isar.config.settings import settings
-from robot_interface.telemetry.mqtt_client import MqttClientInterface
+from isar.services.service_connections.mqtt.mqtt_outbound_queue import (
+    DEFAULT_LANE,
+    MqttOutboundQueue,
+)
+from isar.services.service_connections.mqtt.topic_aliases import TopicAliases
+from robot_interface.telemetry.mqtt_client import (  # noqa: F401
+    MqttClientInterface,
+    MQTTQueueType,
+    props_expiry,
+)
 
-
-def props_expiry(seconds: int) -> Properties:
-    p = Properties(PacketTypes.PUBLISH)
-    p.MessageExpiryInterval = seconds
-    return p
+# Messages taken from the outbound queue at once when MQTT_MAX_INFLIGHT is disabled
+PUBLISH_BATCH_SIZE: int = 100
 
 
 def _on_success(data: Details) -> None:
@@ -44,10 +52,45 @@ def _on_giveup(data: Details) -> None:
 
 
 class MqttClient(MqttClientInterface):
-    def __init__(self, mqtt_queue: Queue) -> None:
+    def __init__(
+        self,
+        mqtt_queue: MqttOutboundQueue,
+        publish_latency_listeners: list[Callable[[float], None]] | None = None,
+        lane: str = DEFAULT_LANE,
+    ) -> None:
         self.logger = logging.getLogger("mqtt_client")
         self.logger.setLevel("INFO")
-        self.mqtt_queue: Queue = mqtt_queue
+        self.mqtt_queue: MqttOutboundQueue = mqtt_queue
+        # Each connection lane has a connection, outbound queue and in-flight window
+        # of its own, so that bulk messages do not hold up status messages
+        self.lane: str = lane
+
+        self._connected: Event = Event()
+        self.topic_aliases: TopicAliases = TopicAliases()
+        # Messages published but not yet acknowledged, or written to the socket
+        # for QoS 0. Bounded by MQTT_MAX_INFLIGHT, if enabled, to pace the replay
+        # after an outage
+        self._inflight: int = 0
+        self._inflight_condition: Condition = Condition()
+
+        # Called with the seconds from publishing a message until it has been
+        # acknowledged by the broker, or written to the socket for QoS 0
+        self.publish_latency_listeners: list[Callable[[float], None]] = (
+            publish_latency_listeners or []
+        )
+        self._publish_times: dict[int, float] = {}
+        self._published_before_registered: set[int] = set()
+        # Number of calls to publish which have not yet registered their message id
+        self._publishing: int = 0
+        self._publish_times_lock: Lock = Lock()
+
+        meter: Meter = metrics.get_meter("isar.mqtt")
+        self.publish_latency: Histogram = meter.create_histogram(
+            name="isar.mqtt.publish_latency",
+            unit="s",
+            description="Time from publishing a message until it is acknowledged by "
+            "the broker, or written to the socket for QoS 0",
+        )
 
         username: str = settings.MQTT_USERNAME
         password: str = ""
@@ -72,6 +115,8 @@ class MqttClient(MqttClientInterface):
         )
 
         self.client.enable_logger(logger=self.logger)
+        if settings.MQTT_MAX_INFLIGHT > 0:
+            self.client.max_inflight_messages_set(settings.MQTT_MAX_INFLIGHT)
 
         dirname = os.path.dirname(__file__)
 
@@ -81,36 +126,48 @@ class MqttClient(MqttClientInterface):
 
         self.client.on_connect = self.on_connect
         self.client.on_disconnect = self.on_disconnect
+        self.client.on_publish = self.on_publish
 
         self.client.username_pw_set(username=username, password=password)
 
     def run(self) -> None:
         self.connect(host=self.host, port=self.port)
         self.client.loop_start()
+        self._publish_from_queue()
 
+    def _publish_from_queue(self) -> None:
         while True:
-            if not self.client.is_connected():
-                time.sleep(0)  # avoid CPU spin
-                continue
-            try:
-                item: tuple[str, str, int, bool, Properties | None] = (
-                    self.mqtt_queue.get(timeout=1)
-                )
+            # Messages are kept in the outbound queue while disconnected
+            self._connected.wait()
+            capacity: int = self._wait_for_inflight_capacity()
+            batch: list[MQTTQueueType] = self.mqtt_queue.get_batch(
+                max_items=capacity, timeout=1
+            )
+            if batch and self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Publishing %d messages", len(batch))
+
+            for index, item in enumerate(batch):
                 if len(item) == 4:
                     topic, payload, qos, retain = item
                     properties = None
                 else:
                     topic, payload, qos, retain, properties = item
-            except Empty:
-                continue
-
-            self.publish(
-                topic=topic,
-                payload=payload,
-                qos=qos,
-                retain=retain,
-                properties=properties,
-            )
+
+                message_info: mqtt.MQTTMessageInfo = self._publish(
+                    topic=topic,
+                    payload=payload,
+                    qos=qos,
+                    retain=retain,
+                    properties=properties,
+                )
+                if message_info.rc == mqtt.MQTT_ERR_NO_CONN:
+                    # Disconnected since the wait above. The client keeps messages
+                    # with QoS 1 and 2 and sends them after reconnecting, so only a
+                    # QoS 0 message is put back, with the rest of the batch behind it
+                    unsent: list[MQTTQueueType] = batch[index + 1 if qos else index :]
+                    for unsent_item in reversed(unsent):
+                        self.mqtt_queue.requeue(unsent_item)
+                    break
 
     def on_connect(
         self,
@@ -120,7 +177,18 @@ class MqttClient(MqttClientInterface):
         reason_code: ReasonCode,
         properties: Properties | None,
     ) -> None:
-        self.logger.info(f"Connected: {reason_code}")
+        self.logger.info(f"Connected {self.lane} lane: {reason_code}")
+        if reason_code.is_failure:
+            return
+        self.topic_aliases.connected(properties)
+        with self._inflight_condition:
+            # Unacknowledged messages are resent by the client, or lost for QoS 0
+            self._inflight = 0
+            self._inflight_condition.notify_all()
+        with self._publish_times_lock:
+            self._publish_times.clear()
+            self._published_before_registered.clear()
+        self._connected.set()
 
     def on_disconnect(
         self,
@@ -130,7 +198,32 @@ class MqttClient(MqttClientInterface):
         reasonCode: ReasonCode,
         properties: Properties | None,
     ) -> None:
-        self.logger.warning(f"Unexpected disconnect: {reasonCode}.")
+        self._connected.clear()
+        self.topic_aliases.reset()
+        self.logger.warning(f"Unexpected disconnect of {self.lane} lane: {reasonCode}.")
+
+    def on_publish(
+        self,
+        client: Client,
+        userdata: Any,
+        mid: int,
+        reason_code: ReasonCode,
+        properties: Properties | None,
+    ) -> None:
+        with self._inflight_condition:
+            self._inflight = max(self._inflight - 1, 0)
+            self._inflight_condition.notify_all()
+
+        with self._publish_times_lock:
+            published_at: float | None = self._publish_times.pop(mid, None)
+            if published_at is None:
+                # Either the message was sent before publish returned its message
+                # id, or it was published before reconnecting and resent by the
+                # client. The latter is never registered, so it is not recorded
+                if self._publishing:
+                    self._published_before_registered.add(mid)
+                return
+        self._notify_publish_latency(time.monotonic() - published_at)
 
     @backoff.on_exception(
         backoff.expo,
@@ -148,12 +241,83 @@ class MqttClient(MqttClientInterface):
     def publish(
         self,
         topic: str,
-        payload: str,
+        payload: str | bytes,
         qos: int = 0,
         retain: bool = False,
         properties: Properties | None = None,
     ) -> None:
-        self.logger.debug("Publishing message to topic: %s", topic)
-        self.client.publish(
+        self._publish(
             topic=topic, payload=payload, qos=qos, retain=retain, properties=properties
         )
+
+    def _publish(
+        self,
+        topic: str,
+        payload: str | bytes,
+        qos: int = 0,
+        retain: bool = False,
+        properties: Properties | None = None,
+    ) -> mqtt.MQTTMessageInfo:
+        published_at: float = time.monotonic()
+        with self._inflight_condition:
+            self._inflight += 1
+        with self._publish_times_lock:
+            self._publishing += 1
+        try:
+            message_info: mqtt.MQTTMessageInfo = self.topic_aliases.publish(
+                self.client, topic, payload, qos, retain, properties
+            )
+        except Exception:
+            with self._publish_times_lock:
+                self._publishing -= 1
+            with self._inflight_condition:
+                self._inflight = max(self._inflight - 1, 0)
+            raise
+
+        with self._publish_times_lock:
+            self._publishing -= 1
+            acknowledged: bool = message_info.mid in self._published_before_registered
+            self._published_before_registered.discard(message_info.mid)
+            if not self._publishing:
+                # Acknowledgements recorded while publishing which no call to
+                # publish has claimed belong to resent messages
+                self._published_before_registered.clear()
+            if message_info.rc == mqtt.MQTT_ERR_SUCCESS and not acknowledged:
+                self._publish_times[message_info.mid] = published_at
+
+        if message_info.rc != mqtt.MQTT_ERR_SUCCESS:
+            with self._inflight_condition:
+                self._inflight = max(self._inflight - 1, 0)
+        elif acknowledged:
+            self._notify_publish_latency(time.monotonic() - published_at)
+        return message_info
+
+    def _wait_for_inflight_capacity(self) -> int:
+        """Block until fewer than MQTT_MAX_INFLIGHT messages are unacknowledged and
+        return the number of messages which may be published"""
+        if settings.MQTT_MAX_INFLIGHT <= 0:
+            return PUBLISH_BATCH_SIZE
+        with self._inflight_condition:
+            if not self._inflight_condition.wait_for(
+                lambda: self._inflight < settings.MQTT_MAX_INFLIGHT,
+                timeout=settings.MQTT_INFLIGHT_TIMEOUT,
+            ):
+                # Acknowledgements lost without a disconnect must not stall publishing
+                self.logger.warning(
+                    f"No MQTT acknowledgements received for "
+                    f"{settings.MQTT_INFLIGHT_TIMEOUT}s, resuming publishing"
+                )
+                self._inflight = 0
+            return max(settings.MQTT_MAX_INFLIGHT - self._inflight, 1)
+
+    def _notify_publish_latency(self, latency: float) -> None:
+        self.publish_latency.record(
+            latency,
+            attributes={
+                "robot_name": settings.ROBOT_NAME,
+                "isar_id": settings.ISAR_ID,
+                "lane": self.lane,
+            },
+        )
+        for listener in self.publish_latency_listeners:
+            listener(latency)
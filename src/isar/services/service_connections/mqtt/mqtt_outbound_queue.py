@@ -0,0 +1,454 @@
+import logging
+import math
+import sqlite3
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import IntEnum
+from pathlib import Path
+from queue import Queue
+
+from opentelemetry import metrics
+from opentelemetry.metrics import CallbackOptions, Counter, Meter, Observation
+from paho.mqtt.properties import Properties
+
+from isar.config.settings import settings
+from robot_interface.telemetry.mqtt_client import (
+    MQTTQueueType,
+    props_expiry,
+    publish_properties,
+    topic_class,
+)
+
+_SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    priority INTEGER NOT NULL,
+    topic TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    qos INTEGER NOT NULL,
+    retain INTEGER NOT NULL,
+    expiry_interval INTEGER,
+    enqueued_at REAL NOT NULL
+);
+"""
+
+# Seconds between scans of the queue for expired messages
+EXPIRY_SCAN_INTERVAL: float = 1.0
+
+# Lane of the messages which are not routed to one of MQTT_CONNECTION_LANES
+DEFAULT_LANE: str = "default"
+
+
+class MessagePriority(IntEnum):
+    """Lower values are published first"""
+
+    STATE = 0
+    RESULT = 1
+    TELEMETRY = 2
+
+
+@dataclass(eq=False)
+class _QueuedMessage:
+    item: MQTTQueueType
+    priority: MessagePriority
+    # Wall clock time, as persisted messages outlive the process
+    enqueued_at: float
+    expiry_interval: int | None
+    row_id: int | None = None
+
+
+class MqttOutboundQueue(Queue[MQTTQueueType]):
+    """Bounded queue of the messages waiting to be published to the MQTT broker.
+
+    Messages are published by priority: status, mission and task messages first,
+    then inspection results and finally telemetry, and in the order they were put
+    within a priority. When the queue is full the oldest message of the lowest
+    priority is dropped, so a long outage discards stale telemetry rather than
+    mission updates. Messages whose MQTT message expiry interval has passed are
+    dropped as well, and the expiry of the remaining messages is reduced by the
+    time they spent in the queue.
+
+    Telemetry which is not retained is coalesced by topic: a new message replaces
+    the unsent message to the same topic in its place in the queue, so that a slow
+    broker receives the latest pose rather than a backlog of stale ones.
+
+    State messages and inspection results are optionally written to an SQLite
+    database, so that they survive a restart of ISAR. A message is removed from
+    the database once it has been taken from the queue for publishing, before the
+    broker has acknowledged it. From then on the MQTT client holds the message in
+    memory and resends it after a reconnect, but a message which is in flight when
+    ISAR stops is lost.
+
+    Messages to the topic classes of an additional connection lane are passed on
+    to the queue of that lane when they are put, see add_lane.
+
+    Putting a message never blocks.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = settings.MQTT_QUEUE_MAX_SIZE,
+        persistence_path: str = settings.MQTT_QUEUE_PERSISTENCE_PATH,
+        coalesce_telemetry: bool = settings.MQTT_COALESCE_TELEMETRY,
+        lane: str = DEFAULT_LANE,
+        observe: bool = True,
+    ) -> None:
+        self.logger = logging.getLogger("mqtt_client")
+        self.lane: str = lane
+        self.capacity: int = maxsize
+        self.persistence_path: str = persistence_path
+        self.coalesce_telemetry: bool = coalesce_telemetry
+        self.superseded: int = 0
+        self._connection: sqlite3.Connection | None = None
+        self._dropping: bool = False
+        self._last_expiry_scan: float = 0.0
+        self._lanes: dict[str, MqttOutboundQueue] = {}
+        # The queue is unbounded from the point of view of Queue, which would
+        # otherwise block when full. The capacity is enforced in _put instead
+        super().__init__(maxsize=0)
+
+        meter: Meter = metrics.get_meter("isar.mqtt")
+        if observe:
+            # Reports the queues of all lanes, as a gauge only keeps the callbacks
+            # it was first created with
+            meter.create_observable_gauge(
+                name="isar.mqtt.queued_messages",
+                callbacks=[self._observe_queued_messages],
+                description="Messages waiting to be published to the MQTT broker",
+            )
+        self.dropped_messages: Counter = meter.create_counter(
+            name="isar.mqtt.dropped_messages",
+            description="Messages dropped from the MQTT outbound queue while it was "
+            "full or after they had expired",
+        )
+        self.superseded_messages: Counter = meter.create_counter(
+            name="isar.mqtt.superseded_messages",
+            description="Telemetry messages replaced by a newer message to the same "
+            "topic before they were published",
+        )
+
+    def add_lane(self, lane: str, topic_classes: list[str]) -> MqttOutboundQueue:
+        """Create the queue of an additional connection lane, to which messages to
+        the given topic classes are passed on from now on. The topic class is the
+        level of the topic after isar/<ISAR_ID>, such as "pose" or "task". The lane
+        queue has the same configuration as this queue, and its own database when
+        messages are persisted"""
+        queue: MqttOutboundQueue = MqttOutboundQueue(
+            maxsize=self.capacity,
+            persistence_path=_lane_persistence_path(self.persistence_path, lane),
+            coalesce_telemetry=self.coalesce_telemetry,
+            lane=lane,
+            observe=False,
+        )
+        for lane_topic_class in topic_classes:
+            self._lanes[lane_topic_class] = queue
+        return queue
+
+    def put(
+        self, item: MQTTQueueType, block: bool = True, timeout: float | None = None
+    ) -> None:
+        if self._lanes:
+            lane: MqttOutboundQueue | None = self._lanes.get(topic_class(item[0]))
+            if lane is not None:
+                lane.put(item, block, timeout)
+                return
+        super().put(item, block, timeout)
+
+    def get_batch(
+        self, max_items: int, timeout: float | None = None
+    ) -> list[MQTTQueueType]:
+        """Wait up to timeout seconds for a message and return it together with the
+        messages queued behind it, at most max_items in total"""
+        with self.not_empty:
+            if not self.not_empty.wait_for(self._qsize, timeout=timeout):
+                return []
+            batch: list[MQTTQueueType] = []
+            while len(batch) < max_items and self._qsize():
+                batch.append(self._get())
+            return batch
+
+    def requeue(self, item: MQTTQueueType) -> None:
+        """Put a message taken from the queue back in front of its priority, for
+        instance when the connection was lost before it could be published"""
+        with self.not_empty:
+            self._enqueue(item, front=True)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+    def _init(self, maxsize: int) -> None:
+        self._queues: dict[MessagePriority, deque[_QueuedMessage]] = {
+            priority: deque() for priority in MessagePriority
+        }
+        # Unsent telemetry per topic which newer messages to the topic replace
+        self._coalesced: dict[str, _QueuedMessage] = {}
+        self._priorities: dict[str, MessagePriority] = {
+            settings.TOPIC_ISAR_STATUS: MessagePriority.STATE,
+            settings.TOPIC_ISAR_MISSION: MessagePriority.STATE,
+            settings.TOPIC_ISAR_MISSION_ABORTED: MessagePriority.STATE,
+            settings.TOPIC_ISAR_TASK: MessagePriority.STATE,
+            settings.TOPIC_ISAR_LATEST_MISSION: MessagePriority.STATE,
+            settings.TOPIC_ISAR_INTERVENTION_NEEDED: MessagePriority.STATE,
+            settings.TOPIC_ISAR_STARTUP: MessagePriority.STATE,
+            settings.TOPIC_ISAR_ROBOT_INFO: MessagePriority.STATE,
+            settings.TOPIC_ISAR_INSPECTION_RESULT: MessagePriority.RESULT,
+            settings.TOPIC_ISAR_INSPECTION_VALUE: MessagePriority.RESULT,
+            settings.TOPIC_ISAR_INSPECTION_PREVIEW: MessagePriority.RESULT,
+        }
+        if self.persistence_path:
+            self._restore()
+
+    def _qsize(self) -> int:
+        self._drop_expired()
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _put(self, item: MQTTQueueType) -> None:
+        self._enqueue(item, front=False)
+
+    def _enqueue(self, item: MQTTQueueType, front: bool) -> None:
+        topic, _, _, retain, properties = _unpack(item)
+        message: _QueuedMessage = _QueuedMessage(
+            item=item,
+            priority=self._priority(topic),
+            enqueued_at=time.time(),
+            expiry_interval=_expiry_interval(properties),
+        )
+        coalesce: bool = (
+            self.coalesce_telemetry
+            and message.priority == MessagePriority.TELEMETRY
+            and not retain
+        )
+        if coalesce and (unsent := self._coalesced.get(topic)) is not None:
+            # A requeued message is older than the unsent one and is discarded
+            if not front:
+                unsent.item = message.item
+                unsent.enqueued_at = message.enqueued_at
+                unsent.expiry_interval = message.expiry_interval
+            self._supersede(topic)
+            return
+
+        if 0 < self.capacity <= self._qsize() and not self._make_room(message.priority):
+            self._drop(message, "the queue is full")
+            return
+        self._persist(message)
+        if front:
+            self._queues[message.priority].appendleft(message)
+        else:
+            self._queues[message.priority].append(message)
+        if coalesce:
+            self._coalesced[topic] = message
+
+    def _get(self) -> MQTTQueueType:
+        self._dropping = False
+        for queue in self._queues.values():
+            if queue:
+                message: _QueuedMessage = queue.popleft()
+                # The MQTT client takes over the message, see the class docstring
+                self._forget(message)
+                return _with_remaining_expiry(message)
+        raise IndexError("get from an empty MqttOutboundQueue")
+
+    def _priority(self, topic: str) -> MessagePriority:
+        priority: MessagePriority | None = self._priorities.get(topic)
+        if priority is None:
+            # The topics of missions and tasks end with the id of the mission or task
+            priority = self._priorities.get(
+                topic.rsplit("/", 1)[0], MessagePriority.TELEMETRY
+            )
+        return priority
+
+    def _make_room(self, priority: MessagePriority) -> bool:
+        """Drop the oldest message of the lowest priority, unless that is more
+        important than a new message of the given priority"""
+        for lowest in reversed(MessagePriority):
+            if lowest < priority:
+                return False
+            if self._queues[lowest]:
+                self._drop(self._queues[lowest].popleft(), "the queue is full")
+                return True
+        return False
+
+    def _drop_expired(self) -> None:
+        now: float = time.time()
+        if now - self._last_expiry_scan < EXPIRY_SCAN_INTERVAL:
+            return
+        self._last_expiry_scan = now
+        for queue in self._queues.values():
+            expired: list[_QueuedMessage] = [
+                message for message in queue if _expired(message, now)
+            ]
+            for message in expired:
+                queue.remove(message)
+                self._drop(message, "they have expired")
+
+    def _supersede(self, topic: str) -> None:
+        self.superseded += 1
+        self.superseded_messages.add(
+            1,
+            attributes={
+                "robot_name": settings.ROBOT_NAME,
+                "isar_id": settings.ISAR_ID,
+                "topic": topic,
+                "lane": self.lane,
+            },
+        )
+
+    def _drop(self, message: _QueuedMessage, reason: str) -> None:
+        self._forget(message)
+        self.dropped_messages.add(
+            1,
+            attributes={
+                "robot_name": settings.ROBOT_NAME,
+                "isar_id": settings.ISAR_ID,
+                "priority": message.priority.name.lower(),
+                "lane": self.lane,
+            },
+        )
+        if message.priority != MessagePriority.TELEMETRY and not self._dropping:
+            # Logged once until the queue recovers, as a long outage drops many
+            self._dropping = True
+            self.logger.warning(
+                f"Dropping MQTT messages to {_unpack(message.item)[0]} and others "
+                f"because {reason}"
+            )
+
+    def _persist(self, message: _QueuedMessage) -> None:
+        if not self.persistence_path or message.priority == MessagePriority.TELEMETRY:
+            return
+        topic, payload, qos, retain, _ = _unpack(message.item)
+        try:
+            with self._connect() as connection:
+                message.row_id = connection.execute(
+                    "INSERT INTO messages (priority, topic, payload, qos, retain, "
+                    "expiry_interval, enqueued_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        int(message.priority),
+                        topic,
+                        payload,
+                        qos,
+                        int(retain),
+                        message.expiry_interval,
+                        message.enqueued_at,
+                    ),
+                ).lastrowid
+        except sqlite3.Error as e:
+            self.logger.warning(f"Failed to persist MQTT message to {topic}: {e}")
+
+    def _forget(self, message: _QueuedMessage) -> None:
+        topic: str = _unpack(message.item)[0]
+        if self._coalesced.get(topic) is message:
+            del self._coalesced[topic]
+        if message.row_id is None:
+            return
+        try:
+            with self._connect() as connection:
+                connection.execute(
+                    "DELETE FROM messages WHERE id = ?", (message.row_id,)
+                )
+        except sqlite3.Error as e:
+            self.logger.warning(f"Failed to remove persisted MQTT message: {e}")
+
+    def _restore(self) -> None:
+        try:
+            with self._connect() as connection:
+                rows: list[tuple] = connection.execute(
+                    "SELECT id, priority, topic, payload, qos, retain, "
+                    "expiry_interval, enqueued_at FROM messages ORDER BY id"
+                ).fetchall()
+        except sqlite3.Error as e:
+            self.logger.warning(f"Failed to restore persisted MQTT messages: {e}")
+            return
+
+        for row_id, priority, topic, payload, qos, retain, expiry, enqueued_at in rows:
+            properties: Properties | None = (
+                props_expiry(expiry) if expiry is not None else None
+            )
+            self._queues[MessagePriority(priority)].append(
+                _QueuedMessage(
+                    item=(topic, payload, qos, bool(retain), properties),
+                    priority=MessagePriority(priority),
+                    enqueued_at=enqueued_at,
+                    expiry_interval=expiry,
+                    row_id=row_id,
+                )
+            )
+        if rows:
+            self.logger.info(f"Restored {len(rows)} persisted MQTT messages")
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            path: Path = Path(self.persistence_path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(_SCHEMA)
+        return self._connection
+
+    def _observe_queued_messages(self, _: CallbackOptions) -> list[Observation]:
+        observations: list[Observation] = []
+        for queue in [self, *dict.fromkeys(self._lanes.values())]:
+            with queue.mutex:
+                observations.extend(
+                    Observation(
+                        value=len(messages),
+                        attributes={
+                            "robot_name": settings.ROBOT_NAME,
+                            "isar_id": settings.ISAR_ID,
+                            "priority": priority.name.lower(),
+                            "lane": queue.lane,
+                        },
+                    )
+                    for priority, messages in queue._queues.items()
+                )
+        return observations
+
+
+def _lane_persistence_path(persistence_path: str, lane: str) -> str:
+    if not persistence_path:
+        return ""
+    path: Path = Path(persistence_path)
+    return str(path.with_stem(f"{path.stem}_{lane}"))
+
+
+def _unpack(item: MQTTQueueType) -> MQTTQueueType:
+    if len(item) == 4:
+        topic, payload, qos, retain = item  # type: ignore[misc]
+        return topic, payload, qos, retain, None
+    return item
+
+
+def _expiry_interval(properties: Properties | None) -> int | None:
+    if properties is None:
+        return None
+    return getattr(properties, "MessageExpiryInterval", None)
+
+
+def _expired(message: _QueuedMessage, now: float) -> bool:
+    if message.expiry_interval is None:
+        return False
+    return message.enqueued_at + message.expiry_interval <= now
+
+
+def _with_remaining_expiry(message: _QueuedMessage) -> MQTTQueueType:
+    if message.expiry_interval is None:
+        return message.item
+    # Rounded up, so that a message is never announced as expiring before it does
+    remaining: int = math.ceil(
+        message.enqueued_at + message.expiry_interval - time.time()
+    )
+    if remaining >= message.expiry_interval:
+        return message.item
+    topic, payload, qos, retain, properties = _unpack(message.item)
+    # The properties of the message may be shared with other messages, so they are
+    # replaced rather than modified. Messages which expired since the last scan are
+    # sent with the shortest expiry
+    return (
+        topic,
+        payload,
+        qos,
+        retain,
+        publish_properties(
+            expiry=max(remaining, 1),
+            content_type=getattr(properties, "ContentType", None),
+        ),
+    )
@@ -1,30 +1,30 @@
-import time
 from datetime import UTC, datetime
 from queue import Queue
 
 from isar.config.settings import settings
-from isar.services.service_connections.mqtt.mqtt_client import props_expiry
-from robot_interface.telemetry.mqtt_client import MqttPublisher
-from robot_interface.telemetry.payloads import RobotHeartbeatPayload
+from robot_interface.telemetry.mqtt_client import MqttPublisher, props_expiry
+from robot_interface.telemetry.payload_encoder import PayloadEncoder, payload_encoder
+from robot_interface.telemetry.scheduler import TelemetrySource
 
 
 class RobotHeartbeatPublisher:
     def __init__(self, mqtt_queue: Queue):
         self.mqtt_publisher: MqttPublisher = MqttPublisher(mqtt_queue=mqtt_queue)
 
-    def run(self) -> None:
-        while True:
-            payload: RobotHeartbeatPayload = RobotHeartbeatPayload(
-                isar_id=settings.ISAR_ID,
-                robot_name=settings.ROBOT_NAME,
-                timestamp=datetime.now(UTC),
-            )
+    def telemetry_source(self) -> TelemetrySource:
+        return TelemetrySource(
+            name="robot_heartbeat",
+            interval=settings.ROBOT_HEARTBEAT_PUBLISH_INTERVAL,
+            publish=self.publish,
+        )
 
-            self.mqtt_publisher.publish(
-                topic=settings.TOPIC_ISAR_ROBOT_HEARTBEAT,
-                payload=payload.model_dump_json(),
-                retain=False,
-                properties=props_expiry(settings.MQTT_ROBOT_HEARTBEAT_EXPIRY),
-            )
+    def publish(self) -> None:
+        # Encodes a RobotHeartbeatPayload
+        encoder: PayloadEncoder = payload_encoder(settings.ISAR_ID, settings.ROBOT_NAME)
 
-            time.sleep(settings.ROBOT_HEARTBEAT_PUBLISH_INTERVAL)
+        self.mqtt_publisher.publish(
+            topic=settings.TOPIC_ISAR_ROBOT_HEARTBEAT,
+            payload=encoder.encode(timestamp=datetime.now(UTC)),
+            retain=False,
+            properties=props_expiry(settings.MQTT_ROBOT_HEARTBEAT_EXPIRY),
+        )
@@ -5,30 +5,57 @@ from queue import Queue
 from isar.config.settings import robot_settings, settings
 from robot_interface.telemetry.mqtt_client import MqttPublisher
 from robot_interface.telemetry.payloads import RobotInfoPayload
+from robot_interface.telemetry.scheduler import TelemetrySource
 
 
 class RobotInfoPublisher:
     def __init__(self, mqtt_queue: Queue):
         self.mqtt_publisher: MqttPublisher = MqttPublisher(mqtt_queue=mqtt_queue)
+        self.published: RobotInfoPayload | None = None
+        # Monotonic time of the last publish
+        self._published_at: float = 0.0
 
-    def run(self) -> None:
-        while True:
-            payload: RobotInfoPayload = RobotInfoPayload(
-                isar_id=settings.ISAR_ID,
-                robot_name=settings.ROBOT_NAME,
-                robot_model=robot_settings.ROBOT_MODEL,  # type: ignore
-                robot_serial_number=settings.SERIAL_NUMBER,
-                robot_asset=settings.PLANT_SHORT_NAME,
-                documentation=settings.DOCUMENTATION,
-                host=settings.API_HOST_VIEWED_EXTERNALLY,
-                port=settings.API_PORT,
-                capabilities=robot_settings.CAPABILITIES,
-                timestamp=datetime.now(UTC),
-            )
+    def telemetry_source(self) -> TelemetrySource:
+        return TelemetrySource(
+            name="robot_info",
+            interval=settings.ROBOT_INFO_PUBLISH_INTERVAL,
+            publish=self.publish,
+        )
+
+    def publish(self, now: float | None = None) -> None:
+        if now is None:
+            now = time.monotonic()
+        payload: RobotInfoPayload = RobotInfoPayload(
+            isar_id=settings.ISAR_ID,
+            robot_name=settings.ROBOT_NAME,
+            robot_model=robot_settings.ROBOT_MODEL,  # type: ignore
+            robot_serial_number=settings.SERIAL_NUMBER,
+            robot_asset=settings.PLANT_SHORT_NAME,
+            documentation=settings.DOCUMENTATION,
+            host=settings.API_HOST_VIEWED_EXTERNALLY,
+            port=settings.API_PORT,
+            capabilities=robot_settings.CAPABILITIES,
+            timestamp=datetime.now(UTC),
+        )
 
+        # Retained, so that it is only published again when it has changed, or once
+        # MQTT_TELEMETRY_MAX_SILENCE seconds have passed in case the broker has lost
+        # the retained message
+        if (
+            self.published is None
+            or _changed(self.published, payload)
+            or now - self._published_at >= settings.MQTT_TELEMETRY_MAX_SILENCE
+        ):
             self.mqtt_publisher.publish(
                 topic=settings.TOPIC_ISAR_ROBOT_INFO,
                 payload=payload.model_dump_json(),
+                qos=1,
+                retain=True,
             )
+            self.published = payload
+            self._published_at = now
+
 
-            time.sleep(settings.ROBOT_INFO_PUBLISH_INTERVAL)
+def _changed(published: RobotInfoPayload, payload: RobotInfoPayload) -> bool:
+    exclude: set[str] = {"timestamp"}
+    return payload.model_dump(exclude=exclude) != published.model_dump(exclude=exclude)
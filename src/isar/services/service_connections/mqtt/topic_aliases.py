@@ -0,0 +1,93 @@
+import copy
+import logging
+from functools import lru_cache
+from threading import RLock
+
+from paho.mqtt import client as mqtt
+from paho.mqtt.client import Client
+from paho.mqtt.packettypes import PacketTypes
+from paho.mqtt.properties import Properties
+
+from isar.config.settings import settings
+
+
+class TopicAliases:
+    """Replaces the topics of published messages with MQTTv5 topic aliases.
+
+    The first message on a topic carries both the topic and a newly assigned alias,
+    later messages only the alias. The broker announces the number of aliases it
+    accepts in the CONNACK, and the aliases are only valid for that connection, so
+    they are assigned anew after every reconnect. Topics are given aliases in the
+    order they are first published, which favours the telemetry topics published
+    continuously from startup.
+
+    Only QoS 0 messages are sent with an alias. Unacknowledged QoS 1 and 2 messages
+    are resent unchanged by paho after a reconnect, where an alias without its
+    topic would be a protocol error.
+    """
+
+    def __init__(self, maximum: int = settings.MQTT_TOPIC_ALIAS_MAXIMUM) -> None:
+        self.logger = logging.getLogger("mqtt_client")
+        self.maximum: int = maximum
+        # Held while publishing, so that a reconnect cannot reset the aliases
+        # between assigning an alias to a message and sending it
+        self._lock: RLock = RLock()
+        self._available: int = 0
+        self._aliases: dict[str, int] = {}
+
+    def connected(self, properties: Properties | None) -> None:
+        broker_maximum: int = getattr(properties, "TopicAliasMaximum", 0)
+        with self._lock:
+            self._aliases = {}
+            self._available = min(self.maximum, broker_maximum)
+        if self._available:
+            self.logger.info(f"Using up to {self._available} MQTT topic aliases")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._aliases = {}
+            self._available = 0
+
+    def publish(
+        self,
+        client: Client,
+        topic: str,
+        payload: str | bytes,
+        qos: int,
+        retain: bool,
+        properties: Properties | None,
+    ) -> mqtt.MQTTMessageInfo:
+        with self._lock:
+            alias: int | None = self._aliases.get(topic) if qos == 0 else None
+            publish_topic: str = topic
+            if alias is not None:
+                publish_topic = ""
+            elif qos == 0 and len(self._aliases) < self._available:
+                alias = len(self._aliases) + 1
+                self._aliases[topic] = alias
+
+            message_info: mqtt.MQTTMessageInfo = client.publish(
+                topic=publish_topic,
+                payload=payload,
+                qos=qos,
+                retain=retain,
+                properties=(
+                    properties if alias is None else _with_alias(properties, alias)
+                ),
+            )
+            if alias is not None and message_info.rc != mqtt.MQTT_ERR_SUCCESS:
+                # The connection is lost, and with it the aliases
+                self.reset()
+            return message_info
+
+
+@lru_cache(maxsize=256)
+def _with_alias(properties: Properties | None, alias: int) -> Properties:
+    # Properties are shared between messages, so the alias is set on a copy
+    aliased: Properties = (
+        copy.copy(properties)
+        if properties is not None
+        else Properties(PacketTypes.PUBLISH)
+    )
+    aliased.TopicAlias = alias
+    return aliased
@@ -1,9 +1,10 @@
 from datetime import UTC, datetime
 from queue import Queue
+from typing import Any
 
 from isar.config.settings import settings
 from isar.models.status import IsarStatus
-from isar.services.service_connections.mqtt.mqtt_client import props_expiry
+from isar.services.service_connections.mqtt.mission_topics import mission_topics
 from robot_interface.models.exceptions.robot_exceptions import ErrorMessage
 from robot_interface.models.mission.status import MissionStatus
 from robot_interface.models.mission.task import TASKS
@@ -11,14 +12,13 @@ from robot_interface.telemetry.mqtt_client import (
     MqttClientInterface,
     MqttPublisher,
     MQTTQueueType,
+    props_expiry,
 )
-from robot_interface.telemetry.payloads import (
-    InterventionNeededPayload,
-    IsarStatusPayload,
-    MissionAbortedPayload,
-    MissionPayload,
-    TaskPayload,
-)
+from robot_interface.telemetry.payload_encoder import PayloadEncoder, payload_encoder
+
+# The payloads are encoded directly rather than through the models in
+# robot_interface.telemetry.payloads. The fields are given in the order of the model
+# named above each payload, which yields the same JSON as model_dump_json.
 
 
 def publish_task_status(
@@ -27,27 +27,39 @@ def publish_task_status(
     """Publishes the task status to the MQTT Broker"""
 
     error_message: ErrorMessage | None = task.error_message
-
-    payload: TaskPayload = TaskPayload(
-        isar_id=settings.ISAR_ID,
-        robot_name=settings.ROBOT_NAME,
-        mission_id=mission_id,
-        task_id=task.id if task else None,
-        status=task.status if task else None,
-        task_type=task.type if task else None,
-        error_reason=error_message.error_reason if error_message else None,
-        error_description=(error_message.error_description if error_message else None),
-        timestamp=datetime.now(UTC),
+    topic: str = settings.TOPIC_ISAR_TASK + f"/{task.id}"
+    retain: bool = settings.MQTT_RETAIN_MISSION_AND_TASK_TOPICS
+    task_fields: dict[str, Any] = {
+        "task_id": task.id if task else None,
+        "status": task.status if task else None,
+        "task_type": task.type if task else None,
+        "error_reason": error_message.error_reason if error_message else None,
+        "error_description": (
+            error_message.error_description if error_message else None
+        ),
+    }
+
+    # TaskPayload
+    payload: str = _encoder().encode(
+        mission_id=mission_id, **task_fields, timestamp=datetime.now(UTC)
     )
 
     mqtt_publisher.publish(
-        topic=settings.TOPIC_ISAR_TASK + f"/{task.id}",
-        payload=payload.model_dump_json(),
+        topic=topic,
+        payload=payload,
         qos=1,
-        retain=True,
+        retain=retain,
         properties=props_expiry(settings.MQTT_MISSION_TASK_AND_STATUS_EXPIRY),
     )
 
+    if mission_id is None:
+        return
+    latest_mission: dict[str, Any] | None = mission_topics.task_published(
+        topic, retain, mission_id, task_fields
+    )
+    if latest_mission is not None:
+        _publish_latest_mission(mqtt_publisher, latest_mission)
+
 
 def publish_mission_status(
     mqtt_queue: Queue[MQTTQueueType],
@@ -57,39 +69,42 @@ def publish_mission_status(
 ) -> None:
 
     mqtt_publisher: MqttPublisher = MqttPublisher(mqtt_queue=mqtt_queue)
-
-    payload: MissionPayload = MissionPayload(
-        isar_id=settings.ISAR_ID,
-        robot_name=settings.ROBOT_NAME,
-        mission_id=mission_id,
-        status=mission_status,
-        error_reason=error_message.error_reason if error_message else None,
-        error_description=(error_message.error_description if error_message else None),
-        timestamp=datetime.now(UTC),
-    )
+    topic: str = settings.TOPIC_ISAR_MISSION + f"/{mission_id}"
+    retain: bool = settings.MQTT_RETAIN_MISSION_AND_TASK_TOPICS
+    mission_fields: dict[str, Any] = {
+        "mission_id": mission_id,
+        "status": mission_status,
+        "error_reason": error_message.error_reason if error_message else None,
+        "error_description": (
+            error_message.error_description if error_message else None
+        ),
+    }
+
+    # MissionPayload
+    payload: str = _encoder().encode(**mission_fields, timestamp=datetime.now(UTC))
 
     mqtt_publisher.publish(
-        topic=settings.TOPIC_ISAR_MISSION + f"/{mission_id}",
-        payload=payload.model_dump_json(),
+        topic=topic,
+        payload=payload,
         qos=1,
-        retain=True,
+        retain=retain,
         properties=props_expiry(settings.MQTT_MISSION_TASK_AND_STATUS_EXPIRY),
     )
 
+    _publish_latest_mission(
+        mqtt_publisher, mission_topics.mission_published(topic, retain, mission_fields)
+    )
+
 
 def publish_isar_status(
     mqtt_publisher: MqttClientInterface, status: IsarStatus
 ) -> None:
-    payload: IsarStatusPayload = IsarStatusPayload(
-        isar_id=settings.ISAR_ID,
-        robot_name=settings.ROBOT_NAME,
-        status=status,
-        timestamp=datetime.now(UTC),
-    )
+    # IsarStatusPayload
+    payload: str = _encoder().encode(status=status, timestamp=datetime.now(UTC))
 
     mqtt_publisher.publish(
         topic=settings.TOPIC_ISAR_STATUS,
-        payload=payload.model_dump_json(),
+        payload=payload,
         qos=1,
         retain=True,
         properties=props_expiry(settings.MQTT_MISSION_TASK_AND_STATUS_EXPIRY),
@@ -101,17 +116,16 @@ def publish_mission_aborted(
 ) -> None:
     mqtt_publisher: MqttPublisher = MqttPublisher(mqtt_queue=mqtt_queue)
 
-    payload: MissionAbortedPayload = MissionAbortedPayload(
-        isar_id=settings.ISAR_ID,
-        robot_name=settings.ROBOT_NAME,
+    # MissionAbortedPayload
+    payload: str = _encoder().encode(
         mission_id=current_mission_id,
-        reason=reason,
         timestamp=datetime.now(UTC),
+        reason=reason,
     )
 
     mqtt_publisher.publish(
         topic=settings.TOPIC_ISAR_MISSION_ABORTED,
-        payload=payload.model_dump_json(),
+        payload=payload,
         qos=1,
         retain=True,
         properties=props_expiry(settings.MQTT_MISSION_TASK_AND_STATUS_EXPIRY),
@@ -124,17 +138,35 @@ def publish_intervention_needed(
     """Publishes the intervention needed message to the MQTT Broker"""
     mqtt_publisher: MqttPublisher = MqttPublisher(mqtt_queue=mqtt_queue)
 
-    payload: InterventionNeededPayload = InterventionNeededPayload(
-        isar_id=settings.ISAR_ID,
-        robot_name=settings.ROBOT_NAME,
-        reason=error_message,
-        timestamp=datetime.now(UTC),
-    )
+    # InterventionNeededPayload
+    payload: str = _encoder().encode(reason=error_message, timestamp=datetime.now(UTC))
 
     mqtt_publisher.publish(
         topic=settings.TOPIC_ISAR_INTERVENTION_NEEDED,
-        payload=payload.model_dump_json(),
+        payload=payload,
         qos=1,
         retain=True,
         properties=props_expiry(settings.MQTT_MISSION_TASK_AND_STATUS_EXPIRY),
     )
+
+
+def _publish_latest_mission(
+    mqtt_publisher: MqttClientInterface, latest_mission: dict[str, Any]
+) -> None:
+    if not settings.MQTT_LATEST_MISSION_ENABLED:
+        return
+
+    # LatestMissionPayload
+    payload: str = _encoder().encode(**latest_mission, timestamp=datetime.now(UTC))
+
+    mqtt_publisher.publish(
+        topic=settings.TOPIC_ISAR_LATEST_MISSION,
+        payload=payload,
+        qos=1,
+        retain=True,
+        properties=props_expiry(settings.MQTT_MISSION_TASK_AND_STATUS_EXPIRY),
+    )
+
+
+def _encoder() -> PayloadEncoder:
+    return payload_encoder(settings.ISAR_ID, settings.ROBOT_NAME)
@@ -0,0 +1,146 @@
+import heapq
+import logging
+import time
+from io import BufferedReader, RawIOBase
+from itertools import count
+from threading import Condition
+from typing import BinaryIO
+
+from isar.config.settings import settings
+from robot_interface.models.inspection.inspection import Inspection
+
+# Lane of metadata files, which are small and sent ahead of any inspection data
+METADATA_PRIORITY: int = 0
+
+# Lane of inspection types which are not listed in UPLOAD_PRIORITY_LANES
+DEFAULT_PRIORITY: int = 1
+
+# Weight of a new latency sample in the moving average of the MQTT publish latency
+LATENCY_SMOOTHING: float = 0.2
+
+
+def upload_priority(inspection: Inspection) -> int:
+    return settings.UPLOAD_PRIORITY_LANES.get(
+        type(inspection).__name__, DEFAULT_PRIORITY
+    )
+
+
+class UploadBandwidthLimiter:
+    """Token bucket shaping the bandwidth used by uploads to blob storage.
+
+    Uploads take tokens for every chunk they send. When the bucket is empty the
+    waiting uploads are served in order of their priority lane, so metadata and
+    images are not stuck behind a large video. The rate is reduced while the MQTT
+    publish latency is above UPLOAD_THROTTLE_MQTT_LATENCY, as the uploads then
+    hold back status messages on the shared uplink, and is restored gradually once
+    the latency has recovered.
+    """
+
+    def __init__(self) -> None:
+        self.logger = logging.getLogger("uploader")
+        self.rate: float = settings.UPLOAD_BANDWIDTH_LIMIT
+        self.burst: float = settings.UPLOAD_BANDWIDTH_BURST or self.rate
+        self.throttle_factor: float = 1.0
+        self.publish_latency: float = 0.0
+
+        self._tokens: float = self.burst
+        self._last_refill: float = time.monotonic()
+        self._condition: Condition = Condition()
+        self._waiters: list[tuple[int, int]] = []
+        self._sequence = count()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    @property
+    def chunk_size(self) -> int:
+        """Largest number of bytes which may be requested at once"""
+        return max(int(self.burst), 1)
+
+    def acquire(self, size: int, priority: int = DEFAULT_PRIORITY) -> None:
+        """Block until size bytes may be sent. Size is capped at the burst size."""
+        if not self.enabled:
+            return
+
+        size = min(size, self.chunk_size)
+        waiter: tuple[int, int] = (priority, next(self._sequence))
+        with self._condition:
+            heapq.heappush(self._waiters, waiter)
+            try:
+                while True:
+                    self._refill()
+                    if self._waiters[0] == waiter and self._tokens >= size:
+                        self._tokens -= size
+                        return
+                    timeout: float | None = None
+                    if self._waiters[0] == waiter:
+                        timeout = (size - self._tokens) / self._current_rate()
+                    self._condition.wait(timeout=timeout)
+            finally:
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+
+    def throttle(self, stream: BinaryIO, priority: int = DEFAULT_PRIORITY) -> BinaryIO:
+        """Wrap a stream so that reading from it takes tokens from the bucket"""
+        if not self.enabled:
+            return stream
+        return BufferedReader(_ThrottledReader(stream, self, priority))
+
+    def observe_publish_latency(self, latency: float) -> None:
+        if settings.UPLOAD_THROTTLE_MQTT_LATENCY <= 0:
+            return
+
+        with self._condition:
+            self.publish_latency += LATENCY_SMOOTHING * (latency - self.publish_latency)
+            # Account for the tokens earned at the previous rate before changing it
+            self._refill()
+            previous_factor: float = self.throttle_factor
+            if self.publish_latency > settings.UPLOAD_THROTTLE_MQTT_LATENCY:
+                self.throttle_factor = max(
+                    self.throttle_factor / 2, settings.UPLOAD_THROTTLE_MIN_FRACTION
+                )
+            elif self.publish_latency < settings.UPLOAD_THROTTLE_MQTT_LATENCY / 2:
+                self.throttle_factor = min(self.throttle_factor * 1.25, 1.0)
+
+            if self.throttle_factor != previous_factor:
+                self.logger.debug(
+                    f"Upload bandwidth throttled to {self.throttle_factor:.0%} at an "
+                    f"MQTT publish latency of {self.publish_latency:.2f}s"
+                )
+
+    def _current_rate(self) -> float:
+        return self.rate * self.throttle_factor
+
+    def _refill(self) -> None:
+        now: float = time.monotonic()
+        self._tokens = min(
+            self.burst,
+            self._tokens + (now - self._last_refill) * self._current_rate(),
+        )
+        self._last_refill = now
+
+
+class _ThrottledReader(RawIOBase):
+    def __init__(
+        self, stream: BinaryIO, limiter: UploadBandwidthLimiter, priority: int
+    ) -> None:
+        self._stream: BinaryIO = stream
+        self._limiter: UploadBandwidthLimiter = limiter
+        self._priority: int = priority
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:  # type: ignore[override]
+        size: int = min(len(buffer), self._limiter.chunk_size)
+        data: bytes = self._stream.read(size)
+        if data:
+            self._limiter.acquire(len(data), self._priority)
+        buffer[: len(data)] = data
+        return len(data)
+
+    def close(self) -> None:
+        self._stream.close()
+        super().close()
@@ -0,0 +1,210 @@
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from queue import Queue
+from threading import Lock, Thread
+
+from isar.config.settings import settings
+from isar.storage.blob_storage import BlobStorage
+from isar.storage.local_retention import LocalStorageRetention
+from isar.storage.preview import InspectionPreview
+from isar.storage.retry_scheduler import UploadRetryScheduler, retry_delay
+from isar.storage.storage_interface import (
+    BlobStoragePath,
+    LocalStoragePath,
+    StorageException,
+    StorageInterface,
+    StoragePaths,
+)
+from isar.storage.upload_metrics import UploadMetrics
+from isar.storage.utilities import get_content_encoding
+from robot_interface.models.inspection.inspection import InspectionBlob
+from robot_interface.models.inspection.payload import FilePayload
+from robot_interface.models.mission.mission import Mission
+
+
+@dataclass
+class Replication:
+    inspection: InspectionBlob
+    mission: Mission
+    local_paths: StoragePaths[LocalStoragePath]
+    on_replicated: Callable[[StoragePaths[BlobStoragePath]], None]
+    attempts: int = 0
+
+
+@dataclass
+class PreviewReplication:
+    preview: InspectionPreview
+    mission: Mission
+    preview_storage: BlobStorage
+    on_replicated: Callable[[BlobStoragePath], None]
+
+
+class BlobReplicator:
+    """Copies inspections from local storage to blob storage in the background.
+
+    Used when tiered storage is enabled. The inspection is acknowledged as soon as
+    it is written to local storage, and this replicator uploads it to blob storage
+    one inspection at a time, reading the data back from the local copy. Failed
+    replications are retried through the upload retry scheduler. Previews are
+    uploaded on the same thread, ahead of the inspections queued after them, and
+    are not retried.
+    """
+
+    def __init__(
+        self,
+        blob_storage: StorageInterface,
+        retry_scheduler: UploadRetryScheduler,
+        retention: LocalStorageRetention | None = None,
+        metrics: UploadMetrics | None = None,
+    ) -> None:
+        self.logger = logging.getLogger("uploader")
+        self.blob_storage: StorageInterface = blob_storage
+        self.retry_scheduler: UploadRetryScheduler = retry_scheduler
+        self.retention: LocalStorageRetention | None = retention
+        self.metrics: UploadMetrics | None = metrics
+        self.queue: Queue[Replication | PreviewReplication] = Queue()
+
+        self._thread: Thread | None = None
+        self._thread_lock: Lock = Lock()
+
+    def replicate(
+        self,
+        inspection: InspectionBlob,
+        mission: Mission,
+        local_paths: StoragePaths[LocalStoragePath],
+        on_replicated: Callable[[StoragePaths[BlobStoragePath]], None],
+        task_completed_at: float | None = None,
+    ) -> None:
+        local_inspection: InspectionBlob = inspection.model_copy(
+            update={
+                "data": FilePayload(
+                    local_paths.data_path.file_path,
+                    content_encoding=get_content_encoding(inspection),
+                )
+            }
+        )
+        if self.metrics is not None:
+            self.metrics.queued(
+                type(self.blob_storage).__name__,
+                inspection.id,
+                local_paths.data_path.file_path.stat().st_size,
+                task_completed_at,
+            )
+        self.queue.put(
+            Replication(local_inspection, mission, local_paths, on_replicated)
+        )
+        self._start_if_stopped()
+
+    def replicate_preview(
+        self,
+        preview: InspectionPreview,
+        mission: Mission,
+        preview_storage: BlobStorage,
+        on_replicated: Callable[[BlobStoragePath], None],
+    ) -> None:
+        self.queue.put(
+            PreviewReplication(preview, mission, preview_storage, on_replicated)
+        )
+        self._start_if_stopped()
+
+    def pending(self) -> int:
+        return self.queue.qsize()
+
+    def run(self) -> None:
+        while True:
+            replication: Replication | PreviewReplication = self.queue.get()
+            try:
+                if isinstance(replication, PreviewReplication):
+                    self._replicate_preview(replication)
+                else:
+                    self._replicate(replication)
+            except Exception as e:  # noqa: BLE001
+                # A single failing replication must not stop the thread, which
+                # would leave the queued replications waiting for the next one
+                self.logger.error(f"Unexpected error while replicating: {e}")
+            finally:
+                self.queue.task_done()
+
+    def _start_if_stopped(self) -> None:
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = Thread(
+                    target=self.run, name="ISAR Blob Replicator", daemon=True
+                )
+                self._thread.start()
+
+    def _replicate_preview(self, replication: PreviewReplication) -> None:
+        try:
+            preview_path: BlobStoragePath = replication.preview_storage.store_preview(
+                preview=replication.preview, mission=replication.mission
+            )
+        except StorageException:
+            self.logger.warning(
+                f"Failed to upload the preview of inspection "
+                f"{str(replication.preview.id)[:8]}, continuing with the full "
+                f"inspection"
+            )
+            return
+        replication.on_replicated(preview_path)
+
+    def _replicate(self, replication: Replication) -> None:
+        endpoint: str = type(self.blob_storage).__name__
+        inspection_id: str = str(replication.inspection.id)[:8]
+        started_at: float = time.monotonic()
+        try:
+            blob_paths: StoragePaths[BlobStoragePath] = self.blob_storage.store(
+                inspection=replication.inspection, mission=replication.mission
+            )
+        except StorageException:
+            replication.attempts += 1
+            if replication.attempts >= settings.UPLOAD_FAILURE_ATTEMPTS_LIMIT:
+                self.logger.error(
+                    f"Exceeded max retries to replicate inspection {inspection_id} "
+                    f"to blob storage. It is kept in local storage."
+                )
+                if self.metrics is not None:
+                    self.metrics.failed(endpoint, replication.inspection.id)
+                return
+
+            delay: float = retry_delay(replication.attempts)
+            self.logger.warning(
+                f"Failed to replicate inspection {inspection_id} to blob storage. "
+                f"Retrying in {delay:.1f}s."
+            )
+            if self.metrics is not None:
+                self.metrics.retried(endpoint)
+            self.retry_scheduler.pause(endpoint, delay)
+            self.retry_scheduler.schedule(
+                endpoint, delay, lambda: self.queue.put(replication)
+            )
+            return
+        except Exception as e:  # noqa: BLE001
+            # Not retried, as the local copy may have been evicted or be unreadable
+            self.logger.error(
+                f"Failed to replicate inspection {inspection_id} to blob storage: {e}"
+            )
+            if self.metrics is not None:
+                self.metrics.failed(endpoint, replication.inspection.id)
+            return
+
+        self.retry_scheduler.resume(endpoint)
+        if self.metrics is not None:
+            self.metrics.committed(
+                endpoint, replication.inspection.id, time.monotonic() - started_at
+            )
+        self.logger.info(f"Replicated inspection {inspection_id} to blob storage")
+        replication.on_replicated(blob_paths)
+
+        if self.retention is not None:
+            self.retention.mark_uploaded(replication.inspection.id)
+
+        if settings.STORAGE_TIERED_DELETE_LOCAL_AFTER_REPLICATION:
+            if self.retention is not None:
+                self.retention.remove(replication.inspection.id)
+            for path in (
+                replication.local_paths.data_path,
+                replication.local_paths.metadata_path,
+            ):
+                path.file_path.unlink(missing_ok=True)
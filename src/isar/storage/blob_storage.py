@@ -2,23 +2,50 @@ import logging
 from pathlib import Path
 
 from azure.core.exceptions import ResourceExistsError
-from azure.storage.blob import BlobServiceClient, ContainerClient
+from azure.storage.blob import (
+    BlobClient,
+    BlobServiceClient,
+    ContainerClient,
+    ContentSettings,
+)
 
 from isar.config.settings import settings
+from isar.storage.bandwidth_limiter import (
+    DEFAULT_PRIORITY,
+    METADATA_PRIORITY,
+    UploadBandwidthLimiter,
+    upload_priority,
+)
+from isar.storage.compression import compress_bytes
+from isar.storage.metadata_encoder import MetadataEncoder
+from isar.storage.preview import InspectionPreview
+from isar.storage.process_pool import InspectionProcessPool
 from isar.storage.storage_interface import (
     BlobStoragePath,
     StorageException,
     StorageInterface,
     StoragePaths,
 )
-from isar.storage.utilities import construct_metadata_file, construct_paths
+from isar.storage.utilities import compute_content_md5, compute_md5, construct_paths
 from robot_interface.models.inspection.inspection import InspectionBlob
+from robot_interface.models.inspection.payload import (
+    BytesPayload,
+    InspectionPayload,
+    as_payload,
+)
 from robot_interface.models.mission.mission import Mission
 
 
 class BlobStorage(StorageInterface):
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        process_pool: InspectionProcessPool | None = None,
+        bandwidth_limiter: UploadBandwidthLimiter | None = None,
+    ) -> None:
         self.logger = logging.getLogger("uploader")
+        self.process_pool: InspectionProcessPool | None = process_pool
+        self.bandwidth_limiter: UploadBandwidthLimiter | None = bandwidth_limiter
+        self.metadata_encoder: MetadataEncoder = MetadataEncoder()
 
         self.container_client_data = self._get_container_client(
             settings.BLOB_STORAGE_ACCOUNT_DATA,
@@ -62,46 +89,101 @@ class BlobStorage(StorageInterface):
     def store(
         self, inspection: InspectionBlob, mission: Mission
     ) -> StoragePaths[BlobStoragePath]:
-        if inspection.data is None:
+        payload: InspectionPayload | None = inspection.get_payload()
+        if payload is None:
             raise StorageException("Nothing to store. The inspection data is empty")
 
         data_filename, metadata_filename = construct_paths(
             inspection=inspection, mission=mission
         )
 
-        metadata_bytes: bytes = construct_metadata_file(
+        metadata_bytes: bytes = self.metadata_encoder.encode(
             inspection=inspection, mission=mission, filename=data_filename.name
         )
 
         data_path = self._upload_file(
             filename=data_filename,
-            data=inspection.data,
+            data=payload,
             container_client=self.container_client_data,
             account_name=settings.BLOB_STORAGE_ACCOUNT_DATA,
+            priority=upload_priority(inspection),
         )
+        metadata: InspectionPayload = BytesPayload(metadata_bytes)
+        if settings.UPLOAD_METADATA_COMPRESSION:
+            try:
+                metadata = BytesPayload(
+                    compress_bytes(
+                        metadata_bytes, settings.UPLOAD_METADATA_COMPRESSION
+                    ),
+                    content_encoding=settings.UPLOAD_METADATA_COMPRESSION,
+                )
+            except Exception as e:
+                self.logger.error("Failed to compress metadata file: %s", e)
+                raise StorageException from e
+
         metadata_path = self._upload_file(
             filename=metadata_filename,
-            data=metadata_bytes,
+            data=metadata,
             container_client=self.container_client_metadata,
             account_name=settings.BLOB_STORAGE_ACCOUNT_METADATA,
+            priority=METADATA_PRIORITY,
         )
         return StoragePaths(data_path=data_path, metadata_path=metadata_path)
 
+    def store_preview(
+        self, preview: InspectionPreview, mission: Mission
+    ) -> BlobStoragePath:
+        """Upload the data of a preview. Previews have no metadata file, as they are
+        announced over MQTT rather than ingested as inspections"""
+        payload: InspectionPayload | None = preview.get_payload()
+        if payload is None:
+            raise StorageException("Nothing to store. The preview data is empty")
+
+        data_filename, _ = construct_paths(inspection=preview, mission=mission)
+        return self._upload_file(
+            filename=data_filename,
+            data=payload,
+            container_client=self.container_client_data,
+            account_name=settings.BLOB_STORAGE_ACCOUNT_DATA,
+            priority=upload_priority(preview),
+        )
+
     def _upload_file(
         self,
         filename: Path,
-        data: bytes,
+        data: bytes | InspectionPayload,
         container_client: ContainerClient,
         account_name: str,
+        priority: int = DEFAULT_PRIORITY,
     ) -> BlobStoragePath:
         blob_client = container_client.get_blob_client(filename.as_posix())
+        payload: InspectionPayload = as_payload(data)
         try:
-            blob_client.upload_blob(data=data)
+            content_md5: bytes = self._compute_content_md5(payload)
+            with payload.open() as stream:
+                if self.bandwidth_limiter is not None:
+                    stream = self.bandwidth_limiter.throttle(stream, priority)
+                blob_client.upload_blob(
+                    data=stream,
+                    length=payload.size,
+                    content_settings=ContentSettings(
+                        content_md5=content_md5,
+                        content_encoding=payload.content_encoding,
+                    ),
+                )
         except ResourceExistsError as e:
-            self.logger.error(
-                "Blob %s already exists in container. Error: %s", filename.as_posix(), e
+            if not self._existing_blob_matches(blob_client, content_md5):
+                self.logger.error(
+                    "Blob %s already exists in container with different content. "
+                    "Error: %s",
+                    filename.as_posix(),
+                    e,
+                )
+                raise StorageException from e
+            self.logger.info(
+                "Blob %s already exists with identical content, skipping upload",
+                filename.as_posix(),
             )
-            raise StorageException from e
         except Exception as e:
             self.logger.error(
                 "An unexpected error occurred while uploading blob: %s", e
@@ -113,3 +195,24 @@ class BlobStorage(StorageInterface):
             blob_container=settings.BLOB_CONTAINER,
             blob_name=blob_client.blob_name,
         )
+
+    def _compute_content_md5(self, payload: InspectionPayload) -> bytes:
+        if self.process_pool is not None and self.process_pool.should_process(payload):
+            return self.process_pool.process(compute_md5, payload)
+        return compute_content_md5(payload)
+
+    def _existing_blob_matches(
+        self, blob_client: BlobClient, content_md5: bytes
+    ) -> bool:
+        try:
+            existing_md5 = (
+                blob_client.get_blob_properties().content_settings.content_md5
+            )
+        except Exception as e:
+            self.logger.error(
+                "Unable to read properties of existing blob %s. Error: %s",
+                blob_client.blob_name,
+                e,
+            )
+            raise StorageException from e
+        return existing_md5 is not None and bytes(existing_md5) == content_md5
@@ -0,0 +1,133 @@
+import logging
+import zlib
+from collections.abc import Buffer, Iterable, Iterator
+from compression import zstd
+from concurrent.futures.process import BrokenProcessPool
+from typing import Protocol
+
+from isar.config.settings import settings
+from isar.storage.process_pool import InspectionProcessPool
+from robot_interface.models.inspection.inspection import InspectionBlob
+from robot_interface.models.inspection.payload import (
+    BytesPayload,
+    ChunkIteratorPayload,
+    InspectionPayload,
+)
+
+# File suffixes added to compressed inspections in local storage
+COMPRESSION_FILE_SUFFIXES: dict[str, str] = {"gzip": ".gz", "zstd": ".zst"}
+
+
+class _Compressor(Protocol):
+    def compress(self, data: Buffer, /) -> bytes: ...
+
+    def flush(self) -> bytes: ...
+
+
+def _create_compressor(content_encoding: str) -> _Compressor:
+    if content_encoding == "gzip":
+        # Written with a zeroed modification time, so that compressing the same
+        # data twice gives the same bytes and uploads remain idempotent
+        return zlib.compressobj(wbits=31)
+    if content_encoding == "zstd":
+        return zstd.ZstdCompressor()
+    raise ValueError(f"Unsupported compression: {content_encoding}")
+
+
+def compress_chunks(chunks: Iterable[Buffer], content_encoding: str) -> Iterator[bytes]:
+    compressor: _Compressor = _create_compressor(content_encoding)
+    for chunk in chunks:
+        if compressed := compressor.compress(chunk):
+            yield compressed
+    yield compressor.flush()
+
+
+def compress_bytes(data: Buffer, content_encoding: str) -> bytes:
+    return b"".join(compress_chunks([data], content_encoding))
+
+
+class InspectionCompressor:
+    """Compresses inspection data before it is handed to the storage handlers.
+
+    The compression is chosen per inspection type by UPLOAD_COMPRESSION and runs
+    on the calling thread, or in worker processes for large inspections. An
+    inspection is only replaced by its compressed copy if that is smaller, so
+    already compressed formats such as images are stored as they are. The content
+    encoding is carried on the payload, from where the storage handlers record it.
+    """
+
+    def __init__(self, process_pool: InspectionProcessPool | None = None) -> None:
+        self.logger = logging.getLogger("uploader")
+        self.process_pool: InspectionProcessPool | None = process_pool
+        self.compression_per_type: dict[str, str] = {}
+        for inspection_type, content_encoding in settings.UPLOAD_COMPRESSION.items():
+            if content_encoding not in COMPRESSION_FILE_SUFFIXES:
+                self.logger.warning(
+                    f"Ignoring unsupported compression {content_encoding} for "
+                    f"inspections of type {inspection_type}"
+                )
+                continue
+            self.compression_per_type[inspection_type] = content_encoding
+
+    def compress(self, inspection: InspectionBlob) -> InspectionBlob:
+        """Returns the inspection with compressed data, or the inspection itself if
+        it should not or could not be compressed"""
+        content_encoding: str | None = self.compression_per_type.get(
+            type(inspection).__name__
+        )
+        payload: InspectionPayload | None = inspection.get_payload()
+        if (
+            content_encoding is None
+            or payload is None
+            or payload.content_encoding is not None
+        ):
+            return inspection
+
+        try:
+            compressed: InspectionPayload
+            if self.process_pool is not None and self.process_pool.should_process(
+                payload
+            ):
+                compressed = self.process_pool.transform(
+                    compress_bytes,
+                    payload,
+                    content_encoding,
+                    content_encoding=content_encoding,
+                )
+            else:
+                compressed = _compress_payload(payload, content_encoding)
+        except (OSError, zlib.error, zstd.ZstdError, BrokenProcessPool) as e:
+            self.logger.warning(
+                f"Failed to compress inspection {str(inspection.id)[:8]}, storing "
+                f"it uncompressed: {e}"
+            )
+            return inspection
+
+        if compressed.size >= payload.size:
+            compressed.close()
+            return inspection
+
+        self.logger.info(
+            f"Compressed inspection {str(inspection.id)[:8]} with {content_encoding} "
+            f"from {payload.size} to {compressed.size} bytes"
+        )
+        return inspection.model_copy(update={"data": compressed})
+
+
+def _compress_payload(
+    payload: InspectionPayload, content_encoding: str
+) -> InspectionPayload:
+    if isinstance(payload, BytesPayload):
+        return BytesPayload(
+            compress_bytes(payload.data, content_encoding),
+            content_encoding=content_encoding,
+        )
+    compressed: ChunkIteratorPayload = ChunkIteratorPayload(
+        compress_chunks(payload.iter_chunks(), content_encoding),
+        content_encoding=content_encoding,
+    )
+    # Consume the chunks here, so that the compression runs before the inspection
+    # is accounted for in the memory budget rather than in the first storage
+    # handler that reads the payload
+    _ = compressed.size
+    return compressed
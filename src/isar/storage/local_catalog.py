@@ -0,0 +1,174 @@
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+
+from pydantic import BaseModel
+
+from isar.config.settings import settings
+from isar.storage.utilities import as_utc
+from robot_interface.models.inspection.inspection import InspectionBlob
+from robot_interface.models.mission.mission import Mission
+
+_SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS inspections (
+    inspection_id TEXT PRIMARY KEY,
+    mission_id TEXT NOT NULL,
+    mission_name TEXT NOT NULL,
+    tag_id TEXT,
+    inspection_type TEXT NOT NULL,
+    inspection_description TEXT,
+    timestamp TEXT NOT NULL,
+    x REAL NOT NULL,
+    y REAL NOT NULL,
+    z REAL NOT NULL,
+    data_path TEXT NOT NULL,
+    metadata_path TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS inspections_mission_id ON inspections (mission_id);
+CREATE INDEX IF NOT EXISTS inspections_tag_id ON inspections (tag_id, timestamp);
+CREATE INDEX IF NOT EXISTS inspections_type ON inspections (inspection_type);
+CREATE INDEX IF NOT EXISTS inspections_timestamp ON inspections (timestamp);
+CREATE INDEX IF NOT EXISTS inspections_data_path ON inspections (data_path);
+"""
+
+
+class CatalogEntry(BaseModel):
+    inspection_id: str
+    mission_id: str
+    mission_name: str
+    tag_id: str | None = None
+    inspection_type: str
+    inspection_description: str | None = None
+    timestamp: datetime
+    x: float
+    y: float
+    z: float
+    data_path: Path
+    metadata_path: Path
+
+
+class LocalInspectionCatalog:
+    """SQLite index of the inspections written to local storage.
+
+    Allows inspections to be looked up by mission, tag, inspection type, time and
+    robot position without walking the folder structure of local storage.
+    """
+
+    def __init__(self) -> None:
+        self.database_path: Path = Path(settings.LOCAL_STORAGE_PATH).joinpath(
+            "catalog.sqlite3"
+        )
+        self._lock: Lock = Lock()
+        self._connection: sqlite3.Connection | None = None
+
+    def add(
+        self,
+        inspection: InspectionBlob,
+        mission: Mission,
+        data_path: Path,
+        metadata_path: Path,
+    ) -> None:
+        position = inspection.metadata.robot_pose.position
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO inspections VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    inspection.id,
+                    mission.id,
+                    mission.name,
+                    inspection.metadata.tag_id,
+                    type(inspection).__name__,
+                    inspection.metadata.inspection_description,
+                    _timestamp(inspection.metadata.start_time),
+                    position.x,
+                    position.y,
+                    position.z,
+                    str(data_path),
+                    str(metadata_path),
+                ),
+            )
+
+    def get(self, inspection_id: str) -> CatalogEntry | None:
+        with self._lock:
+            row: sqlite3.Row | None = (
+                self._connect()
+                .execute(
+                    "SELECT * FROM inspections WHERE inspection_id = ?",
+                    (inspection_id,),
+                )
+                .fetchone()
+            )
+        return CatalogEntry(**row) if row is not None else None
+
+    def query(
+        self,
+        mission_id: str | None = None,
+        tag_id: str | None = None,
+        inspection_type: str | None = None,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+        x: float | None = None,
+        y: float | None = None,
+        radius: float | None = None,
+        limit: int = 100,
+    ) -> list[CatalogEntry]:
+        """Newest inspections first matching all of the given fields. The position
+        filter matches inspections taken within the radius of (x, y)."""
+        conditions: list[str] = []
+        parameters: list[str | float | int] = []
+        for column, value in (
+            ("mission_id", mission_id),
+            ("tag_id", tag_id),
+            ("inspection_type", inspection_type),
+        ):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                parameters.append(value)
+        if start_time is not None:
+            conditions.append("timestamp >= ?")
+            parameters.append(_timestamp(start_time))
+        if end_time is not None:
+            conditions.append("timestamp <= ?")
+            parameters.append(_timestamp(end_time))
+        if x is not None and y is not None and radius is not None:
+            conditions.append("(x - ?) * (x - ?) + (y - ?) * (y - ?) <= ?")
+            parameters.extend([x, x, y, y, radius * radius])
+
+        where: str = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            rows: list[sqlite3.Row] = (
+                self._connect()
+                .execute(
+                    f"SELECT * FROM inspections {where} ORDER BY timestamp DESC LIMIT ?",
+                    [*parameters, limit],
+                )
+                .fetchall()
+            )
+        return [CatalogEntry(**row) for row in rows]
+
+    def remove_path(self, path: Path) -> None:
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                "DELETE FROM inspections WHERE data_path = ? OR metadata_path = ?",
+                (str(path), str(path)),
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # Opened on first use, so that the database is only created once local
+        # storage is actually written to or queried
+        if self._connection is None:
+            self.database_path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(
+                self.database_path, check_same_thread=False
+            )
+            self._connection.row_factory = sqlite3.Row
+            with self._connection:
+                self._connection.executescript(_SCHEMA)
+        return self._connection
+
+
+def _timestamp(timestamp: datetime) -> str:
+    # Stored as fixed-width UTC strings so that they sort chronologically
+    return as_utc(timestamp).isoformat(timespec="microseconds")
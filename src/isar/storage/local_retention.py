@@ -0,0 +1,274 @@
+import logging
+import shutil
+import sqlite3
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+from threading import Lock
+
+from opentelemetry import metrics
+from opentelemetry.metrics import CallbackOptions, Counter, Meter, Observation
+
+from isar.config.settings import settings
+from isar.storage.utilities import PARTIAL_FILE_SUFFIX
+
+
+class LocalStorageRetention:
+    """Keeps the results in local storage within a disk quota.
+
+    Usage is tracked per mission folder. When the quota is exceeded, or the free
+    space on the volume drops below the watermark, whole inspections are evicted
+    starting with the least recently used mission folder. Only inspections which
+    have been uploaded to another storage are evicted, so that the local copy is
+    never the last copy of a result.
+
+    The uploaded state is kept in an SQLite database in local storage. Results
+    found on disk at startup are grouped into inspections by their metadata file,
+    and are considered pending upload unless they were recorded as uploaded.
+    """
+
+    def __init__(self) -> None:
+        self.logger = logging.getLogger("uploader")
+        self.root_folder: Path = Path(settings.LOCAL_STORAGE_PATH)
+        self.database_path: Path = self.root_folder.joinpath("retention.sqlite3")
+
+        self._lock: Lock = Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._folders: OrderedDict[Path, dict[Path, int]] = OrderedDict()
+        self._inspection_files: dict[str, list[Path]] = {}
+        self._uploaded: set[str] = set()
+        self._removal_listeners: list[Callable[[Path], None]] = []
+        self.usage_bytes: int = 0
+
+        self._scan()
+
+        meter: Meter = metrics.get_meter("isar.storage")
+        meter.create_observable_gauge(
+            name="isar.local_storage.usage_bytes",
+            callbacks=[self._observe_usage_bytes],
+            description="Bytes used by results in local storage",
+        )
+        meter.create_observable_gauge(
+            name="isar.local_storage.mission_folders",
+            callbacks=[self._observe_mission_folders],
+            description="Number of mission folders in local storage",
+        )
+        self.evicted_bytes: Counter = meter.create_counter(
+            name="isar.local_storage.evicted_bytes",
+            unit="By",
+            description="Bytes evicted from local storage by the retention policy",
+        )
+
+    def add(self, inspection_id: str, paths: list[Path]) -> None:
+        with self._lock:
+            self._inspection_files[inspection_id] = paths
+            for path in paths:
+                self._track(path)
+            if inspection_id in self._uploaded:
+                self._persist_uploaded(paths)
+        self.enforce()
+
+    def add_removal_listener(self, listener: Callable[[Path], None]) -> None:
+        """Call the listener with the path of every file deleted from local storage"""
+        self._removal_listeners.append(listener)
+
+    def mark_uploaded(self, inspection_id: str) -> None:
+        """Allow the inspection to be evicted, as it has been uploaded to another
+        storage. May be called before or after the inspection is added"""
+        with self._lock:
+            self._uploaded.add(inspection_id)
+            self._persist_uploaded(self._inspection_files.get(inspection_id, []))
+
+    def touch(self, path: Path) -> None:
+        """Mark the mission folder of the path as recently used"""
+        with self._lock:
+            if path.parent in self._folders:
+                self._folders.move_to_end(path.parent)
+
+    def remove(self, inspection_id: str) -> None:
+        with self._lock:
+            self._evict(inspection_id)
+
+    def usage_per_mission_folder(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                folder.name: sum(files.values())
+                for folder, files in self._folders.items()
+            }
+
+    def enforce(self) -> None:
+        with self._lock:
+            bytes_to_free: int = self._bytes_to_free()
+            if bytes_to_free <= 0:
+                return
+
+            inspections_per_folder: dict[Path, list[str]] = {}
+            for inspection_id, paths in self._inspection_files.items():
+                if inspection_id in self._uploaded and paths:
+                    inspections_per_folder.setdefault(paths[0].parent, []).append(
+                        inspection_id
+                    )
+
+            freed: int = 0
+            for folder in list(self._folders):
+                for inspection_id in inspections_per_folder.get(folder, []):
+                    if freed >= bytes_to_free:
+                        break
+                    freed += self._evict(inspection_id)
+
+            if freed > 0:
+                self.evicted_bytes.add(freed, attributes=_attributes())
+                self.logger.info(f"Evicted {freed} bytes from local storage")
+            if freed < bytes_to_free:
+                self.logger.warning(
+                    "Local storage is above its quota, but the remaining results have "
+                    "not been uploaded and cannot be evicted"
+                )
+
+    def _bytes_to_free(self) -> int:
+        bytes_to_free: int = 0
+        if settings.LOCAL_STORAGE_QUOTA > 0:
+            bytes_to_free = self.usage_bytes - settings.LOCAL_STORAGE_QUOTA
+        if settings.LOCAL_STORAGE_MIN_FREE_SPACE > 0 and self.root_folder.exists():
+            free_space: int = shutil.disk_usage(self.root_folder).free
+            bytes_to_free = max(
+                bytes_to_free, settings.LOCAL_STORAGE_MIN_FREE_SPACE - free_space
+            )
+        return bytes_to_free
+
+    def _scan(self) -> None:
+        if not self.root_folder.exists():
+            return
+        uploaded_paths: set[Path] = self._load_uploaded()
+        folders: list[Path] = sorted(
+            (folder for folder in self.root_folder.iterdir() if folder.is_dir()),
+            key=lambda folder: folder.stat().st_mtime,
+        )
+        for folder in folders:
+            files: list[Path] = []
+            for path in sorted(folder.iterdir(), key=lambda path: path.stat().st_mtime):
+                if not path.is_file():
+                    continue
+                if path.name.endswith(PARTIAL_FILE_SUFFIX):
+                    # Left behind by a write which was interrupted by a crash
+                    path.unlink(missing_ok=True)
+                    continue
+                self._track(path)
+                files.append(path)
+
+            # The data file of an inspection is named after its metadata file
+            for inspection_key, paths in _group_by_inspection(files).items():
+                self._inspection_files[inspection_key] = paths
+                if all(path in uploaded_paths for path in paths):
+                    self._uploaded.add(inspection_key)
+
+    def _track(self, path: Path) -> None:
+        files: dict[Path, int] = self._folders.setdefault(path.parent, {})
+        self._folders.move_to_end(path.parent)
+        size: int = path.stat().st_size
+        self.usage_bytes += size - files.get(path, 0)
+        files[path] = size
+
+    def _evict(self, inspection_id: str) -> int:
+        paths: list[Path] = self._inspection_files.pop(inspection_id, [])
+        self._uploaded.discard(inspection_id)
+        freed: int = sum(self._delete(path) for path in paths)
+        self._forget_uploaded(paths)
+        return freed
+
+    def _delete(self, path: Path) -> int:
+        files: dict[Path, int] | None = self._folders.get(path.parent)
+        if files is None or path not in files:
+            return 0
+
+        size: int = files.pop(path)
+        self.usage_bytes -= size
+        path.unlink(missing_ok=True)
+        for listener in self._removal_listeners:
+            listener(path)
+
+        if not files:
+            del self._folders[path.parent]
+            try:
+                path.parent.rmdir()
+            except OSError:
+                pass
+        return size
+
+    def _load_uploaded(self) -> set[Path]:
+        try:
+            with self._connect() as connection:
+                return {
+                    Path(path)
+                    for (path,) in connection.execute("SELECT path FROM uploaded")
+                }
+        except sqlite3.Error as e:
+            self.logger.warning(f"Failed to load the uploaded local results: {e}")
+            return set()
+
+    def _persist_uploaded(self, paths: list[Path]) -> None:
+        if not paths:
+            return
+        try:
+            with self._connect() as connection:
+                connection.executemany(
+                    "INSERT OR IGNORE INTO uploaded (path) VALUES (?)",
+                    [(str(path),) for path in paths],
+                )
+        except sqlite3.Error as e:
+            self.logger.warning(f"Failed to record uploaded local results: {e}")
+
+    def _forget_uploaded(self, paths: list[Path]) -> None:
+        if not paths:
+            return
+        try:
+            with self._connect() as connection:
+                connection.executemany(
+                    "DELETE FROM uploaded WHERE path = ?",
+                    [(str(path),) for path in paths],
+                )
+        except sqlite3.Error as e:
+            self.logger.warning(f"Failed to remove evicted local results: {e}")
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.root_folder.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(
+                self.database_path, check_same_thread=False
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS uploaded (path TEXT PRIMARY KEY)"
+            )
+        return self._connection
+
+    def _observe_usage_bytes(self, _: CallbackOptions) -> list[Observation]:
+        return [Observation(value=self.usage_bytes, attributes=_attributes())]
+
+    def _observe_mission_folders(self, _: CallbackOptions) -> list[Observation]:
+        return [Observation(value=len(self._folders), attributes=_attributes())]
+
+
+def _group_by_inspection(files: list[Path]) -> dict[str, list[Path]]:
+    """Group the files of a mission folder by the metadata file of their inspection,
+    keyed by its path. Files without a metadata file form a group of their own"""
+    groups: dict[str, list[Path]] = {
+        str(path): [path] for path in files if path.suffix == ".json"
+    }
+    for path in files:
+        if path.suffix == ".json":
+            continue
+        # The data file is named after the metadata file with its own suffixes
+        metadata_paths: list[str] = [
+            str(path.with_name(path.name[:index] + ".json"))
+            for index, character in enumerate(path.name)
+            if character == "."
+        ]
+        metadata_path: str = next(
+            (key for key in reversed(metadata_paths) if key in groups), str(path)
+        )
+        groups.setdefault(metadata_path, []).insert(0, path)
+    return groups
+
+
+def _attributes() -> dict[str, str]:
+    return {"robot_name": settings.ROBOT_NAME, "isar_id": settings.ISAR_ID}
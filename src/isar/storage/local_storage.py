@@ -1,48 +1,85 @@
 import logging
+import os
+import sqlite3
+import time
+from collections.abc import Iterable
 from pathlib import Path
+from threading import Condition, Lock, Thread
 
 from isar.config.settings import settings
+from isar.storage.compression import COMPRESSION_FILE_SUFFIXES
+from isar.storage.local_catalog import LocalInspectionCatalog
+from isar.storage.local_retention import LocalStorageRetention
+from isar.storage.metadata_encoder import MetadataEncoder
 from isar.storage.storage_interface import (
     LocalStoragePath,
     StorageException,
     StorageInterface,
     StoragePaths,
 )
-from isar.storage.utilities import construct_metadata_file, construct_paths
+from isar.storage.utilities import PARTIAL_FILE_SUFFIX, construct_paths
 from robot_interface.models.inspection.inspection import InspectionBlob
+from robot_interface.models.inspection.payload import InspectionPayload
 from robot_interface.models.mission.mission import Mission
 
 
 class LocalStorage(StorageInterface):
-    def __init__(self) -> None:
+    """Stores inspections in a folder per mission on the local file system.
+
+    Each file is written to a temporary file, synced and then renamed into place,
+    so a crash never leaves a truncated result under its final name. The renames
+    are made durable by syncing the mission folder, which is batched so that many
+    small inspections written in quick succession share one directory sync.
+    """
+
+    def __init__(
+        self,
+        retention: LocalStorageRetention | None = None,
+        catalog: LocalInspectionCatalog | None = None,
+    ) -> None:
         self.root_folder: Path = Path(settings.LOCAL_STORAGE_PATH)
+        self.retention: LocalStorageRetention | None = retention
+        self.catalog: LocalInspectionCatalog | None = catalog
         self.logger = logging.getLogger("uploader")
+        self.metadata_encoder: MetadataEncoder = MetadataEncoder()
+        self.directory_syncer: DirectorySyncer = DirectorySyncer(
+            settings.LOCAL_STORAGE_DIRECTORY_SYNC_INTERVAL
+        )
+
+        if self.retention is not None and self.catalog is not None:
+            self.retention.add_removal_listener(self.catalog.remove_path)
 
     def store(
         self, inspection: InspectionBlob, mission: Mission
     ) -> StoragePaths[LocalStoragePath]:
-        if inspection.data is None:
+        payload: InspectionPayload | None = inspection.get_payload()
+        if payload is None:
             raise StorageException("Nothing to store. The inspection data is empty")
 
         local_filename, local_metadata_filename = construct_paths(
             inspection=inspection, mission=mission
         )
 
+        if payload.content_encoding in COMPRESSION_FILE_SUFFIXES:
+            local_filename = local_filename.with_name(
+                local_filename.name
+                + COMPRESSION_FILE_SUFFIXES[payload.content_encoding]
+            )
+
         data_path: Path = self.root_folder.joinpath(local_filename)
         metadata_path: Path = self.root_folder.joinpath(local_metadata_filename)
 
         data_path.parent.mkdir(parents=True, exist_ok=True)
 
-        metadata_bytes: bytes = construct_metadata_file(
+        metadata_bytes: bytes = self.metadata_encoder.encode(
             inspection=inspection, mission=mission, filename=local_filename.name
         )
         try:
-            with (
-                open(data_path, "wb") as file,
-                open(metadata_path, "wb") as metadata_file,
-            ):
-                file.write(inspection.data)
-                metadata_file.write(metadata_bytes)
+            # Written inline, as the result must be durable before it is
+            # acknowledged. Only the directory syncs are batched
+            _write_atomically(data_path, payload.iter_chunks())
+            _write_atomically(metadata_path, [metadata_bytes])
+            self.directory_syncer.sync(data_path.parent)
         except OSError as e:
             self.logger.warning(
                 f"Failed open/write for one of the following files: \n"
@@ -54,7 +91,95 @@ class LocalStorage(StorageInterface):
                 "An unexpected error occurred while writing to local storage"
             )
             raise StorageException from e
+
+        if self.catalog is not None:
+            try:
+                self.catalog.add(inspection, mission, data_path, metadata_path)
+            except sqlite3.Error as e:
+                self.logger.warning(
+                    f"Failed to add inspection {str(inspection.id)[:8]} to the local "
+                    f"inspection catalog: {e}"
+                )
+
+        if self.retention is not None:
+            self.retention.add(inspection.id, [data_path, metadata_path])
+
         return StoragePaths(
             data_path=LocalStoragePath(file_path=data_path),
             metadata_path=LocalStoragePath(file_path=metadata_path),
         )
+
+
+class DirectorySyncer:
+    """Syncs folders to disk in batches.
+
+    Folders are collected for the given interval, after which each of them is
+    synced once, no matter how many files were renamed into it in the meantime.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.logger = logging.getLogger("uploader")
+        self.interval: float = interval
+        self._dirty: set[Path] = set()
+        self._condition: Condition = Condition()
+        self._thread: Thread | None = None
+        self._thread_lock: Lock = Lock()
+
+    def sync(self, folder: Path) -> None:
+        if self.interval <= 0:
+            self._fsync_directory(folder)
+            return
+
+        with self._condition:
+            self._dirty.add(folder)
+            self._condition.notify()
+        self._start_if_stopped()
+
+    def flush(self) -> None:
+        with self._condition:
+            folders: set[Path] = self._dirty
+            self._dirty = set()
+        for folder in folders:
+            self._fsync_directory(folder)
+
+    def run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: len(self._dirty) > 0)
+            # Let writes to the same folders accumulate before syncing
+            time.sleep(self.interval)
+            self.flush()
+
+    def _start_if_stopped(self) -> None:
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = Thread(
+                    target=self.run, name="ISAR Local Storage Syncer", daemon=True
+                )
+                self._thread.start()
+
+    def _fsync_directory(self, folder: Path) -> None:
+        try:
+            fd: int = os.open(folder, os.O_RDONLY)
+        except OSError:
+            # Directories cannot be opened for syncing on all platforms, e.g. Windows
+            return
+        try:
+            os.fsync(fd)
+        except OSError as e:
+            self.logger.warning(f"Failed to sync local storage folder {folder}: {e}")
+        finally:
+            os.close(fd)
+
+
+def _write_atomically(path: Path, chunks: Iterable[bytes]) -> None:
+    partial_path: Path = path.with_name(path.name + PARTIAL_FILE_SUFFIX)
+    try:
+        with open(partial_path, "wb") as file:
+            file.writelines(chunks)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(partial_path, path)
+    except Exception:
+        partial_path.unlink(missing_ok=True)
+        raise
@@ -0,0 +1,191 @@
+import logging
+import tempfile
+from pathlib import Path
+from threading import Condition
+
+from opentelemetry import metrics
+from opentelemetry.metrics import CallbackOptions, Meter, Observation
+
+from isar.config.settings import settings
+from isar.storage.process_pool import SharedMemoryPayload
+from robot_interface.models.inspection.inspection import InspectionBlob
+from robot_interface.models.inspection.payload import (
+    DEFAULT_CHUNK_SIZE,
+    BytesPayload,
+    ChunkIteratorPayload,
+    FilePayload,
+    InspectionPayload,
+)
+
+
+def in_memory_size(payload: InspectionPayload | None) -> int:
+    if isinstance(payload, BytesPayload | SharedMemoryPayload):
+        return payload.size
+    if isinstance(payload, ChunkIteratorPayload):
+        # Chunked payloads are spooled to disk once they exceed a single chunk
+        return min(payload.size, DEFAULT_CHUNK_SIZE)
+    return 0
+
+
+class InspectionMemoryBudget:
+    """Bounds the number of inspection bytes held in memory by the upload pipeline.
+
+    Memory is reserved before an inspection is fetched from the robot, estimated
+    from the size of the previous inspection, and new fetches wait while the budget
+    is exhausted. Once fetched, the reservation is replaced by the actual size of
+    the inspection, and an inspection which does not fit within the budget is
+    spilled to disk and uploaded from there. A copy replacing the inspection, such
+    as its compressed data, is accounted for in the same way. The reservation is
+    held until every storage handler is done with the inspection, including
+    retries.
+    """
+
+    def __init__(self) -> None:
+        self.logger = logging.getLogger("uploader")
+        self.budget: int = settings.INSPECTION_MEMORY_BUDGET
+        self.spill_folder: Path = Path(
+            settings.INSPECTION_SPILL_PATH
+            or Path(tempfile.gettempdir()).joinpath("isar-spill")
+        )
+
+        self._condition: Condition = Condition()
+        self._reserved: dict[str, int] = {}
+        self._spilled: dict[str, list[tuple[Path, int]]] = {}
+        self._fetch_estimate: int = DEFAULT_CHUNK_SIZE
+        self.in_flight_bytes: int = 0
+        self.spilled_bytes: int = 0
+
+        meter: Meter = metrics.get_meter("isar.storage")
+        meter.create_observable_gauge(
+            name="isar.uploads.in_flight_bytes",
+            callbacks=[self._observe_in_flight_bytes],
+            description="Inspection bytes held in memory by the upload pipeline",
+        )
+        meter.create_observable_gauge(
+            name="isar.uploads.spilled_bytes",
+            callbacks=[self._observe_spilled_bytes],
+            description="Inspection bytes spilled to disk while awaiting upload",
+        )
+
+    def reserve_fetch(self) -> int:
+        """Block a new fetch until its estimated size fits within the budget, and
+        reserve it. Returns the reserved bytes, which are to be handed to reserve
+        once the inspection has been fetched, or to release_fetch if it was not"""
+        with self._condition:
+            estimate: int = min(self._fetch_estimate, self.budget)
+            if not self._condition.wait_for(
+                lambda: self.in_flight_bytes + estimate <= self.budget,
+                timeout=settings.INSPECTION_MEMORY_BUDGET_WAIT,
+            ):
+                self.logger.warning(
+                    f"Inspection memory budget exhausted for "
+                    f"{settings.INSPECTION_MEMORY_BUDGET_WAIT}s, fetching anyway"
+                )
+            self.in_flight_bytes += estimate
+            return estimate
+
+    def release_fetch(self, reserved: int) -> None:
+        with self._condition:
+            self.in_flight_bytes -= reserved
+            self._condition.notify_all()
+
+    def reserve(
+        self, inspection: InspectionBlob, fetch_reservation: int = 0
+    ) -> InspectionBlob:
+        """Account for the inspection in place of the reservation made for fetching
+        it, spilling it to disk if it does not fit.
+
+        Returns the inspection that should be uploaded, which is a copy backed by a
+        file on disk if the inspection was spilled.
+        """
+        size: int = in_memory_size(inspection.get_payload())
+        with self._condition:
+            self.in_flight_bytes -= fetch_reservation
+            self._condition.notify_all()
+            # A payload on disk says nothing about the size of the next fetch, which
+            # may well be held in memory
+            if fetch_reservation and size > 0:
+                self._fetch_estimate = size
+            if inspection.id in self._reserved or inspection.id in self._spilled:
+                return inspection
+
+            # The inspection is already in memory, so waiting for the budget would
+            # not lower the peak
+            if self.in_flight_bytes + size <= self.budget:
+                self._reserved[inspection.id] = size
+                self.in_flight_bytes += size
+                return inspection
+
+        return self._spill(inspection)
+
+    def replace(
+        self, inspection: InspectionBlob, replacement: InspectionBlob
+    ) -> InspectionBlob:
+        """Account for a copy of the inspection, such as its compressed data, in
+        place of the inspection, spilling the copy to disk if it does not fit.
+
+        Returns the copy that should be uploaded.
+        """
+        size: int = in_memory_size(replacement.get_payload())
+        with self._condition:
+            self.in_flight_bytes -= self._reserved.pop(inspection.id, 0)
+            self._condition.notify_all()
+            if self.in_flight_bytes + size <= self.budget:
+                self._reserved[inspection.id] = size
+                self.in_flight_bytes += size
+                return replacement
+
+        return self._spill(replacement)
+
+    def release(self, inspection_id: str) -> None:
+        with self._condition:
+            self.in_flight_bytes -= self._reserved.pop(inspection_id, 0)
+            spilled: list[tuple[Path, int]] = self._spilled.pop(inspection_id, [])
+            self.spilled_bytes -= sum(size for _, size in spilled)
+            self._condition.notify_all()
+
+        for path, _ in spilled:
+            path.unlink(missing_ok=True)
+
+    def _spill(self, inspection: InspectionBlob) -> InspectionBlob:
+        payload: InspectionPayload | None = inspection.get_payload()
+        if payload is None:
+            return inspection
+
+        self.spill_folder.mkdir(parents=True, exist_ok=True)
+        # The compressed copy of a spilled inspection is spilled next to it
+        suffix: str = f".{payload.content_encoding}" if payload.content_encoding else ""
+        spill_path: Path = self.spill_folder.joinpath(
+            f"{inspection.id}.{inspection.metadata.file_type}{suffix}"
+        )
+        with open(spill_path, "wb") as file:
+            file.writelines(payload.iter_chunks())
+        payload.close()
+
+        self.logger.info(
+            f"Spilled inspection {str(inspection.id)[:8]} to disk as the "
+            f"inspection memory budget is exhausted"
+        )
+        with self._condition:
+            self._spilled.setdefault(inspection.id, []).append(
+                (spill_path, payload.size)
+            )
+            self.spilled_bytes += payload.size
+
+        return inspection.model_copy(
+            update={
+                "data": FilePayload(
+                    spill_path, content_encoding=payload.content_encoding
+                )
+            }
+        )
+
+    def _observe_in_flight_bytes(self, _: CallbackOptions) -> list[Observation]:
+        return [Observation(value=self.in_flight_bytes, attributes=_attributes())]
+
+    def _observe_spilled_bytes(self, _: CallbackOptions) -> list[Observation]:
+        return [Observation(value=self.spilled_bytes, attributes=_attributes())]
+
+
+def _attributes() -> dict[str, str]:
+    return {"robot_name": settings.ROBOT_NAME, "isar_id": settings.ISAR_ID}
@@ -0,0 +1,241 @@
+import json
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+
+from isar.config.settings import settings
+from isar.storage.utilities import (
+    get_content_encoding,
+    get_foldername,
+    get_mission_date,
+)
+from robot_interface.models.inspection.inspection import (
+    AcousticMeasurementMetadata,
+    Inspection,
+)
+from robot_interface.models.mission.mission import Mission
+
+INDENT: int = 4
+COMPACT_SEPARATORS: tuple[str, str] = (",", ":")
+TIMESTAMP_FORMAT: str = "%Y-%m-%dT%H:%M:%S.%f"
+
+
+@dataclass(frozen=True)
+class _MissionFragments:
+    # Everything before the inspection id
+    head: bytes
+    # The mission and robot members of additional_meta
+    mission: bytes
+    # Everything between the inspection members and the file name
+    data_files: bytes
+
+
+class MetadataEncoder:
+    """Serializes the metadata file of an inspection.
+
+    The members which are constant for a mission and robot are serialized once per
+    mission, and the members of each inspection are spliced in between them. The
+    document is written as JSON indented by four spaces, or as compact JSON,
+    optionally with orjson. orjson cannot indent by four spaces, so it is only used
+    for compact output.
+    """
+
+    def __init__(
+        self,
+        compact: bool = settings.METADATA_COMPACT_JSON,
+        backend: str = settings.METADATA_JSON_BACKEND,
+    ) -> None:
+        self.logger = logging.getLogger("uploader")
+        self.compact: bool = compact
+        self._newline: str = "" if compact else "\n"
+        self._indent: str = "" if compact else " " * INDENT
+        self._key_separator: str = ":" if compact else ": "
+        self._dump_value, self._dump_members = _serializers(
+            compact, backend, self.logger
+        )
+        self._tail: bytes = self._line(2, "}") + self._line(1, "]") + self._line(0, "}")
+        # Replaced as a whole, so that concurrent stores never see a key paired
+        # with the fragments of another mission
+        self._mission_cache: tuple[tuple, _MissionFragments] | None = None
+
+    def encode(self, inspection: Inspection, mission: Mission, filename: str) -> bytes:
+        fragments: _MissionFragments = self._get_mission_fragments(mission)
+        content_encoding: str | None = get_content_encoding(inspection)
+        return b"".join(
+            (
+                fragments.head,
+                self._dump_value(inspection.id),
+                fragments.mission,
+                b",",
+                self._dump_members(_inspection_members(inspection)),
+                fragments.data_files,
+                self._dump_value(filename),
+                (
+                    b"," + self._member(3, "content_encoding", content_encoding)
+                    if content_encoding is not None
+                    else b""
+                ),
+                self._tail,
+            )
+        )
+
+    def _get_mission_fragments(self, mission: Mission) -> _MissionFragments:
+        key: tuple = (
+            mission.id,
+            mission.name,
+            mission.start_time,
+            settings.PLANT_SHORT_NAME,
+            settings.ISAR_ID,
+            settings.ROBOT_NAME,
+        )
+        cache: tuple[tuple, _MissionFragments] | None = self._mission_cache
+        if cache is not None and cache[0] == key:
+            return cache[1]
+
+        mission_date: str = get_mission_date(mission).strftime(TIMESTAMP_FORMAT)
+        fragments: _MissionFragments = _MissionFragments(
+            head=b"".join(
+                (
+                    b"{",
+                    self._member(1, "installation_code", settings.PLANT_SHORT_NAME),
+                    b",",
+                    self._key(1, "additional_meta"),
+                    b"{",
+                    self._key(2, "inspection_id"),
+                )
+            ),
+            mission=b"".join(
+                b"," + self._member(2, name, value)
+                for name, value in (
+                    ("mission_id", mission.id),
+                    ("mission_name", mission.name),
+                    ("mission_date", mission_date),
+                    ("isar_id", settings.ISAR_ID),
+                    ("robot_name", settings.ROBOT_NAME),
+                )
+            ),
+            data_files=b"".join(
+                (
+                    self._line(1, "},"),
+                    self._key(1, "data_files"),
+                    b"[",
+                    self._line(2, "{"),
+                    self._member(3, "folder", f"/{get_foldername(mission=mission)}"),
+                    b",",
+                    self._key(3, "file_name"),
+                )
+            ),
+        )
+        self._mission_cache = (key, fragments)
+        return fragments
+
+    def _line(self, level: int, text: str) -> bytes:
+        return f"{self._newline}{self._indent * level}{text}".encode()
+
+    def _key(self, level: int, key: str) -> bytes:
+        return self._line(level, f"{json.dumps(key)}{self._key_separator}")
+
+    def _member(self, level: int, key: str, value: Any) -> bytes:
+        return self._key(level, key) + self._dump_value(value)
+
+
+def _inspection_members(inspection: Inspection) -> dict[str, Any]:
+    metadata = inspection.metadata
+    members: dict[str, Any] = {
+        "inspection_description": metadata.inspection_description,
+        "tag": metadata.tag_id,
+        "analysis_types": metadata.analysis_types,
+        "robot_pose": {
+            "position": {
+                "x": metadata.robot_pose.position.x,
+                "y": metadata.robot_pose.position.y,
+                "z": metadata.robot_pose.position.z,
+            },
+            "orientation": _orientation_string(
+                metadata.robot_pose.orientation.x,
+                metadata.robot_pose.orientation.y,
+                metadata.robot_pose.orientation.z,
+                metadata.robot_pose.orientation.w,
+            ),
+        },
+        "target_position": {
+            "x": metadata.target_position.x,
+            "y": metadata.target_position.y,
+            "z": metadata.target_position.z,
+        },
+        "timestamp": metadata.start_time,
+    }
+    if isinstance(metadata, AcousticMeasurementMetadata):
+        members["acoustic_result"] = {
+            "snr_value": metadata.snr_value,
+            "leak_rate": metadata.leak_rate,
+            "leak_rate_unit": metadata.leak_rate_unit,
+            "sound_pressure_level_at_sensor_db": metadata.sound_pressure_level_at_sensor_db,
+            "sound_pressure_level_at_source_db": metadata.sound_pressure_level_at_source_db,
+            "distance_to_source": metadata.distance_to_source,
+            "result": metadata.result,
+            "frequency_from": metadata.frequency_from,
+            "frequency_to": metadata.frequency_to,
+        }
+    return members
+
+
+@lru_cache(maxsize=256)
+def _orientation_string(x: float, y: float, z: float, w: float) -> str:
+    # Formatted as numpy prints the quaternion array, which is comparatively slow.
+    # Robots often take several inspections from the same pose
+    return str(np.array([x, y, z, w], dtype=float))
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.strftime(TIMESTAMP_FORMAT)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _serializers(
+    compact: bool, backend: str, logger: logging.Logger
+) -> tuple[Callable[[Any], bytes], Callable[[dict[str, Any]], bytes]]:
+    """Returns functions serializing a value, and the members of an object.
+
+    The members are returned without the enclosing braces, indented as members of
+    additional_meta. JSON strings never contain a raw newline, so the indentation
+    is added by replacing the newlines.
+    """
+    if not compact:
+        return lambda value: json.dumps(value).encode(), _dump_indented_members
+
+    if backend == "orjson":
+        try:
+            import orjson
+
+            return (
+                orjson.dumps,
+                lambda members: orjson.dumps(
+                    members, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME
+                )[1:-1],
+            )
+        except ModuleNotFoundError:
+            logger.warning(
+                "The orjson metadata backend is selected, but orjson is not "
+                "installed. Falling back to the json module"
+            )
+    return (
+        lambda value: json.dumps(value, separators=COMPACT_SEPARATORS).encode(),
+        _dump_compact_members,
+    )
+
+
+def _dump_indented_members(members: dict[str, Any]) -> bytes:
+    text: str = json.dumps(members, indent=INDENT, default=_default)
+    return text[1:-2].replace("\n", "\n" + " " * INDENT).encode()
+
+
+def _dump_compact_members(members: dict[str, Any]) -> bytes:
+    text: str = json.dumps(members, separators=COMPACT_SEPARATORS, default=_default)
+    return text[1:-1].encode()
@@ -0,0 +1,87 @@
+import logging
+from io import BytesIO
+from types import ModuleType
+
+from isar.config.settings import settings
+from robot_interface.models.inspection.inspection import (
+    Image,
+    ImageMetadata,
+    InspectionBlob,
+    InspectionMetadata,
+    ThermalImage,
+)
+from robot_interface.models.inspection.payload import BytesPayload, InspectionPayload
+
+# File type of the previews, which are always encoded as JPEG
+PREVIEW_FILE_TYPE: str = "jpg"
+
+
+class InspectionPreview(InspectionBlob):
+    """Downscaled copy of an image inspection, sharing the id of the inspection"""
+
+    metadata: ImageMetadata  # type: ignore
+
+    @staticmethod
+    def get_metadata_type() -> type[InspectionMetadata]:
+        return ImageMetadata
+
+
+class PreviewGenerator:
+    """Creates small JPEG previews of image inspections.
+
+    The preview is uploaded and announced over MQTT before the full resolution
+    inspection, so that operators on a slow link get a first look within seconds.
+    Decoding the images requires Pillow, which is an optional dependency. Previews
+    are not created if it is not installed.
+    """
+
+    def __init__(self) -> None:
+        self.logger = logging.getLogger("uploader")
+        self.max_size: int = settings.UPLOAD_PREVIEW_MAX_SIZE
+        self.quality: int = settings.UPLOAD_PREVIEW_QUALITY
+        self._pillow: ModuleType | None = None
+        try:
+            from PIL import Image as PillowImage
+
+            self._pillow = PillowImage
+        except ModuleNotFoundError:
+            self.logger.warning(
+                "Inspection previews are enabled, but Pillow is not installed. "
+                "No previews will be created"
+            )
+
+    def create(self, inspection: InspectionBlob) -> InspectionPreview | None:
+        """Returns a preview of the inspection, or None if it is not an image or
+        could not be decoded"""
+        if self._pillow is None or not isinstance(inspection, Image | ThermalImage):
+            return None
+        payload: InspectionPayload | None = inspection.get_payload()
+        if payload is None or payload.content_encoding is not None:
+            return None
+
+        try:
+            with payload.open() as stream, self._pillow.open(stream) as image:
+                # Lets the JPEG decoder skip detail which is lost when downscaling
+                image.draft("RGB", (self.max_size, self.max_size))
+                image.thumbnail((self.max_size, self.max_size))
+                output: BytesIO = BytesIO()
+                image.convert("RGB").save(
+                    output, format="JPEG", quality=self.quality, optimize=True
+                )
+        except (OSError, ValueError, self._pillow.DecompressionBombError) as e:
+            # Pillow raises UnidentifiedImageError, a subclass of OSError, for data
+            # it cannot decode
+            self.logger.warning(
+                f"Failed to create a preview of inspection "
+                f"{str(inspection.id)[:8]}: {e}"
+            )
+            return None
+
+        return InspectionPreview(
+            id=inspection.id,
+            metadata=ImageMetadata(
+                **inspection.metadata.model_dump(exclude={"file_type"}),
+                file_type=PREVIEW_FILE_TYPE,
+            ),
+            data=BytesPayload(output.getvalue()),
+        )
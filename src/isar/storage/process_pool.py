@@ -0,0 +1,209 @@
+import logging
+import weakref
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from io import BufferedReader, RawIOBase
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from threading import Lock
+from typing import Any, BinaryIO
+
+from isar.config.settings import settings
+from robot_interface.models.inspection.payload import FilePayload, InspectionPayload
+
+# Location of a payload as seen from a worker process. Either the path of a file
+# or the name of a shared memory block and the number of bytes used in it
+_Source = tuple[str, str, int]
+
+
+class SharedMemoryPayload(InspectionPayload):
+    """Payload held in a shared memory block created by a worker process.
+
+    The block is unlinked once the payload is closed or garbage collected.
+    """
+
+    def __init__(
+        self, name: str, size: int, content_encoding: str | None = None
+    ) -> None:
+        self.content_encoding = content_encoding
+        self._shared_memory: SharedMemory = SharedMemory(name=name)
+        self._size: int = size
+        self._finalizer = weakref.finalize(
+            self, _release_shared_memory, self._shared_memory
+        )
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def name(self) -> str:
+        return self._shared_memory.name
+
+    def open(self) -> BinaryIO:
+        return BufferedReader(_SharedMemoryReader(self))
+
+    @contextmanager
+    def memoryview(self) -> Iterator[memoryview]:
+        view: memoryview = self._shared_memory.buf[: self._size]
+        try:
+            yield view
+        finally:
+            view.release()
+
+    def close(self) -> None:
+        self._finalizer()
+
+    def _read_at(self, offset: int, size: int) -> bytes:
+        end: int = min(offset + size, self._size)
+        return bytes(self._shared_memory.buf[offset:end])
+
+
+class _SharedMemoryReader(RawIOBase):
+    def __init__(self, payload: SharedMemoryPayload) -> None:
+        self._payload: SharedMemoryPayload = payload
+        self._position: int = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:  # type: ignore[override]
+        data: bytes = self._payload._read_at(self._position, len(buffer))
+        buffer[: len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+
+class InspectionProcessPool:
+    """Runs CPU heavy processing of large inspection payloads in worker processes.
+
+    Hashing and compressing a large video on a thread holds the GIL for long
+    stretches, which stalls the state machine, the MQTT client and the API. The
+    payload is handed to the workers without pickling it: files are opened by path
+    and memory-mapped by the worker, while other payloads are copied once into a
+    shared memory block which the worker reads through a memoryview. Compressed
+    output is returned the same way.
+
+    The pool is started on first use.
+    """
+
+    def __init__(self) -> None:
+        self.logger = logging.getLogger("uploader")
+        self.min_size: int = settings.INSPECTION_PROCESS_POOL_MIN_SIZE
+        self._executor: ProcessPoolExecutor | None = None
+        self._executor_lock: Lock = Lock()
+
+    def should_process(self, payload: InspectionPayload) -> bool:
+        return 0 < self.min_size <= payload.size
+
+    def process[T](
+        self,
+        function: Callable[..., T],
+        payload: InspectionPayload,
+        *args: Any,
+    ) -> T:
+        """Call function(view, *args) in a worker with a memoryview of the payload.
+
+        The function must be defined at module level and return a small result,
+        as the result is pickled back to this process.
+        """
+        with _share(payload) as source:
+            return self._get_executor().submit(_call, function, source, args).result()
+
+    def transform(
+        self,
+        function: Callable[..., bytes],
+        payload: InspectionPayload,
+        *args: Any,
+        content_encoding: str | None = None,
+    ) -> InspectionPayload:
+        """Call function(view, *args) in a worker with a memoryview of the payload
+        and return its output as a new payload, handed back in shared memory."""
+        with _share(payload) as source:
+            name, size = (
+                self._get_executor().submit(_transform, function, source, args).result()
+            )
+        return SharedMemoryPayload(name, size, content_encoding=content_encoding)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                # Spawned rather than forked, as forking a process with running
+                # threads may leave locks held in the child
+                self._executor = ProcessPoolExecutor(
+                    max_workers=settings.INSPECTION_PROCESS_WORKERS,
+                    mp_context=get_context("spawn"),
+                )
+            return self._executor
+
+
+@contextmanager
+def _share(payload: InspectionPayload) -> Iterator[_Source]:
+    if isinstance(payload, FilePayload):
+        yield ("file", str(payload.path), payload.size)
+        return
+
+    size: int = payload.size
+    shared_memory: SharedMemory = SharedMemory(create=True, size=max(size, 1))
+    try:
+        offset: int = 0
+        for chunk in payload.iter_chunks():
+            shared_memory.buf[offset : offset + len(chunk)] = chunk
+            offset += len(chunk)
+        yield ("shared_memory", shared_memory.name, size)
+    finally:
+        _release_shared_memory(shared_memory)
+
+
+@contextmanager
+def _open_source(source: _Source) -> Iterator[memoryview]:
+    kind, location, size = source
+    if kind == "file":
+        with FilePayload(Path(location)).memoryview() as view:
+            yield view
+        return
+
+    # The block is owned by the parent process, so it must not be tracked and
+    # cleaned up when this worker exits
+    shared_memory: SharedMemory = SharedMemory(name=location, track=False)
+    shared_view: memoryview = shared_memory.buf[:size]
+    try:
+        yield shared_view
+    finally:
+        shared_view.release()
+        shared_memory.close()
+
+
+def _call(function: Callable[..., Any], source: _Source, args: tuple) -> Any:
+    with _open_source(source) as view:
+        return function(view, *args)
+
+
+def _transform(
+    function: Callable[..., bytes], source: _Source, args: tuple
+) -> tuple[str, int]:
+    with _open_source(source) as view:
+        output: bytes = function(view, *args)
+
+    # Owned by the parent process from here on, which unlinks it when done
+    shared_memory: SharedMemory = SharedMemory(
+        create=True, size=max(len(output), 1), track=False
+    )
+    shared_memory.buf[: len(output)] = output
+    shared_memory.close()
+    return shared_memory.name, len(output)
+
+
+def _release_shared_memory(shared_memory: SharedMemory) -> None:
+    try:
+        shared_memory.close()
+    except BufferError:
+        # A view of the block is still alive. The memory is freed once the last
+        # mapping is gone, so unlinking the name is still safe
+        pass
+    try:
+        shared_memory.unlink()
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,132 @@
+import heapq
+import itertools
+import logging
+import random
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from threading import Condition, Thread
+
+from isar.config.settings import settings
+
+_RetryEntry = tuple[float, int, str, Callable[[], None]]
+
+
+def retry_delay(attempt: int) -> float:
+    """Exponential backoff with jitter, capped by UPLOAD_FAILURE_MAX_WAIT.
+
+    The delay is drawn from the upper half of the backoff window so that retries
+    spread out without collapsing towards zero.
+    """
+    ceiling: float = min(2**attempt, settings.UPLOAD_FAILURE_MAX_WAIT)
+    return random.uniform(ceiling / 2, ceiling)
+
+
+class UploadRetryScheduler:
+    """Delays failed uploads without occupying a worker thread while waiting.
+
+    Retries are kept in a heap of (next_attempt_time, sequence, endpoint, job). A
+    single scheduler thread sleeps until the earliest retry is due and hands it to a
+    small worker pool. Due retries towards an endpoint that is known to be down are
+    held back until the endpoint is resumed or the pause expires.
+    """
+
+    def __init__(self) -> None:
+        self.logger = logging.getLogger("uploader")
+        self._heap: list[_RetryEntry] = []
+        self._held: dict[str, list[_RetryEntry]] = {}
+        self._sequence = itertools.count()
+        self._paused_until: dict[str, float] = {}
+        self._condition: Condition = Condition()
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=settings.UPLOAD_RETRY_WORKERS,
+            thread_name_prefix="Upload retry",
+        )
+        self._thread: Thread | None = None
+
+    def schedule(self, endpoint: str, delay: float, job: Callable[[], None]) -> None:
+        with self._condition:
+            heapq.heappush(
+                self._heap,
+                (time.monotonic() + delay, next(self._sequence), endpoint, job),
+            )
+            self._start_if_stopped()
+            self._condition.notify()
+
+    def pause(self, endpoint: str, duration: float) -> None:
+        """Hold back all retries towards the endpoint for at least the duration"""
+        with self._condition:
+            paused_until: float = time.monotonic() + duration
+            self._paused_until[endpoint] = max(
+                paused_until, self._paused_until.get(endpoint, 0)
+            )
+
+    def resume(self, endpoint: str) -> None:
+        with self._condition:
+            self._paused_until.pop(endpoint, None)
+            if self._release_held(endpoint):
+                self._condition.notify()
+
+    def is_paused(self, endpoint: str) -> bool:
+        with self._condition:
+            return self._paused_until.get(endpoint, 0) > time.monotonic()
+
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._heap) + sum(len(held) for held in self._held.values())
+
+    def run(self) -> None:
+        while True:
+            with self._condition:
+                job: Callable[[], None] | None = self._pop_due_job()
+                if job is None:
+                    self._condition.wait(timeout=self._time_until_next_job())
+                    continue
+            self._executor.submit(self._run_job, job)
+
+    def _start_if_stopped(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = Thread(
+                target=self.run, name="ISAR Upload Retry Scheduler", daemon=True
+            )
+            self._thread.start()
+
+    def _pop_due_job(self) -> Callable[[], None] | None:
+        now: float = time.monotonic()
+        for endpoint, paused_until in list(self._paused_until.items()):
+            if paused_until <= now:
+                del self._paused_until[endpoint]
+                self._release_held(endpoint)
+
+        while self._heap and self._heap[0][0] <= now:
+            entry: _RetryEntry = heapq.heappop(self._heap)
+            endpoint = entry[2]
+            if endpoint in self._paused_until:
+                self._held.setdefault(endpoint, []).append(entry)
+                continue
+            return entry[3]
+        return None
+
+    def _release_held(self, endpoint: str) -> bool:
+        held: list[_RetryEntry] = self._held.pop(endpoint, [])
+        for entry in held:
+            heapq.heappush(self._heap, entry)
+        return len(held) > 0
+
+    def _time_until_next_job(self) -> float | None:
+        wake_up_times: list[float] = [
+            self._paused_until[endpoint]
+            for endpoint in self._held
+            if endpoint in self._paused_until
+        ]
+        if self._heap:
+            wake_up_times.append(self._heap[0][0])
+        if not wake_up_times:
+            return None
+        return max(min(wake_up_times) - time.monotonic(), 0)
+
+    def _run_job(self, job: Callable[[], None]) -> None:
+        try:
+            job()
+        except Exception as e:  # noqa: BLE001
+            self.logger.error(f"Unexpected error while retrying upload: {e}")
@@ -0,0 +1,187 @@
+import time
+from dataclasses import dataclass
+from threading import Lock
+
+from opentelemetry import metrics
+from opentelemetry.metrics import (
+    CallbackOptions,
+    Counter,
+    Histogram,
+    Meter,
+    Observation,
+)
+
+from isar.apis.models.models import UploadHandlerStatusResponse
+from isar.config.settings import settings
+
+# Weight of a new upload in the moving average of the throughput per handler
+THROUGHPUT_SMOOTHING: float = 0.3
+
+
+@dataclass
+class _PendingUpload:
+    size: int
+    completed_at: float
+
+
+class UploadMetrics:
+    """Tracks the backlog and throughput of every storage handler.
+
+    Inspections are pending for a handler from the moment they are handed to the
+    uploader until the handler has stored them or given up. The latency of an
+    upload is measured from the completion of its task, which is when the robot
+    was done with the inspection, to when the handler has committed it.
+    """
+
+    def __init__(self) -> None:
+        self._lock: Lock = Lock()
+        self._pending: dict[str, dict[str, _PendingUpload]] = {}
+        self._throughput: dict[str, float] = {}
+        self._uploaded: dict[str, int] = {}
+        self._retries: dict[str, int] = {}
+        self._failures: dict[str, int] = {}
+
+        meter: Meter = metrics.get_meter("isar.storage")
+        meter.create_observable_gauge(
+            name="isar.uploads.pending",
+            callbacks=[self._observe_pending],
+            description="Inspections waiting to be stored by each storage handler",
+        )
+        meter.create_observable_gauge(
+            name="isar.uploads.pending_bytes",
+            unit="By",
+            callbacks=[self._observe_pending_bytes],
+            description="Inspection bytes waiting to be stored by each storage handler",
+        )
+        self.uploaded_bytes: Counter = meter.create_counter(
+            name="isar.uploads.bytes",
+            unit="By",
+            description="Inspection bytes stored by each storage handler",
+        )
+        self.throughput: Histogram = meter.create_histogram(
+            name="isar.uploads.throughput",
+            unit="By/s",
+            description="Bytes per second of each upload to a storage handler",
+        )
+        self.latency: Histogram = meter.create_histogram(
+            name="isar.uploads.latency",
+            unit="s",
+            description="Time from the completion of a task until its inspection "
+            "is committed by a storage handler",
+        )
+        self.retries: Counter = meter.create_counter(
+            name="isar.uploads.retries",
+            description="Uploads which failed and were scheduled for another attempt",
+        )
+        self.failures: Counter = meter.create_counter(
+            name="isar.uploads.failures",
+            description="Uploads abandoned after exceeding the maximum attempts",
+        )
+
+    def queued(
+        self,
+        handler: str,
+        inspection_id: str,
+        size: int,
+        completed_at: float | None = None,
+    ) -> None:
+        """Count the inspection as pending for the handler. The completion time is
+        taken from time.monotonic() and defaults to now."""
+        if completed_at is None:
+            completed_at = time.monotonic()
+        with self._lock:
+            self._pending.setdefault(handler, {})[inspection_id] = _PendingUpload(
+                size, completed_at
+            )
+
+    def committed(self, handler: str, inspection_id: str, duration: float) -> None:
+        """Record that the handler has stored the inspection, taking duration
+        seconds for the final attempt"""
+        with self._lock:
+            pending: _PendingUpload | None = self._pending.get(handler, {}).pop(
+                inspection_id, None
+            )
+            self._uploaded[handler] = self._uploaded.get(handler, 0) + 1
+            if pending is None:
+                return
+            throughput: float = pending.size / max(duration, 1e-6)
+            previous: float | None = self._throughput.get(handler)
+            self._throughput[handler] = (
+                throughput
+                if previous is None
+                else previous + THROUGHPUT_SMOOTHING * (throughput - previous)
+            )
+
+        attributes: dict[str, str] = _attributes(handler)
+        self.uploaded_bytes.add(pending.size, attributes=attributes)
+        self.throughput.record(throughput, attributes=attributes)
+        self.latency.record(
+            time.monotonic() - pending.completed_at, attributes=attributes
+        )
+
+    def retried(self, handler: str) -> None:
+        with self._lock:
+            self._retries[handler] = self._retries.get(handler, 0) + 1
+        self.retries.add(1, attributes=_attributes(handler))
+
+    def failed(self, handler: str, inspection_id: str) -> None:
+        with self._lock:
+            self._pending.get(handler, {}).pop(inspection_id, None)
+            self._failures[handler] = self._failures.get(handler, 0) + 1
+        self.failures.add(1, attributes=_attributes(handler))
+
+    def status(self) -> list[UploadHandlerStatusResponse]:
+        now: float = time.monotonic()
+        with self._lock:
+            handlers: set[str] = (
+                self._pending.keys()
+                | self._uploaded.keys()
+                | self._retries.keys()
+                | self._failures.keys()
+            )
+            statuses: list[UploadHandlerStatusResponse] = []
+            for handler in sorted(handlers):
+                pending: list[_PendingUpload] = list(
+                    self._pending.get(handler, {}).values()
+                )
+                statuses.append(
+                    UploadHandlerStatusResponse(
+                        handler=handler,
+                        pending_inspections=len(pending),
+                        pending_bytes=sum(upload.size for upload in pending),
+                        oldest_pending_seconds=max(
+                            (now - upload.completed_at for upload in pending),
+                            default=None,
+                        ),
+                        throughput_bytes_per_second=self._throughput.get(handler),
+                        uploaded=self._uploaded.get(handler, 0),
+                        retries=self._retries.get(handler, 0),
+                        failures=self._failures.get(handler, 0),
+                    )
+                )
+            return statuses
+
+    def _observe_pending(self, _: CallbackOptions) -> list[Observation]:
+        with self._lock:
+            return [
+                Observation(value=len(pending), attributes=_attributes(handler))
+                for handler, pending in self._pending.items()
+            ]
+
+    def _observe_pending_bytes(self, _: CallbackOptions) -> list[Observation]:
+        with self._lock:
+            return [
+                Observation(
+                    value=sum(upload.size for upload in pending.values()),
+                    attributes=_attributes(handler),
+                )
+                for handler, pending in self._pending.items()
+            ]
+
+
+def _attributes(handler: str) -> dict[str, str]:
+    return {
+        "robot_name": settings.ROBOT_NAME,
+        "isar_id": settings.ISAR_ID,
+        "handler": handler,
+    }
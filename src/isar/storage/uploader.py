@@ -1,8 +1,15 @@
 import logging
 import time
+from threading import Lock
 
 from isar.config.settings import settings
-from isar.services.service_connections.mqtt.mqtt_client import props_expiry
+from isar.storage.blob_replicator import BlobReplicator
+from isar.storage.blob_storage import BlobStorage
+from isar.storage.compression import InspectionCompressor
+from isar.storage.local_retention import LocalStorageRetention
+from isar.storage.memory_budget import InspectionMemoryBudget
+from isar.storage.preview import InspectionPreview, PreviewGenerator
+from isar.storage.retry_scheduler import UploadRetryScheduler, retry_delay
 from isar.storage.storage_interface import (
     BlobStoragePath,
     LocalStoragePath,
@@ -10,14 +17,17 @@ from isar.storage.storage_interface import (
     StorageInterface,
     StoragePaths,
 )
+from isar.storage.upload_metrics import UploadMetrics
 from robot_interface.models.inspection.inspection import (
     Inspection,
     InspectionBlob,
     InspectionValue,
 )
+from robot_interface.models.inspection.payload import InspectionPayload
 from robot_interface.models.mission.mission import Mission
-from robot_interface.telemetry.mqtt_client import MqttClientInterface
+from robot_interface.telemetry.mqtt_client import MqttClientInterface, props_expiry
 from robot_interface.telemetry.payloads import (
+    InspectionPreviewPayload,
     InspectionResultPayload,
     InspectionValuePayload,
 )
@@ -36,6 +46,14 @@ class Uploader:
         self,
         storage_handlers: list[StorageInterface],
         mqtt_publisher: MqttClientInterface,
+        retry_scheduler: UploadRetryScheduler,
+        memory_budget: InspectionMemoryBudget,
+        blob_replicator: BlobReplicator | None = None,
+        local_storage_retention: LocalStorageRetention | None = None,
+        compressor: InspectionCompressor | None = None,
+        metrics: UploadMetrics | None = None,
+        preview_generator: PreviewGenerator | None = None,
+        preview_storage: BlobStorage | None = None,
     ) -> None:
         """Initializes the uploader.
 
@@ -45,47 +63,264 @@ class Uploader:
             List of handlers for different upload options
         mqtt_publisher : MqttClientInterface
             The client used to publish results to MQTT
+        retry_scheduler : UploadRetryScheduler
+            Scheduler which re-attempts failed uploads after a backoff delay
+        memory_budget : InspectionMemoryBudget
+            Bounds the inspection bytes held in memory until uploads are done
+        blob_replicator : BlobReplicator | None
+            Replicates inspections from local storage to blob storage in the
+            background when tiered storage is enabled
+        local_storage_retention : LocalStorageRetention | None
+            Retention policy of local storage, which must not evict results that are
+            still pending upload
+        compressor : InspectionCompressor | None
+            Compresses inspection data before it is handed to the storage handlers
+        metrics : UploadMetrics | None
+            Tracks the pending uploads, throughput and failures of each handler
+        preview_generator : PreviewGenerator | None
+            Creates downscaled previews of image inspections
+        preview_storage : BlobStorage | None
+            Blob storage which previews are uploaded to ahead of the inspection
         """
         self.storage_handlers: list[StorageInterface] = storage_handlers
         self.mqtt_publisher = mqtt_publisher
+        self.retry_scheduler: UploadRetryScheduler = retry_scheduler
+        self.memory_budget: InspectionMemoryBudget = memory_budget
+        self.blob_replicator: BlobReplicator | None = blob_replicator
+        self.local_storage_retention: LocalStorageRetention | None = (
+            local_storage_retention
+        )
+        self.compressor: InspectionCompressor | None = compressor
+        self.metrics: UploadMetrics | None = metrics
+        self.preview_generator: PreviewGenerator | None = preview_generator
+        self.preview_storage: BlobStorage | None = preview_storage
         self.logger = logging.getLogger("uploader")
 
-    def upload_inspection(self, inspection: Inspection, mission: Mission) -> None:
+        self._remaining_storage_handlers: dict[str, int] = {}
+        self._pending_inspections: dict[str, list[InspectionBlob]] = {}
+        self._remaining_storage_handlers_lock: Lock = Lock()
+
+    def upload_inspection(
+        self,
+        inspection: Inspection,
+        mission: Mission,
+        task_completed_at: float | None = None,
+        memory_reservation: int = 0,
+    ) -> None:
+        """Publish or store the inspection of a task which completed at the given
+        time.monotonic(), which defaults to now. The memory_reservation is the
+        bytes reserved in the memory budget for fetching the inspection"""
+        if task_completed_at is None:
+            task_completed_at = time.monotonic()
+
+        if not isinstance(inspection, InspectionBlob):
+            self.memory_budget.release_fetch(memory_reservation)
+
         if isinstance(inspection, InspectionValue):
             _publish_inspection_value(self.mqtt_publisher, inspection)
             self.logger.info(f"Published value for inspection {str(inspection.id)[:8]}")
 
         elif isinstance(inspection, InspectionBlob):
-            for storage_handler in self.storage_handlers:
-                inspection_paths: StoragePaths | None = _upload(
-                    self.logger, storage_handler, inspection, mission
+            inspection = self.memory_budget.reserve(inspection, memory_reservation)
+            self._upload_preview(inspection, mission)
+            if self.compressor is not None:
+                compressed: InspectionBlob = self.compressor.compress(inspection)
+                if compressed is not inspection:
+                    _close_payload(inspection)
+                    inspection = self.memory_budget.replace(inspection, compressed)
+            with self._remaining_storage_handlers_lock:
+                # An inspection uploaded again before the previous upload is done
+                # keeps its reservation and payloads until both are
+                self._remaining_storage_handlers[inspection.id] = (
+                    self._remaining_storage_handlers.get(inspection.id, 0)
+                    + len(self.storage_handlers)
                 )
-
-                if inspection_paths is None:
-                    continue
-
-                if isinstance(inspection_paths.data_path, LocalStoragePath):
-                    self.logger.info("Skipping publishing when using local storage")
-                elif isinstance(
-                    inspection_paths.data_path, BlobStoragePath
-                ) and has_empty_blob_storage_path(inspection_paths):
-                    self.logger.warning(
-                        "Skipping publishing: Blob storage paths are empty for inspection %s",
-                        str(inspection.id)[:8],
-                    )
-                else:
-                    _publish_inspection_result(
-                        self.mqtt_publisher,
-                        inspection=inspection,
-                        inspection_paths=inspection_paths,
-                        mission=mission,
+                self._pending_inspections.setdefault(inspection.id, []).append(
+                    inspection
+                )
+            if self.metrics is not None:
+                for storage_handler in self.storage_handlers:
+                    self.metrics.queued(
+                        type(storage_handler).__name__,
+                        inspection.id,
+                        _payload_size(inspection),
+                        task_completed_at,
                     )
+            for storage_handler in self.storage_handlers:
+                self._upload_to_storage_handler(
+                    storage_handler, inspection, mission, task_completed_at
+                )
+            if not self.storage_handlers:
+                self._storage_handler_done(inspection)
 
         else:
             self.logger.warning(
                 f"Unable to add upload item as its type {type(inspection).__name__} is unsupported"
             )
 
+    def _upload_preview(self, inspection: InspectionBlob, mission: Mission) -> None:
+        if self.preview_generator is None or self.preview_storage is None:
+            return
+        preview: InspectionPreview | None = self.preview_generator.create(inspection)
+        if preview is None:
+            return
+
+        def publish(preview_path: BlobStoragePath) -> None:
+            _publish_inspection_preview(
+                self.mqtt_publisher,
+                inspection=inspection,
+                preview_path=preview_path,
+                mission=mission,
+            )
+
+        # In tiered storage the inspection is written locally without waiting on
+        # blob storage, so the preview is uploaded by the replicator instead
+        if self.blob_replicator is not None:
+            self.blob_replicator.replicate_preview(
+                preview, mission, self.preview_storage, on_replicated=publish
+            )
+            return
+
+        try:
+            preview_path: BlobStoragePath = self.preview_storage.store_preview(
+                preview=preview, mission=mission
+            )
+        except StorageException:
+            self.logger.warning(
+                f"Failed to upload the preview of inspection "
+                f"{str(inspection.id)[:8]}, continuing with the full inspection"
+            )
+            return
+        publish(preview_path)
+
+    def _upload_to_storage_handler(
+        self,
+        storage_handler: StorageInterface,
+        inspection: InspectionBlob,
+        mission: Mission,
+        task_completed_at: float,
+        upload_attempts: int = 0,
+    ) -> None:
+        endpoint: str = type(storage_handler).__name__
+        started_at: float = time.monotonic()
+        inspection_paths: StoragePaths | None = _upload(
+            self.logger, storage_handler, inspection, mission
+        )
+
+        if inspection_paths is None:
+            upload_attempts += 1
+            if upload_attempts >= settings.UPLOAD_FAILURE_ATTEMPTS_LIMIT:
+                self.logger.error(
+                    f"Storage handler: {endpoint} "
+                    f"exceeded max retries to upload inspection: "
+                    f"{str(inspection.id)[:8]}. Aborting upload."
+                )
+                if self.metrics is not None:
+                    self.metrics.failed(endpoint, inspection.id)
+                self._storage_handler_done(inspection)
+                return
+
+            delay: float = retry_delay(upload_attempts)
+            self.logger.warning(
+                f"Storage handler: {endpoint} "
+                f"failed to upload inspection: "
+                f"{str(inspection.id)[:8]}. "
+                f"Retrying in {delay:.1f}s."
+            )
+            if self.metrics is not None:
+                self.metrics.retried(endpoint)
+            self.retry_scheduler.pause(endpoint, delay)
+            self.retry_scheduler.schedule(
+                endpoint,
+                delay,
+                lambda: self._upload_to_storage_handler(
+                    storage_handler,
+                    inspection,
+                    mission,
+                    task_completed_at,
+                    upload_attempts,
+                ),
+            )
+            return
+
+        self.retry_scheduler.resume(endpoint)
+        if self.metrics is not None:
+            self.metrics.committed(
+                endpoint, inspection.id, time.monotonic() - started_at
+            )
+
+        if self.blob_replicator is not None and isinstance(
+            inspection_paths.data_path, LocalStoragePath
+        ):
+            self.blob_replicator.replicate(
+                inspection,
+                mission,
+                inspection_paths,
+                task_completed_at=task_completed_at,
+                on_replicated=lambda blob_paths: self._publish_stored_inspection(
+                    inspection, blob_paths, mission
+                ),
+            )
+        else:
+            self._publish_stored_inspection(inspection, inspection_paths, mission)
+
+        if (
+            self.local_storage_retention is not None
+            and self.blob_replicator is None
+            and not isinstance(inspection_paths.data_path, LocalStoragePath)
+        ):
+            self.local_storage_retention.mark_uploaded(inspection.id)
+
+        self._storage_handler_done(inspection)
+
+    def _publish_stored_inspection(
+        self,
+        inspection: InspectionBlob,
+        inspection_paths: StoragePaths,
+        mission: Mission,
+    ) -> None:
+        if isinstance(inspection_paths.data_path, LocalStoragePath):
+            self.logger.info("Skipping publishing when using local storage")
+        elif isinstance(
+            inspection_paths.data_path, BlobStoragePath
+        ) and has_empty_blob_storage_path(inspection_paths):
+            self.logger.warning(
+                "Skipping publishing: Blob storage paths are empty for inspection %s",
+                str(inspection.id)[:8],
+            )
+        else:
+            _publish_inspection_result(
+                self.mqtt_publisher,
+                inspection=inspection,
+                inspection_paths=inspection_paths,
+                mission=mission,
+            )
+
+    def _storage_handler_done(self, inspection: InspectionBlob) -> None:
+        with self._remaining_storage_handlers_lock:
+            remaining: int = self._remaining_storage_handlers.get(inspection.id, 1) - 1
+            if remaining > 0:
+                self._remaining_storage_handlers[inspection.id] = remaining
+                return
+            self._remaining_storage_handlers.pop(inspection.id, None)
+            done: list[InspectionBlob] = self._pending_inspections.pop(
+                inspection.id, [inspection]
+            )
+        for done_inspection in done:
+            _close_payload(done_inspection)
+        self.memory_budget.release(inspection.id)
+
+
+def _payload_size(inspection: InspectionBlob) -> int:
+    payload: InspectionPayload | None = inspection.get_payload()
+    return payload.size if payload is not None else 0
+
+
+def _close_payload(inspection: InspectionBlob) -> None:
+    payload: InspectionPayload | None = inspection.get_payload()
+    if payload is not None:
+        payload.close()
+
 
 def _upload(
     logger: logging.Logger,
@@ -93,36 +328,18 @@ def _upload(
     inspection: Inspection,
     mission: Mission,
 ) -> StoragePaths | None:
-    inspection_paths: StoragePaths
-    upload_attempts: int = 0
-    while upload_attempts < settings.UPLOAD_FAILURE_ATTEMPTS_LIMIT:
-        try:
-            inspection_paths = storage_handler.store(
-                inspection=inspection, mission=mission
-            )
-            logger.info(
-                f"Storage handler: {type(storage_handler).__name__} "
-                f"uploaded inspection {str(inspection.id)[:8]}"
-            )
-            return inspection_paths
-        except StorageException:
-            upload_attempts += 1
+    try:
+        inspection_paths: StoragePaths = storage_handler.store(
+            inspection=inspection, mission=mission
+        )
+    except StorageException:
+        return None
 
-            if upload_attempts < settings.UPLOAD_FAILURE_ATTEMPTS_LIMIT:
-                sleep_length = min(2**upload_attempts, settings.UPLOAD_FAILURE_MAX_WAIT)
-                logger.warning(
-                    f"Storage handler: {type(storage_handler).__name__} "
-                    f"failed to upload inspection: "
-                    f"{str(inspection.id)[:8]}. "
-                    f"Retrying in {sleep_length}s."
-                )
-                time.sleep(sleep_length)
-    logger.error(
+    logger.info(
         f"Storage handler: {type(storage_handler).__name__} "
-        f"exceeded max retries to upload inspection: "
-        f"{str(inspection.id)[:8]}. Aborting upload."
+        f"uploaded inspection {str(inspection.id)[:8]}"
     )
-    return None
+    return inspection_paths
 
 
 def _publish_inspection_value(
@@ -152,6 +369,33 @@ def _publish_inspection_value(
     )
 
 
+def _publish_inspection_preview(
+    mqtt_publisher: MqttClientInterface,
+    inspection: InspectionBlob,
+    preview_path: BlobStoragePath,
+    mission: Mission,
+) -> None:
+    payload: InspectionPreviewPayload = InspectionPreviewPayload(
+        isar_id=settings.ISAR_ID,
+        robot_name=settings.ROBOT_NAME,
+        inspection_id=inspection.id,
+        mission_id=mission.id,
+        blob_storage_preview_path=preview_path,
+        installation_code=settings.PLANT_SHORT_NAME,
+        tag_id=inspection.metadata.tag_id,
+        inspection_type=type(inspection).__name__,
+        inspection_description=inspection.metadata.inspection_description,
+        timestamp=inspection.metadata.start_time,
+    )
+    mqtt_publisher.publish(
+        topic=settings.TOPIC_ISAR_INSPECTION_PREVIEW,
+        payload=payload.model_dump_json(),
+        qos=1,
+        retain=True,
+        properties=props_expiry(settings.MQTT_MISSION_TASK_AND_STATUS_EXPIRY),
+    )
+
+
 def _publish_inspection_result(
     mqtt_publisher: MqttClientInterface,
     inspection: InspectionBlob,
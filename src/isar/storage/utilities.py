@@ -1,14 +1,19 @@
-import json
-from datetime import UTC, datetime
+import hashlib
+from collections.abc import Buffer
+from datetime import UTC, datetime, time
 from pathlib import Path
 
 from isar.config.settings import settings
-from robot_interface.models.inspection.inspection import (
-    AcousticMeasurementMetadata,
-    Inspection,
+from robot_interface.models.inspection.inspection import Inspection, InspectionBlob
+from robot_interface.models.inspection.payload import (
+    DEFAULT_CHUNK_SIZE,
+    InspectionPayload,
 )
 from robot_interface.models.mission.mission import Mission
 
+# Suffix of files in local storage which are still being written
+PARTIAL_FILE_SUFFIX: str = ".partial"
+
 
 def construct_paths(inspection: Inspection, mission: Mission) -> tuple[Path, Path]:
     folder: Path = Path(get_foldername(mission=mission))
@@ -23,66 +28,10 @@ def construct_paths(inspection: Inspection, mission: Mission) -> tuple[Path, Pat
     return inspection_path, metadata_path
 
 
-def construct_metadata_file(
-    inspection: Inspection, mission: Mission, filename: str
-) -> bytes:
-    data: dict = {
-        "installation_code": settings.PLANT_SHORT_NAME,
-        "additional_meta": {
-            "inspection_id": inspection.id,
-            "mission_id": mission.id,
-            "mission_name": mission.name,
-            "mission_date": datetime.now(UTC).date().strftime("%Y-%m-%dT%H:%M:%S.%f"),
-            "isar_id": settings.ISAR_ID,
-            "robot_name": settings.ROBOT_NAME,
-            "inspection_description": inspection.metadata.inspection_description,
-            "tag": inspection.metadata.tag_id,
-            "analysis_types": inspection.metadata.analysis_types,
-            "robot_pose": {
-                "position": {
-                    "x": inspection.metadata.robot_pose.position.x,
-                    "y": inspection.metadata.robot_pose.position.y,
-                    "z": inspection.metadata.robot_pose.position.z,
-                },
-                "orientation": str(
-                    inspection.metadata.robot_pose.orientation.to_quat_array()
-                ),
-            },
-            "target_position": {
-                "x": inspection.metadata.target_position.x,
-                "y": inspection.metadata.target_position.y,
-                "z": inspection.metadata.target_position.z,
-            },
-            "timestamp": inspection.metadata.start_time.strftime(
-                "%Y-%m-%dT%H:%M:%S.%f"
-            ),
-        },
-        "data_files": [
-            {
-                "folder": f"/{get_foldername(mission=mission)}",
-                "file_name": filename,
-            }
-        ],
-    }
-
-    if isinstance(inspection.metadata, AcousticMeasurementMetadata):
-        data["additional_meta"]["acoustic_result"] = {
-            "snr_value": inspection.metadata.snr_value,
-            "leak_rate": inspection.metadata.leak_rate,
-            "leak_rate_unit": inspection.metadata.leak_rate_unit,
-            "sound_pressure_level_at_sensor_db": inspection.metadata.sound_pressure_level_at_sensor_db,
-            "sound_pressure_level_at_source_db": inspection.metadata.sound_pressure_level_at_source_db,
-            "distance_to_source": inspection.metadata.distance_to_source,
-            "result": inspection.metadata.result,
-            "frequency_from": inspection.metadata.frequency_from,
-            "frequency_to": inspection.metadata.frequency_to,
-        }
-
-    return json.dumps(data, indent=4).encode()
-
-
 def get_filename(inspection: Inspection) -> str:
-    utc_time: str = datetime.now(UTC).strftime("%Y%m%d-%H%M%S")
+    # The filename is derived from the inspection itself so that a retried or
+    # replayed upload of the same inspection resolves to the same blob name
+    utc_time: str = as_utc(inspection.metadata.start_time).strftime("%Y%m%d-%H%M%S")
     tag: str = inspection.metadata.tag_id if inspection.metadata.tag_id else "no-tag"
     inspection_type: str = type(inspection).__name__
     inspection_description: str = (
@@ -94,6 +43,38 @@ def get_filename(inspection: Inspection) -> str:
 
 
 def get_foldername(mission: Mission) -> str:
-    utc_date: str = datetime.now(UTC).strftime("%Y-%m-%d")
+    # Dated by the start of the mission rather than today, so that an upload retried
+    # after midnight resolves to the same blob names
+    utc_date: str = get_mission_date(mission).strftime("%Y-%m-%d")
     mission_name: str = mission.name.replace(" ", "-")
     return f"{utc_date}__{settings.PLANT_SHORT_NAME}__{mission_name}__{mission.id}"
+
+
+def get_mission_date(mission: Mission) -> datetime:
+    return datetime.combine(as_utc(mission.start_time).date(), time(), tzinfo=UTC)
+
+
+def compute_content_md5(
+    payload: InspectionPayload, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> bytes:
+    md5 = hashlib.md5(usedforsecurity=False)
+    for chunk in payload.iter_chunks(chunk_size):
+        md5.update(chunk)
+    return md5.digest()
+
+
+def compute_md5(data: Buffer) -> bytes:
+    return hashlib.md5(data, usedforsecurity=False).digest()
+
+
+def get_content_encoding(inspection: Inspection) -> str | None:
+    if not isinstance(inspection, InspectionBlob):
+        return None
+    payload: InspectionPayload | None = inspection.get_payload()
+    return payload.content_encoding if payload is not None else None
+
+
+def as_utc(timestamp: datetime) -> datetime:
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=UTC)
+    return timestamp.astimezone(UTC)
@@ -1,7 +1,9 @@
 from datetime import datetime
 
 from alitra import Pose, Position
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+from robot_interface.models.inspection.payload import InspectionPayload, as_payload
 
 
 class InspectionMetadata(BaseModel):
@@ -66,7 +68,14 @@ class InspectionValue(Inspection):
 
 
 class InspectionBlob(Inspection):
-    data: bytes | None = Field(default=None, frozen=True)
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    data: bytes | InspectionPayload | None = Field(default=None, frozen=True)
+
+    def get_payload(self) -> InspectionPayload | None:
+        if self.data is None:
+            return None
+        return as_payload(self.data)
 
 
 class Image(InspectionBlob):
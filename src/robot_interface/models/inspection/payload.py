@@ -0,0 +1,178 @@
+import mmap
+from abc import ABCMeta, abstractmethod
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from io import BufferedReader, BytesIO, RawIOBase
+from pathlib import Path
+from tempfile import SpooledTemporaryFile
+from threading import Lock
+from typing import BinaryIO
+
+DEFAULT_CHUNK_SIZE: int = 4 * 1024 * 1024
+
+
+class InspectionPayload(metaclass=ABCMeta):
+    """Data of an inspection that does not have to be held in memory as one bytes
+    object.
+
+    Robot packages may return a payload from get_inspection instead of raw bytes,
+    for example to hand over a video which has been recorded to disk. The storage
+    handlers stream the payload in chunks and may read it more than once, e.g.
+    when an upload is retried or when several storage handlers are enabled.
+    """
+
+    content_encoding: str | None = None
+
+    @property
+    @abstractmethod
+    def size(self) -> int:
+        """Size of the payload in bytes"""
+
+    @abstractmethod
+    def open(self) -> BinaryIO:
+        """Open a new binary stream positioned at the start of the payload"""
+
+    def iter_chunks(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        with self.open() as stream:
+            while chunk := stream.read(chunk_size):
+                yield chunk
+
+    def read_bytes(self) -> bytes:
+        with self.open() as stream:
+            return stream.read()
+
+    @contextmanager
+    def memoryview(self) -> Iterator[memoryview]:
+        """Zero-copy view of the payload where possible"""
+        yield memoryview(self.read_bytes())
+
+    def close(self) -> None:
+        """Release the resources held by the payload once it will not be read
+        again"""
+
+
+class BytesPayload(InspectionPayload):
+    def __init__(self, data: bytes, content_encoding: str | None = None) -> None:
+        self.data: bytes = data
+        self.content_encoding = content_encoding
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+    def open(self) -> BinaryIO:
+        return BytesIO(self.data)
+
+    def read_bytes(self) -> bytes:
+        return self.data
+
+    @contextmanager
+    def memoryview(self) -> Iterator[memoryview]:
+        yield memoryview(self.data)
+
+
+class FilePayload(InspectionPayload):
+    """Payload backed by a file on disk. The file is memory-mapped when a
+    contiguous view of the data is needed, so it is never copied into the heap."""
+
+    def __init__(self, path: Path | str, content_encoding: str | None = None) -> None:
+        self.path: Path = Path(path)
+        self.content_encoding = content_encoding
+
+    @property
+    def size(self) -> int:
+        return self.path.stat().st_size
+
+    def open(self) -> BinaryIO:
+        return open(self.path, "rb")
+
+    @contextmanager
+    def memoryview(self) -> Iterator[memoryview]:
+        if self.size == 0:
+            yield memoryview(b"")
+            return
+        with (
+            open(self.path, "rb") as file,
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+        ):
+            view = memoryview(mapped)
+            try:
+                yield view
+            finally:
+                view.release()
+
+
+class ChunkIteratorPayload(InspectionPayload):
+    """Payload produced by an iterator of chunks, e.g. a download from the robot.
+
+    The iterator can only be consumed once, so the chunks are spooled to a
+    temporary file (kept in memory while small) the first time the payload is
+    read. Later reads are served from the spooled copy.
+    """
+
+    def __init__(
+        self,
+        chunks: Iterable[bytes],
+        content_encoding: str | None = None,
+        max_in_memory_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        self.content_encoding = content_encoding
+        self._chunks: Iterable[bytes] | None = chunks
+        # Owned by the payload for as long as it is read through _SpoolReader, and
+        # closed by close() rather than a context manager once the uploader is done
+        # with the payload
+        self._spool: SpooledTemporaryFile = SpooledTemporaryFile(  # noqa: SIM115
+            max_size=max_in_memory_size
+        )
+        self._size: int = 0
+        self._lock: Lock = Lock()
+
+    @property
+    def size(self) -> int:
+        self._consume_chunks()
+        return self._size
+
+    def open(self) -> BinaryIO:
+        self._consume_chunks()
+        return BufferedReader(_SpoolReader(self))
+
+    def close(self) -> None:
+        self._spool.close()
+
+    def _consume_chunks(self) -> None:
+        with self._lock:
+            if self._chunks is None:
+                return
+            for chunk in self._chunks:
+                self._spool.write(chunk)
+                self._size += len(chunk)
+            self._spool.flush()
+            self._chunks = None
+
+    def _read_at(self, offset: int, size: int) -> bytes:
+        with self._lock:
+            self._spool.seek(offset)
+            return self._spool.read(size)
+
+
+class _SpoolReader(RawIOBase):
+    # The spooled file is shared between readers, so each reader keeps its own
+    # position and seeks the spool under the payload lock on every read.
+    def __init__(self, payload: ChunkIteratorPayload) -> None:
+        self._payload: ChunkIteratorPayload = payload
+        self._position: int = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: bytearray | memoryview) -> int:  # type: ignore[override]
+        data: bytes = self._payload._read_at(self._position, len(buffer))
+        buffer[: len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+
+def as_payload(data: bytes | InspectionPayload) -> InspectionPayload:
+    if isinstance(data, InspectionPayload):
+        return data
+    return BytesPayload(data)
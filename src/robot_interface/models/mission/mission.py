@@ -1,3 +1,4 @@
+from datetime import UTC, datetime
 from uuid import uuid4
 
 from pydantic import BaseModel, Field
@@ -13,6 +14,9 @@ class Mission(BaseModel):
     name: str = Field(frozen=True)
     status: MissionStatus = MissionStatus.NotStarted
     error_message: ErrorMessage | None = Field(default=None)
+    # Names the folder of the mission's results, which must not change when an
+    # upload is retried on a later date
+    start_time: datetime = Field(default_factory=lambda: datetime.now(UTC), frozen=True)
 
     def _is_return_to_home_mission(self) -> bool:
         if len(self.tasks) != 1:
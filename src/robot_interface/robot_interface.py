@@ -8,6 +8,7 @@ from robot_interface.models.mission.mission import Mission
 from robot_interface.models.mission.status import MissionStatus, RobotStatus, TaskStatus
 from robot_interface.models.mission.task import InspectionTask
 from robot_interface.models.robots.media import MediaConfig
+from robot_interface.telemetry.scheduler import TelemetrySource
 
 
 class RobotInterface(metaclass=ABCMeta):
@@ -167,6 +168,10 @@ class RobotInterface(metaclass=ABCMeta):
             The inspection connected to the given task.
             get_inspection has responsibility to assign the inspection_id of the task
             to the inspection that it returns.
+            The data of an InspectionBlob may be given as bytes or as an
+            InspectionPayload, e.g. a FilePayload for a video recorded to disk or a
+            ChunkIteratorPayload for data streamed from the robot, so that large
+            inspections do not have to be held in memory.
 
         Raises
         ------
@@ -236,6 +241,27 @@ class RobotInterface(metaclass=ABCMeta):
         """
         raise NotImplementedError
 
+    def get_telemetry_sources(
+        self, queue: Queue, isar_id: str, robot_name: str
+    ) -> list[TelemetrySource]:
+        """
+        Set up periodic telemetry publishers to be run by the telemetry scheduler in
+        ISAR, as an alternative to the threads from get_telemetry_publishers. Every
+        source is called at its interval from a single thread, so a source should
+        sample and publish promptly rather than block. A MqttTelemetryPublisher is
+        turned into a source with its telemetry_source method.
+
+        The queue, isar_id and robot_name are the same as for
+        get_telemetry_publishers.
+
+        Returns
+        -------
+        List[TelemetrySource]
+            List containing the telemetry sources to be scheduled. Empty by default.
+
+        """
+        return []
+
     @abstractmethod
     def robot_status(self) -> RobotStatus:
         """
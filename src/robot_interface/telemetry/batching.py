@@ -0,0 +1,67 @@
+import json
+import time
+from datetime import UTC, datetime
+from typing import Any
+
+from isar.config.settings import settings
+from robot_interface.telemetry.payload_encoder import PayloadEncoder
+
+# Suffix of the topic the batches of telemetry are published on, following the
+# topic of the telemetry itself
+BATCH_TOPIC_SUFFIX: str = "/batch"
+
+
+class TelemetryBatch:
+    """Collects telemetry samples to be published together in one message.
+
+    The samples of a topic are published as a TelemetryBatchPayload on the topic
+    followed by BATCH_TOPIC_SUFFIX, so that subscribers to single samples are not
+    handed batches. A batch is published once its first sample is
+    MQTT_TELEMETRY_BATCH_WINDOW seconds old, or earlier if waiting for the next
+    sample would hold it for longer than MQTT_TELEMETRY_BATCH_MAX_LATENCY seconds.
+    Telemetry sampled less often than the maximum latency is therefore published
+    one sample at a time. Every sample keeps its own timestamp, while the isar_id
+    and robot_name are only given once for the batch.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        window: float = settings.MQTT_TELEMETRY_BATCH_WINDOW,
+        max_latency: float = settings.MQTT_TELEMETRY_BATCH_MAX_LATENCY,
+    ) -> None:
+        self.interval: float = interval
+        self.window: float = window
+        self.max_latency: float = max_latency
+        self._samples: list[dict[str, Any]] = []
+        self._first_sampled_at: float = 0.0
+
+    def add(self, payload: str | bytes, now: float | None = None) -> None:
+        """Adds a JSON payload to the batch. Raises ValueError if it is not JSON and
+        TypeError if it is not a JSON object"""
+        sample: Any = json.loads(payload)
+        if not isinstance(sample, dict):
+            raise TypeError("Telemetry samples must be JSON objects")
+        sample.pop("isar_id", None)
+        sample.pop("robot_name", None)
+        if not self._samples:
+            self._first_sampled_at = time.monotonic() if now is None else now
+        self._samples.append(sample)
+
+    def take(self, encoder: PayloadEncoder, now: float | None = None) -> str | None:
+        """Returns the payload of the batch and starts a new one if the batch is due
+        to be published, otherwise None"""
+        if not self._samples:
+            return None
+        if now is None:
+            now = time.monotonic()
+        age: float = now - self._first_sampled_at
+        if age < self.window and age + self.interval <= self.max_latency:
+            return None
+
+        # TelemetryBatchPayload
+        payload: str = encoder.encode(
+            timestamp=datetime.now(UTC), samples=self._samples
+        )
+        self._samples = []
+        return payload
@@ -0,0 +1,165 @@
+"""Minimal CBOR (RFC 8949) encoder and decoder for telemetry payloads.
+
+Covers the values of a JSON document: maps with string keys, arrays, strings,
+integers, floats, booleans and null. Floats are written in the shortest of the
+half, single and double precision formats which preserves their value, so that
+decoding yields exactly the document which was encoded. It is the reference for
+consumers of telemetry published with the CBOR content type.
+"""
+
+import math
+import struct
+from typing import Any
+
+CONTENT_TYPE: str = "application/cbor"
+
+_UNSIGNED: int = 0
+_NEGATIVE: int = 1
+_BYTES: int = 2
+_TEXT: int = 3
+_ARRAY: int = 4
+_MAP: int = 5
+_SIMPLE: int = 7
+
+_FALSE: bytes = b"\xf4"
+_TRUE: bytes = b"\xf5"
+_NULL: bytes = b"\xf6"
+
+
+def encode(value: Any) -> bytes:
+    output: bytearray = bytearray()
+    _encode(value, output)
+    return bytes(output)
+
+
+def decode(data: bytes) -> Any:
+    try:
+        value, offset = _decode(memoryview(data), 0)
+    except IndexError, struct.error:
+        raise ValueError("Truncated CBOR item") from None
+    if offset != len(data):
+        raise ValueError(f"Unexpected {len(data) - offset} bytes after CBOR item")
+    return value
+
+
+def _encode(value: Any, output: bytearray) -> None:
+    if value is None:
+        output += _NULL
+    elif value is True:
+        output += _TRUE
+    elif value is False:
+        output += _FALSE
+    elif isinstance(value, str):
+        encoded: bytes = value.encode()
+        _head(_TEXT, len(encoded), output)
+        output += encoded
+    elif isinstance(value, int):
+        if value >= 0:
+            _head(_UNSIGNED, value, output)
+        else:
+            _head(_NEGATIVE, -1 - value, output)
+    elif isinstance(value, float):
+        output += _float(value)
+    elif isinstance(value, dict):
+        _head(_MAP, len(value), output)
+        for key, item in value.items():
+            _encode(key, output)
+            _encode(item, output)
+    elif isinstance(value, list | tuple):
+        _head(_ARRAY, len(value), output)
+        for item in value:
+            _encode(item, output)
+    elif isinstance(value, bytes | bytearray):
+        _head(_BYTES, len(value), output)
+        output += value
+    else:
+        raise TypeError(f"Cannot encode a value of type {type(value).__name__}")
+
+
+def _head(major_type: int, argument: int, output: bytearray) -> None:
+    initial: int = major_type << 5
+    if argument < 24:
+        output.append(initial | argument)
+    elif argument < 0x100:
+        output += struct.pack(">BB", initial | 24, argument)
+    elif argument < 0x10000:
+        output += struct.pack(">BH", initial | 25, argument)
+    elif argument < 0x100000000:
+        output += struct.pack(">BI", initial | 26, argument)
+    elif argument < 0x10000000000000000:
+        output += struct.pack(">BQ", initial | 27, argument)
+    else:
+        raise ValueError(f"Integer {argument} does not fit in 64 bits")
+
+
+def _float(value: float) -> bytes:
+    if math.isnan(value):
+        # The canonical NaN of RFC 8949
+        return b"\xf9\x7e\x00"
+    for marker, fmt in ((b"\xf9", ">e"), (b"\xfa", ">f")):
+        try:
+            packed: bytes = struct.pack(fmt, value)
+        except OverflowError:
+            continue
+        if struct.unpack(fmt, packed)[0] == value:
+            return marker + packed
+    return b"\xfb" + struct.pack(">d", value)
+
+
+def _decode(data: memoryview, offset: int) -> tuple[Any, int]:
+    initial: int = data[offset]
+    major_type: int = initial >> 5
+    additional: int = initial & 0x1F
+    offset += 1
+
+    if major_type == _SIMPLE:
+        match additional:
+            case 20:
+                return False, offset
+            case 21:
+                return True, offset
+            case 22:
+                return None, offset
+            case 25:
+                return struct.unpack_from(">e", data, offset)[0], offset + 2
+            case 26:
+                return struct.unpack_from(">f", data, offset)[0], offset + 4
+            case 27:
+                return struct.unpack_from(">d", data, offset)[0], offset + 8
+        raise ValueError(f"Unsupported CBOR simple value {additional}")
+
+    argument: int
+    if additional < 24:
+        argument = additional
+    elif additional <= 27:
+        size: int = 1 << (additional - 24)
+        argument = int.from_bytes(data[offset : offset + size])
+        offset += size
+    else:
+        raise ValueError("Indefinite length CBOR items are not supported")
+    if offset > len(data) or (
+        major_type in (_BYTES, _TEXT) and offset + argument > len(data)
+    ):
+        raise IndexError("CBOR item extends past the end of the data")
+
+    if major_type == _UNSIGNED:
+        return argument, offset
+    if major_type == _NEGATIVE:
+        return -1 - argument, offset
+    if major_type == _BYTES:
+        return bytes(data[offset : offset + argument]), offset + argument
+    if major_type == _TEXT:
+        return str(data[offset : offset + argument], "utf-8"), offset + argument
+    if major_type == _ARRAY:
+        items: list[Any] = []
+        for _ in range(argument):
+            item, offset = _decode(data, offset)
+            items.append(item)
+        return items, offset
+    if major_type == _MAP:
+        mapping: dict[Any, Any] = {}
+        for _ in range(argument):
+            key, offset = _decode(data, offset)
+            mapping[key], offset = _decode(data, offset)
+        return mapping, offset
+    raise ValueError(f"Unsupported CBOR major type {major_type}")
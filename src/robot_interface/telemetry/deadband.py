@@ -0,0 +1,102 @@
+import json
+import math
+import time
+from collections.abc import Callable
+from typing import Any
+
+from isar.config.settings import settings
+
+
+class TelemetryDeadband:
+    """Suppresses telemetry readings which have not changed since the last
+    published reading.
+
+    A reading is published if any field other than the timestamp differs from the
+    last published reading. The pose, battery level and pressure level only count
+    as changed once they differ by more than their deadband, so that sensor noise
+    from a parked robot is not published either. A reading is always published
+    once MQTT_TELEMETRY_MAX_SILENCE seconds have passed since the last one, so that
+    consumers keep receiving the current state.
+    """
+
+    def __init__(self) -> None:
+        self._published: dict[str, Any] | None = None
+        self._published_at: float = -math.inf
+
+    def should_publish(self, payload: str | bytes, now: float | None = None) -> bool:
+        """Returns whether the JSON payload should be published, and if so records
+        it as the last published reading"""
+        if now is None:
+            now = time.monotonic()
+        try:
+            reading: Any = json.loads(payload)
+        except ValueError:
+            return True
+        if not isinstance(reading, dict):
+            return True
+
+        if (
+            self._published is not None
+            and now - self._published_at < settings.MQTT_TELEMETRY_MAX_SILENCE
+            and not _changed(self._published, reading)
+        ):
+            return False
+        self._published = reading
+        self._published_at = now
+        return True
+
+
+def _changed(published: dict[str, Any], reading: dict[str, Any]) -> bool:
+    if published.keys() != reading.keys():
+        return True
+    for key, value in reading.items():
+        if key == "timestamp":
+            continue
+        exceeds_deadband: Callable[[Any, Any], bool] | None = _DEADBANDS.get(key)
+        try:
+            if exceeds_deadband is None:
+                if value != published[key]:
+                    return True
+            elif exceeds_deadband(published[key], value):
+                return True
+        except KeyError, TypeError:
+            # Not shaped as the deadband expects, such as a missing pose
+            if value != published[key]:
+                return True
+    return False
+
+
+def _pose_changed(published: dict[str, Any], pose: dict[str, Any]) -> bool:
+    if pose["frame"] != published["frame"]:
+        return True
+    position: dict[str, float] = pose["position"]
+    published_position: dict[str, float] = published["position"]
+    distance: float = math.dist(
+        (position["x"], position["y"], position["z"]),
+        (published_position["x"], published_position["y"], published_position["z"]),
+    )
+    if distance > settings.MQTT_DEADBAND_POSITION:
+        return True
+
+    orientation: dict[str, float] = pose["orientation"]
+    published_orientation: dict[str, float] = published["orientation"]
+    dot: float = sum(orientation[axis] * published_orientation[axis] for axis in "xyzw")
+    # Angle of the rotation between the two quaternions, which are normalized
+    angle: float = math.degrees(2 * math.acos(min(abs(dot), 1.0)))
+    return angle > settings.MQTT_DEADBAND_ORIENTATION
+
+
+def _level_changed(deadband: Callable[[], float]) -> Callable[[Any, Any], bool]:
+    def changed(published: Any, level: Any) -> bool:
+        if level is None or published is None:
+            return level != published
+        return abs(level - published) > deadband()
+
+    return changed
+
+
+_DEADBANDS: dict[str, Callable[[Any, Any], bool]] = {
+    "pose": _pose_changed,
+    "battery_level": _level_changed(lambda: settings.MQTT_DEADBAND_BATTERY),
+    "pressure_level": _level_changed(lambda: settings.MQTT_DEADBAND_PRESSURE),
+}
@@ -1,9 +1,9 @@
-import json
 import logging
 import time
 from abc import ABCMeta, abstractmethod
 from collections.abc import Callable
 from datetime import UTC, datetime
+from functools import lru_cache
 from logging import Logger
 from queue import Queue
 
@@ -16,23 +16,59 @@ from robot_interface.models.exceptions.robot_exceptions import (
     RobotTelemetryNoUpdateException,
     RobotTelemetryPoseException,
 )
-from robot_interface.telemetry.payloads import CloudHealthPayload
+from robot_interface.telemetry import cbor
+from robot_interface.telemetry.batching import BATCH_TOPIC_SUFFIX, TelemetryBatch
+from robot_interface.telemetry.deadband import TelemetryDeadband
+from robot_interface.telemetry.payload_encoder import (
+    PayloadEncoder,
+    encode_payload,
+    payload_encoder,
+)
+from robot_interface.telemetry.scheduler import TelemetrySource
 
-MQTTQueueType = tuple[str, str, int, bool, Properties | None]
+MQTTQueueType = tuple[str, str | bytes, int, bool, Properties | None]
 
 
 def props_expiry(seconds: int) -> Properties:
+    return publish_properties(expiry=seconds)
+
+
+@lru_cache(maxsize=256)
+def publish_properties(
+    expiry: int | None = None, content_type: str | None = None
+) -> Properties:
+    """Returns the publish properties for a message expiry interval and content
+    type. The properties are cached and shared between messages, so they must not
+    be modified."""
     p = Properties(PacketTypes.PUBLISH)
-    p.MessageExpiryInterval = seconds
+    if expiry is not None:
+        p.MessageExpiryInterval = expiry
+    if content_type is not None:
+        p.ContentType = content_type
     return p
 
 
+def topic_class(topic: str) -> str:
+    """Level of the topic after isar/<ISAR_ID>, for instance "task" for the topic
+    isar/<ISAR_ID>/task/<task_id>"""
+    levels: list[str] = topic.split("/", 3)
+    return levels[2] if len(levels) > 2 else topic
+
+
+def telemetry_content_type(topic: str) -> str | None:
+    """Content type of the telemetry published on the topic according to
+    MQTT_TELEMETRY_ENCODING, or None if it is published as JSON"""
+    if settings.MQTT_TELEMETRY_ENCODING.get(topic_class(topic)) == "cbor":
+        return cbor.CONTENT_TYPE
+    return None
+
+
 class MqttClientInterface(metaclass=ABCMeta):
     @abstractmethod
     def publish(
         self,
         topic: str,
-        payload: str,
+        payload: str | bytes,
         qos: int = 0,
         retain: bool = False,
         properties: Properties | None = None,
@@ -61,12 +97,12 @@ class MqttPublisher(MqttClientInterface):
     def publish(
         self,
         topic: str,
-        payload: str,
+        payload: str | bytes,
         qos: int = 0,
         retain: bool = False,
         properties: Properties | None = None,
     ) -> None:
-        queue_message: tuple[str, str, int, bool, Properties | None] = (
+        queue_message: MQTTQueueType = (
             topic,
             payload,
             qos,
@@ -96,58 +132,129 @@ class MqttTelemetryPublisher(MqttClientInterface):
         self.properties: Properties | None = properties
 
         self.logger: Logger = logging.getLogger("telemetry")
+        self.telemetry_properties: Properties = props_expiry(
+            settings.MQTT_TELEMETRY_EXPIRY
+        )
+        self.content_type: str | None = telemetry_content_type(self.topic)
+        self.deadband: TelemetryDeadband | None = (
+            TelemetryDeadband() if settings.MQTT_TELEMETRY_DEADBAND_ENABLED else None
+        )
+        self.batch: TelemetryBatch | None = (
+            TelemetryBatch(
+                interval=self.interval,
+                window=settings.MQTT_TELEMETRY_BATCH_WINDOW,
+                max_latency=settings.MQTT_TELEMETRY_BATCH_MAX_LATENCY,
+            )
+            if settings.MQTT_TELEMETRY_BATCH_WINDOW > 0
+            else None
+        )
 
-    def run(self, isar_id: str, robot_name: str) -> None:
-        self.cloud_health_topic: str = f"isar/{isar_id}/cloud_health"
-        self.battery_topic: str = f"isar/{isar_id}/battery"
-        self.pose_topic: str = f"isar/{isar_id}/pose"
-        self.pressure_topic: str = f"isar/{isar_id}/pressure"
-        topic: str
-        payload: str
+        # Given by setup, before the first message is published
+        self.isar_id: str = settings.ISAR_ID
+        self.robot_name: str = settings.ROBOT_NAME
+        self.cloud_health_topic: str = ""
+        self.battery_topic: str = ""
+        self.pose_topic: str = ""
+        self.pressure_topic: str = ""
+        self.encoder: PayloadEncoder = payload_encoder(self.isar_id, self.robot_name)
 
+    def run(self, isar_id: str, robot_name: str) -> None:
+        self.setup(isar_id=isar_id, robot_name=robot_name)
         while True:
-            try:
-                payload = self.telemetry_method(isar_id=isar_id, robot_name=robot_name)
-                topic = self.topic
-            except RobotTelemetryPoseException, RobotTelemetryNoUpdateException:
-                time.sleep(self.interval)
-                continue
-            except RobotTelemetryException:
-                payload = json.dumps(
-                    CloudHealthPayload(
-                        isar_id=isar_id,
-                        robot_name=robot_name,
-                        timestamp=datetime.now(UTC),
-                    )
-                )
-                topic = self.cloud_health_topic
-            except Exception as e:  # noqa: BLE001
-                self.logger.error(f"Unexpected error in MQTT telemetry publisher: {e}")
-                time.sleep(self.interval)
-                continue
-
-            publish_properties = self.properties
-
-            if topic in (
-                self.battery_topic,
-                self.pose_topic,
-                self.pressure_topic,
-            ):
-                publish_properties = props_expiry(settings.MQTT_TELEMETRY_EXPIRY)
+            self.publish_telemetry()
+            time.sleep(self.interval)
 
+    def telemetry_source(self, isar_id: str, robot_name: str) -> TelemetrySource:
+        """Returns the publisher as a source for the TelemetryScheduler, which
+        replaces the thread running run()"""
+        self.setup(isar_id=isar_id, robot_name=robot_name)
+        return TelemetrySource(
+            name=self.topic, interval=self.interval, publish=self.publish_telemetry
+        )
+
+    def setup(self, isar_id: str, robot_name: str) -> None:
+        self.isar_id = isar_id
+        self.robot_name = robot_name
+        self.cloud_health_topic = f"isar/{isar_id}/cloud_health"
+        self.battery_topic = f"isar/{isar_id}/battery"
+        self.pose_topic = f"isar/{isar_id}/pose"
+        self.pressure_topic = f"isar/{isar_id}/pressure"
+        self.encoder = payload_encoder(isar_id, robot_name)
+
+    def publish_telemetry(self) -> None:
+        """Samples the telemetry method once and publishes the result"""
+        payload: str | bytes | None = None
+        try:
+            payload = self.telemetry_method(
+                isar_id=self.isar_id, robot_name=self.robot_name
+            )
+        except RobotTelemetryPoseException, RobotTelemetryNoUpdateException:
+            pass
+        except RobotTelemetryException:
+            # CloudHealthPayload
             self.publish(
-                topic=topic,
-                payload=payload,
+                topic=self.cloud_health_topic,
+                payload=self.encoder.encode(timestamp=datetime.now(UTC)),
                 qos=self.qos,
                 retain=self.retain,
-                properties=publish_properties,
+                properties=self.properties,
             )
-            time.sleep(self.interval)
+        except Exception as e:  # noqa: BLE001
+            self.logger.error(f"Unexpected error in MQTT telemetry publisher: {e}")
+
+        if (
+            payload is not None
+            and self.deadband is not None
+            and not self.deadband.should_publish(payload)
+        ):
+            payload = None
+
+        topic: str = self.topic
+        if self.batch is not None:
+            # Checked without a new sample as well, to keep to the latency
+            if payload is not None:
+                try:
+                    self.batch.add(payload)
+                except (TypeError, ValueError) as e:
+                    self.logger.error(f"Failed to batch telemetry: {e}")
+            payload = self.batch.take(self.encoder)
+            topic = self.topic + BATCH_TOPIC_SUFFIX
+
+        if payload is None:
+            return
+
+        properties: Properties | None = self.properties
+
+        if self.topic in (
+            self.battery_topic,
+            self.pose_topic,
+            self.pressure_topic,
+        ):
+            properties = self.telemetry_properties
+
+        if self.content_type is not None:
+            try:
+                payload = encode_payload(payload, self.content_type)
+            except ValueError as e:
+                self.logger.error(f"Failed to encode telemetry on {topic}: {e}")
+                return
+            properties = publish_properties(
+                expiry=getattr(properties, "MessageExpiryInterval", None),
+                content_type=self.content_type,
+            )
+
+        self.publish(
+            topic=topic,
+            payload=payload,
+            qos=self.qos,
+            retain=self.retain,
+            properties=properties,
+        )
 
     def publish(
         self,
         topic: str,
-        payload: str,
+        payload: str | bytes,
         qos: int = 0,
         retain: bool = False,
         properties: Properties | None = None,
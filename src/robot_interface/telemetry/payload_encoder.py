@@ -0,0 +1,139 @@
+import json
+from datetime import datetime
+from enum import Enum
+from functools import lru_cache
+from json.encoder import encode_basestring
+from math import isfinite
+from typing import Any
+
+from alitra import Frame, Orientation, Pose, Position
+
+from robot_interface.telemetry import cbor
+
+# Content type of JSON payloads. Messages without a content type are JSON as well
+JSON_CONTENT_TYPE: str = "application/json"
+
+
+class PayloadEncoder:
+    """Serializes the JSON payloads published over MQTT.
+
+    Produces the same JSON as model_dump_json on the models in
+    robot_interface.telemetry.payloads, but the isar_id and robot_name, which open
+    every payload and never change, are serialized once into an envelope. Only the
+    remaining fields are serialized per message, without constructing and
+    validating a pydantic model. The fields are written in the order they are
+    given, which should be the order they are declared in the model.
+    """
+
+    def __init__(self, isar_id: str, robot_name: str) -> None:
+        self.isar_id: str = isar_id
+        self.robot_name: str = robot_name
+        self._envelope: str = (
+            f'{{"isar_id":{encode_basestring(isar_id)},'
+            f'"robot_name":{encode_basestring(robot_name)}'
+        )
+
+    def encode(self, **fields: Any) -> str:
+        return (
+            self._envelope
+            + "".join(_key(key) + encode_value(value) for key, value in fields.items())
+            + "}"
+        )
+
+
+@lru_cache(maxsize=8)
+def payload_encoder(isar_id: str, robot_name: str) -> PayloadEncoder:
+    """Returns a shared encoder for the isar_id and robot_name"""
+    return PayloadEncoder(isar_id=isar_id, robot_name=robot_name)
+
+
+def encode_payload(payload: str | bytes, content_type: str) -> str | bytes:
+    """Re-encodes a JSON payload with the content type"""
+    if content_type == JSON_CONTENT_TYPE:
+        return payload
+    if content_type == cbor.CONTENT_TYPE:
+        return cbor.encode(json.loads(payload))
+    raise ValueError(f"Unsupported payload content type {content_type}")
+
+
+def decode_payload(payload: str | bytes, content_type: str | None = None) -> Any:
+    """Reference decoder for the payloads published by ISAR. The content type is
+    taken from the ContentType property of the MQTT message, and yields the same
+    document for every encoding of a payload."""
+    if content_type is None or content_type == JSON_CONTENT_TYPE:
+        return json.loads(payload)
+    if content_type == cbor.CONTENT_TYPE and isinstance(payload, bytes):
+        return cbor.decode(payload)
+    raise ValueError(f"Cannot decode a {type(payload).__name__} as {content_type}")
+
+
+def encode_value(value: Any) -> str:
+    """Serializes a field value as pydantic does in JSON mode"""
+    if value is None:
+        return "null"
+    if isinstance(value, Enum):
+        return encode_value(value.value)
+    if isinstance(value, str):
+        return encode_basestring(value)
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, int):
+        return int.__repr__(value)
+    if isinstance(value, float):
+        return _float(value)
+    if isinstance(value, datetime):
+        return _datetime(value)
+    if isinstance(value, Pose):
+        return _pose(value)
+    if isinstance(value, dict):
+        items: str = ",".join(
+            f"{encode_basestring(key)}:{encode_value(item)}"
+            for key, item in value.items()
+        )
+        return f"{{{items}}}"
+    if isinstance(value, list | tuple):
+        return f"[{','.join(encode_value(item) for item in value)}]"
+    raise TypeError(f"Cannot encode a value of type {type(value).__name__}")
+
+
+@lru_cache(maxsize=64)
+def _key(key: str) -> str:
+    return f",{encode_basestring(key)}:"
+
+
+def _float(value: float) -> str:
+    # Pydantic writes infinite and NaN floats as null
+    if not isfinite(value):
+        return "null"
+    return float.__repr__(float(value))
+
+
+def _datetime(value: datetime) -> str:
+    text: str = value.isoformat()
+    if text.endswith("+00:00"):
+        text = text[:-6] + "Z"
+    return f'"{text}"'
+
+
+def _frame(frame: Frame) -> str:
+    return _frame_name(frame.name)
+
+
+@lru_cache(maxsize=16)
+def _frame_name(name: str) -> str:
+    return f'{{"name":{encode_basestring(name)}}}'
+
+
+def _pose(pose: Pose) -> str:
+    position: Position = pose.position
+    orientation: Orientation = pose.orientation
+    return (
+        f'{{"position":{{"x":{_float(position.x)},"y":{_float(position.y)},'
+        f'"z":{_float(position.z)},"frame":{_frame(position.frame)}}},'
+        f'"orientation":{{"x":{_float(orientation.x)},"y":{_float(orientation.y)},'
+        f'"z":{_float(orientation.z)},"w":{_float(orientation.w)},'
+        f'"frame":{_frame(orientation.frame)}}},'
+        f'"frame":{_frame(pose.frame)}}}'
+    )
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Any
 
 from alitra import Pose, Position
 from pydantic import BaseModel
@@ -18,6 +19,13 @@ class TelemetryPayload(BaseModel):
     timestamp: datetime
 
 
+class TelemetryBatchPayload(BaseModel):
+    isar_id: str
+    robot_name: str
+    timestamp: datetime
+    samples: list[dict[str, Any]]
+
+
 class CloudHealthPayload(BaseModel):
     isar_id: str
     robot_name: str
@@ -103,6 +111,25 @@ class TaskPayload(BaseModel):
     timestamp: datetime
 
 
+class LatestMissionTaskPayload(BaseModel):
+    task_id: str | None = None
+    status: TaskStatus | None = None
+    task_type: TaskTypes | None = None
+    error_reason: ErrorReason | None = None
+    error_description: str | None = None
+
+
+class LatestMissionPayload(BaseModel):
+    isar_id: str
+    robot_name: str
+    mission_id: str | None = None
+    status: MissionStatus | None = None
+    error_reason: ErrorReason | None = None
+    error_description: str | None = None
+    tasks: list[LatestMissionTaskPayload] = []
+    timestamp: datetime
+
+
 class InspectionResultPayload(BaseModel):
     isar_id: str
     robot_name: str
@@ -120,6 +147,19 @@ class InspectionResultPayload(BaseModel):
     target_position: Position | None = None
 
 
+class InspectionPreviewPayload(BaseModel):
+    isar_id: str
+    robot_name: str
+    inspection_id: str
+    mission_id: str
+    blob_storage_preview_path: BlobStoragePath
+    installation_code: str
+    tag_id: str | None = None
+    inspection_type: str | None = None
+    inspection_description: str | None = None
+    timestamp: datetime
+
+
 class InspectionValuePayload(BaseModel):
     isar_id: str
     robot_name: str
@@ -0,0 +1,88 @@
+import heapq
+import logging
+import math
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from itertools import count
+from logging import Logger
+from threading import Condition
+
+
+@dataclass(frozen=True)
+class TelemetrySource:
+    """A periodic publisher, called every interval seconds by the
+    TelemetryScheduler. The publish callable should return promptly, as every
+    source is called from the same thread."""
+
+    name: str
+    interval: float
+    publish: Callable[[], None]
+
+
+class TelemetryScheduler:
+    """Calls every registered telemetry source at its interval from one thread.
+
+    Replaces a thread per publisher which sleeps between its messages. A source is
+    first called when it is added. Later calls are aligned to multiples of the
+    interval on the monotonic clock, so that sources with the same or harmonic
+    intervals publish together. A source which falls behind skips the calls it has
+    missed instead of catching up in a burst. Exceptions from a source are logged
+    and do not affect the other sources.
+    """
+
+    def __init__(self) -> None:
+        self.logger: Logger = logging.getLogger("telemetry")
+        self._condition: Condition = Condition()
+        self._schedule: list[tuple[float, int, TelemetrySource]] = []
+        self._sequence: count = count()
+        self._stopped: bool = False
+
+    def add(self, source: TelemetrySource) -> None:
+        if source.interval <= 0:
+            raise ValueError(
+                f"Telemetry source {source.name} must have a positive interval"
+            )
+        with self._condition:
+            self._push(time.monotonic(), source)
+            self._condition.notify()
+
+    def stop(self) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+
+    def run(self) -> None:
+        while True:
+            with self._condition:
+                source: TelemetrySource | None = self._next_due()
+                if source is None:
+                    return
+
+            try:
+                source.publish()
+            except Exception as e:  # noqa: BLE001
+                self.logger.error(f"Error in telemetry source {source.name}: {e}")
+
+            with self._condition:
+                self._push(_next_aligned(time.monotonic(), source.interval), source)
+
+    def _next_due(self) -> TelemetrySource | None:
+        """Wait until the next source is due and remove it from the schedule.
+        Returns None once the scheduler is stopped."""
+        while not self._stopped:
+            timeout: float | None = None
+            if self._schedule:
+                timeout = self._schedule[0][0] - time.monotonic()
+                if timeout <= 0:
+                    return heapq.heappop(self._schedule)[2]
+            self._condition.wait(timeout)
+        return None
+
+    def _push(self, due: float, source: TelemetrySource) -> None:
+        heapq.heappush(self._schedule, (due, next(self._sequence), source))
+
+
+def _next_aligned(now: float, interval: float) -> float:
+    """First multiple of the interval strictly after now"""
+    return (math.floor(now / interval) + 1) * interval
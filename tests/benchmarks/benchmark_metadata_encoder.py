@@ -0,0 +1,115 @@
+"""Compares the metadata encoder with the previous construct_metadata_file.
+
+Run from the repository root with:
+
+    python -m tests.benchmarks.benchmark_metadata_encoder
+"""
+
+import json
+import timeit
+from collections.abc import Callable
+from datetime import UTC, datetime
+from functools import partial
+
+from isar.config.settings import settings
+from isar.storage.metadata_encoder import MetadataEncoder
+from isar.storage.utilities import get_foldername
+from robot_interface.models.inspection.inspection import (
+    AcousticMeasurementMetadata,
+    Image,
+    Inspection,
+)
+from robot_interface.models.mission.mission import Mission
+from tests.test_mocks.inspection import stub_image_metadata
+
+NUMBER: int = 20000
+
+
+def construct_metadata_file(
+    inspection: Inspection, mission: Mission, filename: str
+) -> bytes:
+    """Frozen copy of the construct_metadata_file the encoder replaced."""
+    data: dict = {
+        "installation_code": settings.PLANT_SHORT_NAME,
+        "additional_meta": {
+            "inspection_id": inspection.id,
+            "mission_id": mission.id,
+            "mission_name": mission.name,
+            "mission_date": datetime.now(UTC).date().strftime("%Y-%m-%dT%H:%M:%S.%f"),
+            "isar_id": settings.ISAR_ID,
+            "robot_name": settings.ROBOT_NAME,
+            "inspection_description": inspection.metadata.inspection_description,
+            "tag": inspection.metadata.tag_id,
+            "analysis_types": inspection.metadata.analysis_types,
+            "robot_pose": {
+                "position": {
+                    "x": inspection.metadata.robot_pose.position.x,
+                    "y": inspection.metadata.robot_pose.position.y,
+                    "z": inspection.metadata.robot_pose.position.z,
+                },
+                "orientation": str(
+                    inspection.metadata.robot_pose.orientation.to_quat_array()
+                ),
+            },
+            "target_position": {
+                "x": inspection.metadata.target_position.x,
+                "y": inspection.metadata.target_position.y,
+                "z": inspection.metadata.target_position.z,
+            },
+            "timestamp": inspection.metadata.start_time.strftime(
+                "%Y-%m-%dT%H:%M:%S.%f"
+            ),
+        },
+        "data_files": [
+            {
+                "folder": f"/{get_foldername(mission=mission)}",
+                "file_name": filename,
+            }
+        ],
+    }
+
+    if isinstance(inspection.metadata, AcousticMeasurementMetadata):
+        data["additional_meta"]["acoustic_result"] = {
+            "snr_value": inspection.metadata.snr_value,
+            "leak_rate": inspection.metadata.leak_rate,
+            "leak_rate_unit": inspection.metadata.leak_rate_unit,
+            "sound_pressure_level_at_sensor_db": inspection.metadata.sound_pressure_level_at_sensor_db,
+            "sound_pressure_level_at_source_db": inspection.metadata.sound_pressure_level_at_source_db,
+            "distance_to_source": inspection.metadata.distance_to_source,
+            "result": inspection.metadata.result,
+            "frequency_from": inspection.metadata.frequency_from,
+            "frequency_to": inspection.metadata.frequency_to,
+        }
+
+    return json.dumps(data, indent=4).encode()
+
+
+def main() -> None:
+    mission = Mission(id="mission", name="Benchmark mission", tasks=[])
+    metadata = stub_image_metadata(analysis_types=["Fencilla"])
+    metadata.tag_id = "313-PA-101A"
+    inspection = Image(id="image", metadata=metadata)
+
+    encoders: dict[str, MetadataEncoder] = {
+        "MetadataEncoder (indented)": MetadataEncoder(compact=False),
+        "MetadataEncoder (compact)": MetadataEncoder(compact=True),
+        "MetadataEncoder (compact, orjson)": MetadataEncoder(
+            compact=True, backend="orjson"
+        ),
+    }
+    candidates: dict[str, Callable[[], bytes]] = {
+        "construct_metadata_file": partial(
+            construct_metadata_file, inspection, mission, "image.jpg"
+        ),
+    }
+    for name, encoder in encoders.items():
+        candidates[name] = partial(encoder.encode, inspection, mission, "image.jpg")
+
+    for name, candidate in candidates.items():
+        seconds: float = min(timeit.repeat(candidate, number=NUMBER, repeat=5))
+        size: int = len(candidate())
+        print(f"{name:<36} {seconds / NUMBER * 1e6:8.2f} us/call {size:6d} bytes")
+
+
+if __name__ == "__main__":
+    main()
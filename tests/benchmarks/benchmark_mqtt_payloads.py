@@ -0,0 +1,83 @@
+"""Compares building MQTT payloads from the pydantic models with PayloadEncoder.
+
+Covers the robot heartbeat, published every second, and the pose telemetry, which
+is the highest rate topic, also in the opt-in CBOR encoding. Each call builds the
+payload and its publish properties.
+
+Run from the repository root with:
+
+    python -m tests.benchmarks.benchmark_mqtt_payloads
+"""
+
+import timeit
+from collections.abc import Callable
+from datetime import UTC, datetime
+
+from paho.mqtt.packettypes import PacketTypes
+from paho.mqtt.properties import Properties
+
+from robot_interface.telemetry import cbor
+from robot_interface.telemetry.mqtt_client import props_expiry, publish_properties
+from robot_interface.telemetry.payload_encoder import PayloadEncoder, encode_payload
+from robot_interface.telemetry.payloads import (
+    RobotHeartbeatPayload,
+    TelemetryPosePayload,
+)
+from tests.test_mocks.inspection import stub_pose
+
+NUMBER: int = 50000
+ISAR_ID: str = "isar"
+ROBOT_NAME: str = "robot"
+
+
+def _new_properties(seconds: int) -> Properties:
+    properties: Properties = Properties(PacketTypes.PUBLISH)
+    properties.MessageExpiryInterval = seconds
+    return properties
+
+
+def main() -> None:
+    encoder = PayloadEncoder(isar_id=ISAR_ID, robot_name=ROBOT_NAME)
+    pose = stub_pose()
+
+    candidates: dict[str, Callable[[], tuple[str | bytes, Properties]]] = {
+        "heartbeat, model_dump_json": lambda: (
+            RobotHeartbeatPayload(
+                isar_id=ISAR_ID, robot_name=ROBOT_NAME, timestamp=datetime.now(UTC)
+            ).model_dump_json(),
+            _new_properties(30),
+        ),
+        "heartbeat, PayloadEncoder": lambda: (
+            encoder.encode(timestamp=datetime.now(UTC)),
+            props_expiry(30),
+        ),
+        "pose, model_dump_json": lambda: (
+            TelemetryPosePayload(
+                isar_id=ISAR_ID,
+                robot_name=ROBOT_NAME,
+                timestamp=datetime.now(UTC),
+                pose=pose,
+            ).model_dump_json(),
+            _new_properties(10),
+        ),
+        "pose, PayloadEncoder": lambda: (
+            encoder.encode(timestamp=datetime.now(UTC), pose=pose),
+            props_expiry(10),
+        ),
+        "pose, PayloadEncoder as CBOR": lambda: (
+            encode_payload(
+                encoder.encode(timestamp=datetime.now(UTC), pose=pose),
+                cbor.CONTENT_TYPE,
+            ),
+            publish_properties(expiry=10, content_type=cbor.CONTENT_TYPE),
+        ),
+    }
+
+    for name, candidate in candidates.items():
+        seconds: float = min(timeit.repeat(candidate, number=NUMBER, repeat=5))
+        size: int = len(candidate()[0])
+        print(f"{name:<30} {seconds / NUMBER * 1e6:8.2f} us/message {size:5d} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Measures how many messages per second MqttClient publishes from its queue.
+
+The paho client is replaced by an in-process stand-in for the broker, which
+acknowledges every message from a separate thread once a simulated round trip
+time has passed. The result is the ceiling set by the outbound queue and the
+publish loop rather than by the network.
+
+Run from the repository root with:
+
+    python -m tests.benchmarks.benchmark_mqtt_publish
+"""
+
+import os
+import statistics
+import time
+from queue import SimpleQueue
+from threading import Event, Thread
+from typing import Any
+
+from paho.mqtt.client import MQTTMessageInfo
+from paho.mqtt.packettypes import PacketTypes
+from paho.mqtt.reasoncodes import ReasonCode
+
+from isar.config.settings import settings
+from isar.services.service_connections.mqtt.mqtt_client import MqttClient
+from isar.services.service_connections.mqtt.mqtt_outbound_queue import MqttOutboundQueue
+
+MESSAGES: int = 20000
+
+
+class BrokerStandIn:
+    def __init__(self, mqtt_client: MqttClient, round_trip_time: float) -> None:
+        self.mqtt_client: MqttClient = mqtt_client
+        self.round_trip_time: float = round_trip_time
+        self._mid: int = 0
+        self._acknowledgements: SimpleQueue[tuple[int, float]] = SimpleQueue()
+        Thread(target=self._acknowledge, daemon=True).start()
+
+    def publish(self, **_: Any) -> MQTTMessageInfo:
+        self._mid = self._mid % 65535 + 1
+        self._acknowledgements.put((self._mid, time.monotonic() + self.round_trip_time))
+        return MQTTMessageInfo(self._mid)
+
+    def _acknowledge(self) -> None:
+        reason_code: ReasonCode = ReasonCode(PacketTypes.PUBACK)
+        while True:
+            mid, due = self._acknowledgements.get()
+            if (delay := due - time.monotonic()) > 0:
+                time.sleep(delay)
+            self.mqtt_client.on_publish(self, None, mid, reason_code, None)
+
+
+def run(qos: int, round_trip_time: float) -> None:
+    latencies: list[float] = []
+    done: Event = Event()
+
+    def on_latency(latency: float) -> None:
+        latencies.append(latency)
+        if len(latencies) == MESSAGES:
+            done.set()
+
+    queue: MqttOutboundQueue = MqttOutboundQueue(maxsize=MESSAGES, persistence_path="")
+    mqtt_client: MqttClient = MqttClient(
+        mqtt_queue=queue, publish_latency_listeners=[on_latency]
+    )
+    mqtt_client.client = BrokerStandIn(mqtt_client, round_trip_time)  # type: ignore
+    for index in range(MESSAGES):
+        queue.put((settings.TOPIC_ISAR_TASK, f"message {index}", qos, False, None))
+
+    start: float = time.perf_counter()
+    mqtt_client._connected.set()
+    Thread(target=mqtt_client._publish_from_queue, daemon=True).start()
+    done.wait()
+    seconds: float = time.perf_counter() - start
+
+    latencies.sort()
+    print(
+        f"QoS {qos}, round trip {round_trip_time * 1000:4.1f} ms: "
+        f"{MESSAGES / seconds:9.0f} messages/s, publish to ack "
+        f"median {statistics.median(latencies) * 1000:7.2f} ms, "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:7.2f} ms"
+    )
+
+
+def main() -> None:
+    settings.MQTT_SSL_ENABLED = False
+    os.environ.setdefault("ISAR_MQTT_PASSWORD", "")
+    print(f"MQTT_MAX_INFLIGHT={settings.MQTT_MAX_INFLIGHT}")
+    for qos in (0, 1):
+        for round_trip_time in (0.0, 0.001, 0.01):
+            run(qos, round_trip_time)
+
+
+if __name__ == "__main__":
+    main()
@@ -67,6 +67,9 @@ def container() -> ApplicationContainer:
             Uploader,
             container.storage_handlers(),
             container.mqtt_client(),
+            container.upload_retry_scheduler(),
+            container.inspection_memory_budget(),
+            metrics=container.upload_metrics(),
         )
     )
     container.robot.override(
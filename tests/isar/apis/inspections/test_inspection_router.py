@@ -0,0 +1,59 @@
+from http import HTTPStatus
+from pathlib import Path
+
+import pytest
+from dependency_injector import providers
+from fastapi.testclient import TestClient
+from pytest_mock import MockerFixture
+
+from isar.config.settings import settings
+from isar.modules import ApplicationContainer
+from isar.storage.local_catalog import LocalInspectionCatalog
+from isar.storage.local_storage import LocalStorage
+from robot_interface.models.inspection.inspection import Image
+from robot_interface.models.mission.mission import Mission
+from tests.test_mocks.inspection import stub_image_metadata
+
+
+@pytest.fixture()
+def local_storage(
+    container: ApplicationContainer, tmp_path: Path, mocker: MockerFixture
+) -> LocalStorage:
+    mocker.patch.object(settings, "LOCAL_STORAGE_PATH", str(tmp_path))
+    catalog = LocalInspectionCatalog()
+    container.local_inspection_catalog.override(providers.Object(catalog))
+    container.local_storage_retention.override(providers.Object(None))
+    return LocalStorage(catalog=catalog)
+
+
+def test_query_and_download_inspection(
+    local_storage: LocalStorage, client: TestClient
+) -> None:
+    metadata = stub_image_metadata()
+    metadata.tag_id = "tag"
+    local_storage.store(
+        Image(id="image-1", metadata=metadata, data=b"image data"),
+        Mission(id="mission", name="m", tasks=[]),
+    )
+
+    response = client.get("/inspections", params={"tag_id": "tag"})
+    assert response.status_code == HTTPStatus.OK
+    assert [inspection["inspection_id"] for inspection in response.json()] == [
+        "image-1"
+    ]
+
+    response = client.get("/inspections/image-1/data")
+    assert response.status_code == HTTPStatus.OK
+    assert response.content == b"image data"
+
+    response = client.get("/inspections/image-1/metadata")
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["additional_meta"]["inspection_id"] == "image-1"
+
+
+def test_download_unknown_inspection(
+    local_storage: LocalStorage, client: TestClient
+) -> None:
+    response = client.get("/inspections/unknown/data")
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,41 @@
+from http import HTTPStatus
+
+from fastapi.testclient import TestClient
+
+from isar.modules import ApplicationContainer
+
+
+def test_upload_status_summarizes_pending_backlog(
+    container: ApplicationContainer, client: TestClient
+) -> None:
+    metrics = container.upload_metrics()
+    metrics.queued("BlobStorage", "first", 300)
+    metrics.queued("BlobStorage", "second", 100)
+    metrics.queued("LocalStorage", "first", 300)
+    metrics.committed("LocalStorage", "first", duration=1.0)
+    metrics.queued("LocalStorage", "second", 100)
+
+    response = client.get("/uploads/status")
+
+    assert response.status_code == HTTPStatus.OK
+    status = response.json()
+    assert status["pending_inspections"] == 3
+    assert status["pending_bytes"] == 500
+    # Blob storage has no measured throughput yet
+    assert status["estimated_seconds_to_drain"] is None
+    assert [handler["handler"] for handler in status["handlers"]] == [
+        "BlobStorage",
+        "LocalStorage",
+    ]
+
+
+def test_upload_status_without_uploads(client: TestClient) -> None:
+    response = client.get("/uploads/status")
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        "pending_inspections": 0,
+        "pending_bytes": 0,
+        "estimated_seconds_to_drain": 0.0,
+        "handlers": [],
+    }
@@ -0,0 +1,125 @@
+from queue import Queue
+
+import pytest
+from pytest_mock import MockerFixture
+
+from isar.config.settings import settings
+from isar.services.service_connections.mqtt.mission_topics import MissionTopics
+from isar.services.utilities import mqtt_utilities
+from isar.services.utilities.mqtt_utilities import (
+    publish_mission_status,
+    publish_task_status,
+)
+from robot_interface.models.mission.status import MissionStatus, TaskStatus
+from robot_interface.telemetry.payloads import LatestMissionPayload
+from tests.test_mocks.mqtt_client import MqttPublisherFake
+from tests.test_mocks.task import StubTask
+
+
+@pytest.fixture()
+def mission_topics(mocker: MockerFixture) -> MissionTopics:
+    mocker.patch.object(settings, "MQTT_RETAINED_MISSION_TOPICS_LIFETIME", 60.0)
+    mission_topics = MissionTopics()
+    mocker.patch.object(mqtt_utilities, "mission_topics", mission_topics)
+    return mission_topics
+
+
+def _mission(mission_id: str, status: MissionStatus) -> dict:
+    return {
+        "mission_id": mission_id,
+        "status": status,
+        "error_reason": None,
+        "error_description": None,
+    }
+
+
+def test_topics_of_finished_mission_are_cleared_after_their_lifetime(
+    mission_topics: MissionTopics,
+) -> None:
+    mission_topics.mission_published(
+        "mission/a", True, _mission("a", MissionStatus.InProgress), now=0
+    )
+    mission_topics.task_published("task/1", True, "a", {"task_id": "1"})
+    mission_topics.task_published("task/2", True, "a", {"task_id": "2"})
+    mission_topics.mission_published(
+        "mission/b", True, _mission("b", MissionStatus.InProgress), now=0
+    )
+    mission_topics.mission_published(
+        "mission/a", True, _mission("a", MissionStatus.Successful), now=10
+    )
+
+    assert mission_topics.take_due(now=69) == []
+    assert mission_topics.take_due(now=70) == ["mission/a", "task/1", "task/2"]
+    assert mission_topics.take_due(now=1000) == []
+
+
+def test_topics_which_are_not_retained_are_not_cleared(
+    mission_topics: MissionTopics,
+) -> None:
+    mission_topics.task_published("task/1", False, "a", {"task_id": "1"})
+    mission_topics.mission_published(
+        "mission/a", False, _mission("a", MissionStatus.Failed), now=0
+    )
+
+    assert mission_topics.take_due(now=1000) == []
+
+
+def test_cleanup_source_publishes_empty_retained_messages(
+    mission_topics: MissionTopics,
+) -> None:
+    mission_topics.mission_published(
+        "mission/a", True, _mission("a", MissionStatus.Cancelled), now=-60
+    )
+    queue: Queue = Queue()
+
+    mission_topics.telemetry_source(queue).publish()
+
+    assert queue.get(block=False)[:4] == ("mission/a", "", 1, True)
+
+
+def test_latest_mission_holds_the_status_of_its_tasks(
+    mission_topics: MissionTopics, mocker: MockerFixture
+) -> None:
+    mocker.patch.object(settings, "MQTT_LATEST_MISSION_ENABLED", True)
+    queue: Queue = Queue()
+    mqtt_publisher = MqttPublisherFake()
+
+    publish_mission_status(queue, "mission", MissionStatus.InProgress, None)
+    publish_task_status(
+        mqtt_publisher, StubTask.take_image(status=TaskStatus.Successful), "mission"
+    )
+
+    messages = [queue.get(block=False) for _ in range(queue.qsize())]
+    assert [topic for topic, *_ in messages] == [
+        settings.TOPIC_ISAR_MISSION + "/mission",
+        settings.TOPIC_ISAR_LATEST_MISSION,
+    ]
+    latest = mqtt_publisher.published[-1]
+    assert latest["topic"] == settings.TOPIC_ISAR_LATEST_MISSION
+    assert latest["retain"]
+    payload = LatestMissionPayload.model_validate_json(latest["payload"])
+    assert payload.model_dump_json() == latest["payload"]
+    assert payload.mission_id == "mission"
+    assert payload.status == MissionStatus.InProgress
+    assert [task.status for task in payload.tasks] == [TaskStatus.Successful]
+
+
+def test_topics_published_after_mission_is_cleared_are_not_tracked(
+    mission_topics: MissionTopics,
+) -> None:
+    mission_topics.mission_published(
+        "mission/a", True, _mission("a", MissionStatus.Failed), now=0
+    )
+    mission_topics.task_published("task/1", True, "a", {"task_id": "1"})
+    mission_topics.mission_published(
+        "mission/a", True, _mission("a", MissionStatus.Failed), now=30
+    )
+
+    assert mission_topics.take_due(now=60) == ["mission/a", "task/1"]
+
+    mission_topics.task_published("task/2", True, "a", {"task_id": "2"})
+    mission_topics.mission_published(
+        "mission/a", True, _mission("a", MissionStatus.Failed), now=60
+    )
+
+    assert mission_topics.take_due(now=1000) == []
@@ -0,0 +1,48 @@
+from typing import Any
+
+from paho.mqtt import client as mqtt
+from pytest_mock import MockerFixture
+
+from isar.services.service_connections.mqtt import mqtt_client
+from isar.services.service_connections.mqtt.mqtt_client import MqttClient
+from isar.services.service_connections.mqtt.mqtt_outbound_queue import MqttOutboundQueue
+from robot_interface.telemetry import mqtt_client as telemetry_mqtt_client
+
+POSE_TOPIC = "isar/00000000-0000-0000-0000-000000000000/pose"
+
+
+def _client() -> MqttClient:
+    return MqttClient(mqtt_queue=MqttOutboundQueue(maxsize=10, persistence_path=""))
+
+
+def test_acknowledgement_of_a_resent_message_is_dropped() -> None:
+    client = _client()
+
+    client.on_publish(client.client, None, 42, None, None)  # type: ignore[arg-type]
+
+    assert client._published_before_registered == set()
+
+
+def test_acknowledgement_received_during_publish_is_matched(
+    mocker: MockerFixture,
+) -> None:
+    latencies: list[float] = []
+    client = _client()
+    client.publish_latency_listeners.append(latencies.append)
+
+    def publish(*_: Any) -> mqtt.MQTTMessageInfo:
+        # The network thread acknowledges the message before publish returns
+        client.on_publish(client.client, None, 7, None, None)  # type: ignore[arg-type]
+        return mqtt.MQTTMessageInfo(7)
+
+    mocker.patch.object(client.topic_aliases, "publish", side_effect=publish)
+
+    client.publish(topic=POSE_TOPIC, payload="pose")
+
+    assert len(latencies) == 1
+    assert client._publish_times == {}
+    assert client._published_before_registered == set()
+
+
+def test_props_expiry_is_importable_from_the_mqtt_client() -> None:
+    assert mqtt_client.props_expiry is telemetry_mqtt_client.props_expiry
@@ -0,0 +1,201 @@
+from pathlib import Path
+
+from pytest_mock import MockerFixture
+
+from isar.config.settings import settings
+from isar.services.service_connections.mqtt import mqtt_outbound_queue
+from isar.services.service_connections.mqtt.mqtt_outbound_queue import MqttOutboundQueue
+from robot_interface.telemetry.mqtt_client import props_expiry
+
+POSE_TOPIC = f"isar/{settings.ISAR_ID}/pose"
+BATTERY_TOPIC = f"isar/{settings.ISAR_ID}/battery"
+
+
+def _topics(queue: MqttOutboundQueue) -> list[str]:
+    topics: list[str] = []
+    while not queue.empty():
+        topics.append(queue.get(block=False)[0])
+    return topics
+
+
+def test_messages_are_published_by_priority() -> None:
+    queue = MqttOutboundQueue(maxsize=10, persistence_path="")
+    queue.put((POSE_TOPIC, "pose", 0, False, None))
+    queue.put((settings.TOPIC_ISAR_INSPECTION_RESULT, "result", 1, True, None))
+    queue.put((settings.TOPIC_ISAR_STATUS, "status", 1, True, None))
+    queue.put((settings.TOPIC_ISAR_TASK, "task", 1, True, None))
+
+    assert _topics(queue) == [
+        settings.TOPIC_ISAR_STATUS,
+        settings.TOPIC_ISAR_TASK,
+        settings.TOPIC_ISAR_INSPECTION_RESULT,
+        POSE_TOPIC,
+    ]
+
+
+def test_full_queue_drops_oldest_telemetry_first() -> None:
+    queue = MqttOutboundQueue(maxsize=2, persistence_path="")
+    queue.put((POSE_TOPIC, "pose", 0, False, None))
+    queue.put((BATTERY_TOPIC, "battery", 0, False, None))
+    queue.put((settings.TOPIC_ISAR_STATUS, "status", 1, True, None))
+
+    assert _topics(queue) == [settings.TOPIC_ISAR_STATUS, BATTERY_TOPIC]
+
+
+def test_full_queue_of_state_messages_drops_new_telemetry() -> None:
+    queue = MqttOutboundQueue(maxsize=1, persistence_path="")
+    queue.put((settings.TOPIC_ISAR_STATUS, "status", 1, True, None))
+    queue.put((POSE_TOPIC, "pose", 0, False, None))
+
+    assert _topics(queue) == [settings.TOPIC_ISAR_STATUS]
+
+
+def test_expired_messages_are_dropped(mocker: MockerFixture) -> None:
+    now = 1000.0
+    mocker.patch.object(mqtt_outbound_queue.time, "time", lambda: now)
+    queue = MqttOutboundQueue(maxsize=10, persistence_path="")
+    queue.put((POSE_TOPIC, "pose", 0, False, props_expiry(10)))
+    queue.put((settings.TOPIC_ISAR_STATUS, "status", 1, True, props_expiry(60)))
+
+    now += 20
+    assert queue.qsize() == 1
+    topic, _, _, _, properties = queue.get(block=False)
+    assert topic == settings.TOPIC_ISAR_STATUS
+    assert properties.MessageExpiryInterval == 40
+
+
+def test_messages_are_not_dropped_before_their_expiry(mocker: MockerFixture) -> None:
+    now = 1000.0
+    mocker.patch.object(mqtt_outbound_queue.time, "time", lambda: now)
+    queue = MqttOutboundQueue(maxsize=10, persistence_path="")
+    queue.put((settings.TOPIC_ISAR_STATUS, "status", 1, True, props_expiry(60)))
+
+    now += 59.5
+    assert queue.qsize() == 1
+    _, _, _, _, properties = queue.get(block=False)
+    assert properties.MessageExpiryInterval == 1
+
+
+def test_batch_drains_available_messages_in_order() -> None:
+    queue = MqttOutboundQueue(maxsize=10, persistence_path="")
+    queue.put((POSE_TOPIC, "pose", 0, False, None))
+    queue.put((settings.TOPIC_ISAR_STATUS, "status", 1, True, None))
+    queue.put((settings.TOPIC_ISAR_TASK, "task", 1, True, None))
+
+    assert [item[1] for item in queue.get_batch(max_items=2)] == ["status", "task"]
+    assert [item[1] for item in queue.get_batch(max_items=2)] == ["pose"]
+    assert queue.get_batch(max_items=2, timeout=0.01) == []
+
+
+def test_requeued_message_is_published_first() -> None:
+    queue = MqttOutboundQueue(maxsize=10, persistence_path="")
+    queue.put((settings.TOPIC_ISAR_STATUS, "first", 1, True, None))
+    queue.put((settings.TOPIC_ISAR_STATUS, "second", 1, True, None))
+
+    queue.requeue(queue.get(block=False))
+
+    assert queue.get(block=False)[1] == "first"
+
+
+def test_unsent_telemetry_is_superseded_by_newer_messages() -> None:
+    queue = MqttOutboundQueue(maxsize=10, persistence_path="", coalesce_telemetry=True)
+    queue.put((POSE_TOPIC, "first pose", 0, False, None))
+    queue.put((BATTERY_TOPIC, "battery", 0, False, None))
+    queue.put((POSE_TOPIC, "second pose", 0, False, None))
+    queue.put((POSE_TOPIC, "third pose", 0, False, None))
+
+    assert queue.superseded == 2
+    assert [queue.get(block=False)[1] for _ in range(queue.qsize())] == [
+        "third pose",
+        "battery",
+    ]
+
+    queue.put((POSE_TOPIC, "fourth pose", 0, False, None))
+    assert queue.get(block=False)[1] == "fourth pose"
+
+
+def test_retained_and_state_messages_are_not_coalesced() -> None:
+    queue = MqttOutboundQueue(maxsize=10, persistence_path="", coalesce_telemetry=True)
+    queue.put((POSE_TOPIC, "first pose", 0, True, None))
+    queue.put((POSE_TOPIC, "second pose", 0, True, None))
+    queue.put((settings.TOPIC_ISAR_STATUS, "busy", 1, True, None))
+    queue.put((settings.TOPIC_ISAR_STATUS, "available", 1, True, None))
+
+    assert queue.superseded == 0
+    assert queue.qsize() == 4
+
+
+def test_state_messages_are_restored_after_restart(tmp_path: Path) -> None:
+    persistence_path = str(tmp_path / "mqtt_queue.sqlite3")
+    queue = MqttOutboundQueue(maxsize=10, persistence_path=persistence_path)
+    queue.put((settings.TOPIC_ISAR_MISSION, "mission", 1, True, props_expiry(60)))
+    queue.put((settings.TOPIC_ISAR_STATUS, "status", 1, True, None))
+    queue.put((POSE_TOPIC, "pose", 0, False, None))
+    assert queue.get(block=False)[1] == "mission"
+
+    restored = MqttOutboundQueue(maxsize=10, persistence_path=persistence_path)
+
+    topic, payload, qos, retain, properties = restored.get(block=False)
+    assert (topic, payload, qos, retain) == (
+        settings.TOPIC_ISAR_STATUS,
+        "status",
+        1,
+        True,
+    )
+    assert properties is None
+    assert restored.empty()
+
+
+def test_mission_and_task_topics_are_persisted_state_messages(
+    tmp_path: Path,
+) -> None:
+    persistence_path = str(tmp_path / "mqtt_queue.sqlite3")
+    queue = MqttOutboundQueue(maxsize=10, persistence_path=persistence_path)
+    queue.put((POSE_TOPIC, "pose", 0, False, None))
+    queue.put((settings.TOPIC_ISAR_INSPECTION_RESULT, "result", 1, False, None))
+    queue.put((f"{settings.TOPIC_ISAR_TASK}/task-1", "task", 1, True, None))
+    queue.put((f"{settings.TOPIC_ISAR_MISSION}/mission-1", "mission", 1, True, None))
+
+    restored = MqttOutboundQueue(maxsize=10, persistence_path=persistence_path)
+
+    assert _topics(restored) == [
+        f"{settings.TOPIC_ISAR_TASK}/task-1",
+        f"{settings.TOPIC_ISAR_MISSION}/mission-1",
+        settings.TOPIC_ISAR_INSPECTION_RESULT,
+    ]
+
+
+def test_messages_are_routed_to_their_connection_lane(tmp_path: Path) -> None:
+    persistence_path = str(tmp_path / "mqtt_queue.sqlite3")
+    queue = MqttOutboundQueue(maxsize=10, persistence_path=persistence_path)
+    bulk = queue.add_lane("bulk", ["pose", "inspection_result"])
+    queue.put((POSE_TOPIC, "pose", 0, False, None))
+    queue.put((settings.TOPIC_ISAR_INSPECTION_RESULT, "result", 1, False, None))
+    queue.put((settings.TOPIC_ISAR_STATUS, "status", 1, True, None))
+    queue.put((BATTERY_TOPIC, "battery", 0, False, None))
+
+    assert bulk.lane == "bulk"
+    assert bulk.persistence_path == str(tmp_path / "mqtt_queue_bulk.sqlite3")
+    assert _topics(queue) == [settings.TOPIC_ISAR_STATUS, BATTERY_TOPIC]
+    assert _topics(bulk) == [settings.TOPIC_ISAR_INSPECTION_RESULT, POSE_TOPIC]
+
+
+def test_queued_messages_of_all_lanes_are_observed() -> None:
+    queue = MqttOutboundQueue(maxsize=10, persistence_path="")
+    bulk = queue.add_lane("bulk", ["pose"])
+    queue.put((settings.TOPIC_ISAR_STATUS, "status", 1, True, None))
+    queue.put((POSE_TOPIC, "pose", 0, False, None))
+
+    observations = queue._observe_queued_messages(None)  # type: ignore[arg-type]
+
+    queued = {
+        (observation.attributes["lane"], observation.attributes["priority"]): (
+            observation.value
+        )
+        for observation in observations
+        if observation.attributes is not None
+    }
+    assert queued[("default", "state")] == 1
+    assert queued[("bulk", "telemetry")] == 1
+    assert queued[("bulk", "state")] == 0
+    assert bulk.qsize() == 1
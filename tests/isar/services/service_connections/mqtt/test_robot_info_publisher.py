@@ -0,0 +1,41 @@
+import json
+
+from pytest_mock import MockerFixture
+
+from isar.config.settings import settings
+from isar.services.service_connections.mqtt.robot_info_publisher import (
+    RobotInfoPublisher,
+)
+from tests.test_mocks.mqtt_client import MqttPublisherFake
+
+
+def test_robot_info_is_retained_and_only_published_on_change(
+    mocker: MockerFixture,
+) -> None:
+    mqtt_publisher = MqttPublisherFake()
+    publisher = RobotInfoPublisher(mqtt_queue=None)  # type: ignore
+    publisher.mqtt_publisher = mqtt_publisher  # type: ignore
+    mocker.patch.object(settings, "MQTT_TELEMETRY_MAX_SILENCE", 10.0)
+    for port in (3000, 3000, 3001):
+        mocker.patch.object(settings, "API_PORT", port)
+        publisher.publish(now=0)
+
+    published = mqtt_publisher.published
+    assert [json.loads(message["payload"])["port"] for message in published] == [
+        3000,
+        3001,
+    ]
+    assert all(message["retain"] and message["qos"] == 1 for message in published)
+
+
+def test_unchanged_robot_info_is_published_again_after_max_silence(
+    mocker: MockerFixture,
+) -> None:
+    mocker.patch.object(settings, "MQTT_TELEMETRY_MAX_SILENCE", 10.0)
+    mqtt_publisher = MqttPublisherFake()
+    publisher = RobotInfoPublisher(mqtt_queue=None)  # type: ignore
+    publisher.mqtt_publisher = mqtt_publisher  # type: ignore
+    for now in (100, 109, 110, 115):
+        publisher.publish(now=now)
+
+    assert len(mqtt_publisher.published) == 2
@@ -0,0 +1,107 @@
+from typing import Any
+
+from paho.mqtt import client as mqtt
+from paho.mqtt.packettypes import PacketTypes
+from paho.mqtt.properties import Properties
+
+from isar.services.service_connections.mqtt.topic_aliases import TopicAliases
+from robot_interface.telemetry.mqtt_client import props_expiry
+
+POSE_TOPIC = "isar/00000000-0000-0000-0000-000000000000/pose"
+BATTERY_TOPIC = "isar/00000000-0000-0000-0000-000000000000/battery"
+
+
+class ClientFake:
+    def __init__(self) -> None:
+        self.published: list[tuple[str, int | None]] = []
+        self.rc: mqtt.MQTTErrorCode = mqtt.MQTT_ERR_SUCCESS
+
+    def publish(self, topic: str, properties: Properties | None, **_: Any) -> Any:
+        self.published.append((topic, getattr(properties, "TopicAlias", None)))
+        message_info = mqtt.MQTTMessageInfo(len(self.published))
+        message_info.rc = self.rc
+        return message_info
+
+
+def _connack(topic_alias_maximum: int) -> Properties:
+    properties = Properties(PacketTypes.CONNACK)
+    properties.TopicAliasMaximum = topic_alias_maximum
+    return properties
+
+
+def _publish(aliases: TopicAliases, client: Any, topic: str, qos: int = 0) -> None:
+    aliases.publish(client, topic, "payload", qos, False, props_expiry(10))
+
+
+def test_repeated_topics_are_sent_as_aliases() -> None:
+    aliases = TopicAliases(maximum=16)
+    client = ClientFake()
+    aliases.connected(_connack(topic_alias_maximum=1))
+
+    for topic in (POSE_TOPIC, POSE_TOPIC, BATTERY_TOPIC, POSE_TOPIC):
+        _publish(aliases, client, topic)
+
+    assert client.published == [
+        (POSE_TOPIC, 1),
+        ("", 1),
+        (BATTERY_TOPIC, None),
+        ("", 1),
+    ]
+    # The shared properties of the publisher are left without an alias
+    assert not hasattr(props_expiry(10), "TopicAlias")
+
+
+def test_aliases_are_not_used_without_broker_support_or_above_qos_0() -> None:
+    aliases = TopicAliases(maximum=16)
+    client = ClientFake()
+
+    _publish(aliases, client, POSE_TOPIC)
+    aliases.connected(_connack(topic_alias_maximum=10))
+    _publish(aliases, client, POSE_TOPIC, qos=1)
+    _publish(aliases, client, POSE_TOPIC, qos=1)
+
+    assert client.published == [(POSE_TOPIC, None)] * 3
+
+
+def test_aliases_are_established_again_after_reconnect() -> None:
+    aliases = TopicAliases(maximum=16)
+    client = ClientFake()
+    aliases.connected(_connack(topic_alias_maximum=10))
+    _publish(aliases, client, POSE_TOPIC)
+
+    aliases.reset()
+    _publish(aliases, client, POSE_TOPIC)
+    aliases.connected(_connack(topic_alias_maximum=10))
+    _publish(aliases, client, POSE_TOPIC)
+    _publish(aliases, client, POSE_TOPIC)
+
+    assert client.published == [
+        (POSE_TOPIC, 1),
+        (POSE_TOPIC, None),
+        (POSE_TOPIC, 1),
+        ("", 1),
+    ]
+
+
+def test_failed_publish_forgets_the_aliases() -> None:
+    aliases = TopicAliases(maximum=16)
+    client = ClientFake()
+    aliases.connected(_connack(topic_alias_maximum=10))
+    client.rc = mqtt.MQTT_ERR_NO_CONN
+    _publish(aliases, client, POSE_TOPIC)
+
+    client.rc = mqtt.MQTT_ERR_SUCCESS
+    _publish(aliases, client, POSE_TOPIC)
+
+    assert client.published == [(POSE_TOPIC, 1), (POSE_TOPIC, None)]
+
+
+def test_aliases_are_not_used_by_default() -> None:
+    aliases = TopicAliases()
+    client = ClientFake()
+    aliases.connected(_connack(topic_alias_maximum=10))
+
+    _publish(aliases, client, POSE_TOPIC)
+    _publish(aliases, client, POSE_TOPIC)
+
+    assert client.published == [(POSE_TOPIC, None), (POSE_TOPIC, None)]
@@ -0,0 +1,152 @@
+from datetime import UTC, datetime, timedelta, timezone
+from queue import Queue
+
+from alitra import Frame, Orientation, Pose, Position
+from pydantic import BaseModel
+from pytest_mock import MockerFixture
+
+from isar.config.settings import settings
+from isar.models.status import IsarStatus
+from isar.services.service_connections.mqtt.mission_topics import MissionTopics
+from isar.services.utilities import mqtt_utilities
+from isar.services.utilities.mqtt_utilities import (
+    publish_intervention_needed,
+    publish_isar_status,
+    publish_mission_aborted,
+    publish_mission_status,
+    publish_task_status,
+)
+from robot_interface.models.exceptions.robot_exceptions import ErrorMessage, ErrorReason
+from robot_interface.models.mission.status import MissionStatus, TaskStatus
+from robot_interface.telemetry.mqtt_client import props_expiry
+from robot_interface.telemetry.payload_encoder import PayloadEncoder
+from robot_interface.telemetry.payloads import (
+    InterventionNeededPayload,
+    IsarStatusPayload,
+    LatestMissionPayload,
+    MissionAbortedPayload,
+    MissionPayload,
+    TaskPayload,
+    TelemetryBatteryPayload,
+    TelemetryPosePayload,
+)
+from tests.test_mocks.mqtt_client import MqttPublisherFake
+from tests.test_mocks.task import StubTask
+
+
+def test_published_task_status_matches_the_payload_model() -> None:
+    mqtt_publisher = MqttPublisherFake()
+    task = StubTask.take_image(status=TaskStatus.Failed)
+    task.error_message = ErrorMessage(
+        error_reason=ErrorReason.RobotUnknownErrorException,
+        error_description='Unexpected "error" ✗',
+    )
+
+    publish_task_status(mqtt_publisher, task, mission_id=None)
+
+    payload: str = mqtt_publisher.published[0]["payload"]
+    assert TaskPayload.model_validate_json(payload).model_dump_json() == payload
+    assert mqtt_publisher.published[0]["properties"] is props_expiry(
+        mqtt_publisher.published[0]["properties"].MessageExpiryInterval
+    )
+
+
+def _assert_matches_model(model: type[BaseModel], payload: str) -> None:
+    assert model.model_validate_json(payload).model_dump_json() == payload
+
+
+def _published_payload(queue: Queue) -> str:
+    return queue.get(block=False)[1]
+
+
+def test_published_mission_status_matches_the_payload_model() -> None:
+    queue: Queue = Queue()
+    error_message = ErrorMessage(
+        error_reason=ErrorReason.RobotUnknownErrorException,
+        error_description='Unexpected "error" ✗',
+    )
+
+    publish_mission_status(queue, "mission", MissionStatus.Failed, error_message)
+    publish_mission_status(queue, "mission", MissionStatus.InProgress, None)
+
+    _assert_matches_model(MissionPayload, _published_payload(queue))
+    _assert_matches_model(MissionPayload, _published_payload(queue))
+
+
+def test_published_isar_status_matches_the_payload_model() -> None:
+    mqtt_publisher = MqttPublisherFake()
+
+    publish_isar_status(mqtt_publisher, IsarStatus.Busy)
+
+    _assert_matches_model(IsarStatusPayload, mqtt_publisher.published[0]["payload"])
+
+
+def test_published_mission_aborted_matches_the_payload_model() -> None:
+    queue: Queue = Queue()
+
+    publish_mission_aborted(queue, "mission", 'Robot "lost" ✗')
+    publish_mission_aborted(queue, None, "Robot lost")
+
+    _assert_matches_model(MissionAbortedPayload, _published_payload(queue))
+    _assert_matches_model(MissionAbortedPayload, _published_payload(queue))
+
+
+def test_published_intervention_needed_matches_the_payload_model() -> None:
+    queue: Queue = Queue()
+
+    publish_intervention_needed(queue, 'Robot "stuck" ✗')
+
+    _assert_matches_model(InterventionNeededPayload, _published_payload(queue))
+
+
+def test_published_latest_mission_matches_the_payload_model(
+    mocker: MockerFixture,
+) -> None:
+    mocker.patch.object(settings, "MQTT_LATEST_MISSION_ENABLED", True)
+    mocker.patch.object(mqtt_utilities, "mission_topics", MissionTopics())
+    mqtt_publisher = MqttPublisherFake()
+    task = StubTask.take_image(status=TaskStatus.Failed)
+    task.error_message = ErrorMessage(
+        error_reason=ErrorReason.RobotUnknownErrorException,
+        error_description='Unexpected "error" ✗',
+    )
+
+    publish_mission_status(Queue(), "mission", MissionStatus.InProgress, None)
+    publish_task_status(mqtt_publisher, task, mission_id="mission")
+
+    latest = mqtt_publisher.published[-1]
+    assert latest["topic"] == settings.TOPIC_ISAR_LATEST_MISSION
+    _assert_matches_model(LatestMissionPayload, latest["payload"])
+    assert len(LatestMissionPayload.model_validate_json(latest["payload"]).tasks) == 1
+
+
+def test_encoded_telemetry_matches_model_dump_json() -> None:
+    encoder = PayloadEncoder(isar_id="isar", robot_name="robot")
+    frame = Frame("robot")
+    pose = Pose(
+        position=Position(x=1, y=-2.5, z=0.125, frame=frame),
+        orientation=Orientation(x=0, y=0, z=0.7071, w=0.7071, frame=frame),
+        frame=frame,
+    )
+    timestamp = datetime(2026, 1, 2, 3, 4, 5, 678, tzinfo=UTC)
+    local_timestamp = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=2)))
+
+    assert (
+        encoder.encode(timestamp=timestamp, pose=pose)
+        == TelemetryPosePayload(
+            isar_id="isar", robot_name="robot", timestamp=timestamp, pose=pose
+        ).model_dump_json()
+    )
+    assert (
+        encoder.encode(
+            timestamp=local_timestamp,
+            battery_level=float("nan"),
+            battery_state=None,
+        )
+        == TelemetryBatteryPayload(
+            isar_id="isar",
+            robot_name="robot",
+            timestamp=local_timestamp,
+            battery_level=float("nan"),
+        ).model_dump_json()
+    )
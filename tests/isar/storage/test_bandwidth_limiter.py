@@ -0,0 +1,101 @@
+import time
+from io import BytesIO
+from threading import Thread
+
+import pytest
+from pytest_mock import MockerFixture
+
+from isar.config.settings import settings
+from isar.storage.bandwidth_limiter import (
+    DEFAULT_PRIORITY,
+    METADATA_PRIORITY,
+    UploadBandwidthLimiter,
+    upload_priority,
+)
+from robot_interface.models.inspection.inspection import Image, Video, VideoMetadata
+from tests.test_mocks.inspection import stub_image_metadata
+from tests.wait import wait_until
+
+
+@pytest.fixture()
+def limiter(mocker: MockerFixture) -> UploadBandwidthLimiter:
+    mocker.patch.object(settings, "UPLOAD_BANDWIDTH_LIMIT", 1000)
+    mocker.patch.object(settings, "UPLOAD_BANDWIDTH_BURST", 100)
+    mocker.patch.object(settings, "UPLOAD_THROTTLE_MQTT_LATENCY", 0.5)
+    mocker.patch.object(settings, "UPLOAD_THROTTLE_MIN_FRACTION", 0.1)
+    return UploadBandwidthLimiter()
+
+
+def test_limiter_is_disabled_without_a_rate(mocker: MockerFixture) -> None:
+    mocker.patch.object(settings, "UPLOAD_BANDWIDTH_LIMIT", 0)
+    limiter = UploadBandwidthLimiter()
+    stream = BytesIO(b"data")
+
+    assert not limiter.enabled
+    assert limiter.throttle(stream) is stream
+
+
+def test_acquire_is_limited_to_the_configured_rate(
+    limiter: UploadBandwidthLimiter,
+) -> None:
+    start = time.monotonic()
+    for _ in range(4):
+        limiter.acquire(100)
+
+    # The first 100 bytes are covered by the burst, the remaining 300 take 0.3s
+    assert time.monotonic() - start >= 0.25
+
+
+def test_throttled_stream_reads_all_data(limiter: UploadBandwidthLimiter) -> None:
+    data = bytes(range(256)) * 2
+
+    with limiter.throttle(BytesIO(data), DEFAULT_PRIORITY) as stream:
+        assert stream.read() == data
+
+
+def test_lower_lane_is_served_first(limiter: UploadBandwidthLimiter) -> None:
+    limiter.acquire(100)
+    served: list[str] = []
+
+    def acquire(name: str, priority: int) -> None:
+        limiter.acquire(100, priority)
+        served.append(name)
+
+    video = Thread(target=acquire, args=("video", 2))
+    video.start()
+    wait_until(lambda: len(limiter._waiters) == 1)
+    metadata = Thread(target=acquire, args=("metadata", METADATA_PRIORITY))
+    metadata.start()
+    wait_until(lambda: len(limiter._waiters) == 2)
+
+    video.join(timeout=5)
+    metadata.join(timeout=5)
+    assert served == ["metadata", "video"]
+
+
+def test_high_publish_latency_throttles_uploads(
+    limiter: UploadBandwidthLimiter,
+) -> None:
+    for _ in range(20):
+        limiter.observe_publish_latency(2.0)
+    assert limiter.throttle_factor == pytest.approx(0.1)
+
+    for _ in range(40):
+        limiter.observe_publish_latency(0.01)
+    assert limiter.throttle_factor == 1.0
+
+
+def test_upload_priority_is_taken_from_the_configured_lanes(
+    mocker: MockerFixture,
+) -> None:
+    mocker.patch.object(settings, "UPLOAD_PRIORITY_LANES", {"Video": 2})
+    image = Image(id="image", metadata=stub_image_metadata(), data=b"image")
+    video_metadata = VideoMetadata(
+        **stub_image_metadata().model_dump(exclude={"file_type"}),
+        file_type="mp4",
+        duration=10.0,
+    )
+    video = Video(id="video", metadata=video_metadata, data=b"video")
+
+    assert upload_priority(image) == DEFAULT_PRIORITY
+    assert upload_priority(video) == 2
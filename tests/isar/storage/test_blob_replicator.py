@@ -0,0 +1,92 @@
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from isar.config.settings import settings
+from isar.storage.blob_replicator import BlobReplicator
+from isar.storage.local_storage import LocalStorage
+from isar.storage.memory_budget import InspectionMemoryBudget
+from isar.storage.retry_scheduler import UploadRetryScheduler
+from isar.storage.storage_interface import StoragePaths
+from isar.storage.uploader import Uploader
+from robot_interface.models.inspection.inspection import Image, InspectionBlob
+from robot_interface.models.mission.mission import Mission
+from tests.test_mocks.blob_storage import StorageFake
+from tests.test_mocks.inspection import stub_image_metadata
+from tests.test_mocks.mqtt_client import MqttPublisherFake
+from tests.wait import wait_until
+
+DATA = b"Some binary image data"
+
+
+@pytest.fixture()
+def tiered_uploader(tmp_path: Path, mocker: MockerFixture) -> Uploader:
+    mocker.patch.object(settings, "LOCAL_STORAGE_PATH", str(tmp_path / "results"))
+    mocker.patch.object(settings, "UPLOAD_FAILURE_MAX_WAIT", 0.0001)
+    retry_scheduler = UploadRetryScheduler()
+    return Uploader(
+        storage_handlers=[LocalStorage()],
+        mqtt_publisher=MqttPublisherFake(),
+        retry_scheduler=retry_scheduler,
+        memory_budget=InspectionMemoryBudget(),
+        blob_replicator=BlobReplicator(StorageFake(), retry_scheduler),
+    )
+
+
+def _upload(uploader: Uploader) -> Image:
+    inspection = Image(id="image-1", metadata=stub_image_metadata(), data=DATA)
+    uploader.upload_inspection(inspection, Mission(id="id", name="m"))
+    return inspection
+
+
+def test_result_is_published_once_replicated_to_blob_storage(
+    tiered_uploader: Uploader,
+) -> None:
+    mqtt_fake: MqttPublisherFake = tiered_uploader.mqtt_publisher  # type: ignore
+    blob_storage: StorageFake = tiered_uploader.blob_replicator.blob_storage  # type: ignore
+    blob_storage.failure_count = 2
+
+    _upload(tiered_uploader)
+
+    wait_until(lambda: mqtt_fake.count() == 1)
+    replicated = blob_storage.stored_inspections[0]
+    assert replicated.get_payload().read_bytes() == DATA
+
+
+def test_local_copy_is_deleted_after_replication_when_configured(
+    tiered_uploader: Uploader, tmp_path: Path, mocker: MockerFixture
+) -> None:
+    mocker.patch.object(settings, "STORAGE_TIERED_DELETE_LOCAL_AFTER_REPLICATION", True)
+    mqtt_fake: MqttPublisherFake = tiered_uploader.mqtt_publisher  # type: ignore
+
+    _upload(tiered_uploader)
+
+    wait_until(lambda: mqtt_fake.count() == 1)
+    wait_until(lambda: not any(p.is_file() for p in tmp_path.rglob("*")))
+
+
+def test_replication_continues_after_an_unexpected_error(
+    tiered_uploader: Uploader, mocker: MockerFixture
+) -> None:
+    blob_storage: StorageFake = tiered_uploader.blob_replicator.blob_storage  # type: ignore
+    store = blob_storage.store
+    failures = [FileNotFoundError("Evicted from local storage")]
+
+    def store_after_failure(
+        inspection: InspectionBlob, mission: Mission
+    ) -> StoragePaths:
+        if failures:
+            raise failures.pop()
+        return store(inspection=inspection, mission=mission)
+
+    mocker.patch.object(blob_storage, "store", side_effect=store_after_failure)
+    on_replicated = mocker.Mock(side_effect=[RuntimeError("Callback failed"), None])
+    mocker.patch.object(tiered_uploader, "_publish_stored_inspection", on_replicated)
+
+    _upload(tiered_uploader)
+    _upload(tiered_uploader)
+    _upload(tiered_uploader)
+
+    wait_until(lambda: on_replicated.call_count == 2)
+    assert tiered_uploader.blob_replicator._thread.is_alive()  # type: ignore
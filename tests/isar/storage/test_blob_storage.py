@@ -0,0 +1,152 @@
+import gzip
+import hashlib
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from azure.core.exceptions import ResourceExistsError
+from pytest_mock import MockerFixture
+
+from isar.config.settings import settings
+from isar.storage.blob_storage import BlobStorage
+from isar.storage.preview import InspectionPreview
+from isar.storage.storage_interface import StorageException
+from robot_interface.models.inspection.inspection import Image
+from robot_interface.models.inspection.payload import BytesPayload
+from robot_interface.models.mission.mission import Mission
+from tests.test_mocks.inspection import stub_image_metadata
+
+DATA = b"Some binary image data"
+
+
+@pytest.fixture()
+def blob_storage(mocker: MockerFixture) -> BlobStorage:
+    mocker.patch.object(BlobStorage, "_get_container_client", return_value=MagicMock())
+    return BlobStorage()
+
+
+def _container_with_existing_blob(existing_md5: bytes | None) -> MagicMock:
+    container_client = MagicMock()
+    blob_client = container_client.get_blob_client.return_value
+    blob_client.blob_name = "folder/file.jpg"
+    blob_client.upload_blob.side_effect = ResourceExistsError("exists")
+    blob_client.get_blob_properties.return_value.content_settings.content_md5 = (
+        existing_md5
+    )
+    return container_client
+
+
+def test_upload_sets_content_md5(blob_storage: BlobStorage) -> None:
+    container_client = MagicMock()
+    container_client.get_blob_client.return_value.blob_name = "folder/file.jpg"
+
+    blob_storage._upload_file(
+        filename=Path("folder/file.jpg"),
+        data=DATA,
+        container_client=container_client,
+        account_name="account",
+    )
+
+    blob_client = container_client.get_blob_client.return_value
+    content_settings = blob_client.upload_blob.call_args.kwargs["content_settings"]
+    assert content_settings.content_md5 == hashlib.md5(DATA).digest()
+
+
+def test_existing_blob_with_identical_content_is_treated_as_uploaded(
+    blob_storage: BlobStorage,
+) -> None:
+    container_client = _container_with_existing_blob(hashlib.md5(DATA).digest())
+
+    path = blob_storage._upload_file(
+        filename=Path("folder/file.jpg"),
+        data=DATA,
+        container_client=container_client,
+        account_name="account",
+    )
+
+    assert path.blob_name == "folder/file.jpg"
+
+
+def test_existing_blob_with_different_content_raises(
+    blob_storage: BlobStorage,
+) -> None:
+    container_client = _container_with_existing_blob(hashlib.md5(b"other").digest())
+
+    with pytest.raises(StorageException):
+        blob_storage._upload_file(
+            filename=Path("folder/file.jpg"),
+            data=DATA,
+            container_client=container_client,
+            account_name="account",
+        )
+
+
+def test_failure_to_hash_payload_raises_storage_exception(
+    blob_storage: BlobStorage, mocker: MockerFixture
+) -> None:
+    mocker.patch.object(
+        BlobStorage, "_compute_content_md5", side_effect=OSError("worker died")
+    )
+    container_client = MagicMock()
+
+    with pytest.raises(StorageException):
+        blob_storage._upload_file(
+            filename=Path("folder/file.jpg"),
+            data=DATA,
+            container_client=container_client,
+            account_name="account",
+        )
+
+    container_client.get_blob_client.return_value.upload_blob.assert_not_called()
+
+
+def test_upload_sets_content_encoding_of_compressed_payload(
+    blob_storage: BlobStorage,
+) -> None:
+    container_client = MagicMock()
+    container_client.get_blob_client.return_value.blob_name = "folder/file.wav"
+
+    blob_storage._upload_file(
+        filename=Path("folder/file.wav"),
+        data=BytesPayload(gzip.compress(DATA), content_encoding="gzip"),
+        container_client=container_client,
+        account_name="account",
+    )
+
+    blob_client = container_client.get_blob_client.return_value
+    content_settings = blob_client.upload_blob.call_args.kwargs["content_settings"]
+    assert content_settings.content_encoding == "gzip"
+
+
+def test_failure_to_compress_metadata_raises_storage_exception(
+    blob_storage: BlobStorage, mocker: MockerFixture
+) -> None:
+    mocker.patch.object(settings, "UPLOAD_METADATA_COMPRESSION", "brotli")
+    blob_storage.container_client_data = MagicMock()
+    blob_storage.container_client_metadata = MagicMock()
+    inspection = Image(id="image-1", metadata=stub_image_metadata(), data=DATA)
+
+    with pytest.raises(StorageException):
+        blob_storage.store(inspection, Mission(id="id", name="m", tasks=[]))
+
+    blob_storage.container_client_metadata.get_blob_client.assert_not_called()
+
+
+def test_preview_is_stored_without_metadata_file(blob_storage: BlobStorage) -> None:
+    blob_storage.container_client_data = MagicMock()
+    blob_storage.container_client_metadata = MagicMock()
+    blob_client = blob_storage.container_client_data.get_blob_client.return_value
+    blob_client.blob_name = "folder/preview.jpg"
+    preview = InspectionPreview(
+        id="image-1",
+        metadata=stub_image_metadata(),
+        data=BytesPayload(DATA),
+    )
+
+    path = blob_storage.store_preview(
+        preview=preview, mission=Mission(id="id", name="m", tasks=[])
+    )
+
+    assert blob_client.upload_blob.call_count == 1
+    assert path.blob_name == "folder/preview.jpg"
+    blob_storage.container_client_metadata.get_blob_client.assert_not_called()
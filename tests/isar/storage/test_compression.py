@@ -0,0 +1,108 @@
+import gzip
+import json
+import os
+from compression import zstd
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from isar.config.settings import settings
+from isar.storage.compression import InspectionCompressor
+from isar.storage.local_storage import LocalStorage
+from isar.storage.process_pool import InspectionProcessPool
+from robot_interface.models.inspection.inspection import Audio, AudioMetadata, Image
+from robot_interface.models.inspection.payload import ChunkIteratorPayload
+from robot_interface.models.mission.mission import Mission
+from tests.test_mocks.inspection import stub_image_metadata
+
+DATA = b"Some compressible audio data" * 10000
+
+
+@pytest.fixture()
+def compressor(mocker: MockerFixture) -> InspectionCompressor:
+    mocker.patch.object(
+        settings, "UPLOAD_COMPRESSION", {"Audio": "zstd", "Image": "gzip"}
+    )
+    return InspectionCompressor()
+
+
+def _audio(data: bytes | ChunkIteratorPayload = DATA) -> Audio:
+    metadata = AudioMetadata(
+        **stub_image_metadata().model_dump(exclude={"file_type"}),
+        file_type="wav",
+        duration=2.5,
+    )
+    return Audio(id="audio-1", metadata=metadata, data=data)
+
+
+def test_compresses_inspection_per_type(compressor: InspectionCompressor) -> None:
+    audio = compressor.compress(_audio()).get_payload()
+    image = compressor.compress(
+        Image(id="image-1", metadata=stub_image_metadata(), data=DATA)
+    ).get_payload()
+
+    assert audio.content_encoding == "zstd"
+    assert zstd.decompress(audio.read_bytes()) == DATA
+    assert image.content_encoding == "gzip"
+    assert gzip.decompress(image.read_bytes()) == DATA
+
+
+def test_compresses_chunked_payload(compressor: InspectionCompressor) -> None:
+    chunks = ChunkIteratorPayload(DATA[i : i + 1000] for i in range(0, len(DATA), 1000))
+
+    payload = compressor.compress(_audio(chunks)).get_payload()
+
+    assert zstd.decompress(payload.read_bytes()) == DATA
+
+
+def test_keeps_inspection_which_does_not_compress(
+    compressor: InspectionCompressor,
+) -> None:
+    inspection = _audio(os.urandom(10000))
+
+    assert compressor.compress(inspection) is inspection
+
+
+def test_closes_compressed_copy_which_is_not_smaller(
+    compressor: InspectionCompressor, mocker: MockerFixture
+) -> None:
+    chunks = ChunkIteratorPayload([os.urandom(10000)])
+    close = mocker.spy(ChunkIteratorPayload, "close")
+    inspection = _audio(chunks)
+
+    assert compressor.compress(inspection) is inspection
+    close.assert_called_once()
+    assert close.call_args.args[0] is not chunks
+
+
+def test_local_storage_records_content_encoding(
+    compressor: InspectionCompressor, tmp_path: Path, mocker: MockerFixture
+) -> None:
+    mocker.patch.object(settings, "LOCAL_STORAGE_PATH", str(tmp_path))
+
+    paths = LocalStorage().store(
+        compressor.compress(_audio()), Mission(id="id", name="m", tasks=[])
+    )
+
+    data_path = paths.data_path.file_path
+    metadata = json.loads(paths.metadata_path.file_path.read_bytes())
+    assert data_path.name.endswith(".zst")
+    assert zstd.decompress(data_path.read_bytes()) == DATA
+    assert metadata["data_files"][0]["file_name"] == data_path.name
+    assert metadata["data_files"][0]["content_encoding"] == "zstd"
+
+
+def test_large_inspection_is_compressed_in_process_pool(
+    mocker: MockerFixture,
+) -> None:
+    mocker.patch.object(settings, "UPLOAD_COMPRESSION", {"Audio": "gzip"})
+    mocker.patch.object(settings, "INSPECTION_PROCESS_POOL_MIN_SIZE", 1)
+    process_pool = InspectionProcessPool()
+    transform = mocker.spy(process_pool, "transform")
+
+    payload = InspectionCompressor(process_pool).compress(_audio()).get_payload()
+
+    transform.assert_called_once()
+    assert gzip.decompress(payload.read_bytes()) == DATA
+    process_pool._get_executor().shutdown()
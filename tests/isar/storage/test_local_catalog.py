@@ -0,0 +1,94 @@
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from alitra import Frame, Position
+from pytest_mock import MockerFixture
+
+from isar.config.settings import settings
+from isar.storage.local_catalog import LocalInspectionCatalog
+from isar.storage.local_retention import LocalStorageRetention
+from isar.storage.local_storage import LocalStorage
+from robot_interface.models.inspection.inspection import Image
+from robot_interface.models.mission.mission import Mission
+from tests.test_mocks.inspection import stub_image_metadata
+
+START = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+@pytest.fixture()
+def catalog(tmp_path: Path, mocker: MockerFixture) -> LocalInspectionCatalog:
+    mocker.patch.object(settings, "LOCAL_STORAGE_PATH", str(tmp_path))
+    return LocalInspectionCatalog()
+
+
+def _inspection(
+    inspection_id: str,
+    tag_id: str | None = None,
+    minutes: int = 0,
+    x: float = 0,
+) -> Image:
+    metadata = stub_image_metadata()
+    metadata.tag_id = tag_id
+    metadata.start_time = START + timedelta(minutes=minutes)
+    metadata.robot_pose.position = Position(x=x, y=0, z=0, frame=Frame("asset"))
+    return Image(id=inspection_id, metadata=metadata, data=b"data")
+
+
+def _add(catalog: LocalInspectionCatalog, inspection: Image, mission_id: str) -> None:
+    catalog.add(
+        inspection,
+        Mission(id=mission_id, name="m", tasks=[]),
+        Path(f"{inspection.id}.jpg"),
+        Path(f"{inspection.id}.json"),
+    )
+
+
+def test_query_by_fields(catalog: LocalInspectionCatalog) -> None:
+    _add(catalog, _inspection("a", tag_id="tag", minutes=0), "mission-1")
+    _add(catalog, _inspection("b", tag_id="tag", minutes=10), "mission-2")
+    _add(catalog, _inspection("c", tag_id="other", minutes=5), "mission-2")
+
+    assert [e.inspection_id for e in catalog.query(tag_id="tag")] == ["b", "a"]
+    assert [e.inspection_id for e in catalog.query(tag_id="tag", limit=1)] == ["b"]
+    assert [e.inspection_id for e in catalog.query(mission_id="mission-2")] == [
+        "b",
+        "c",
+    ]
+    assert len(catalog.query(inspection_type="Image")) == 3
+    assert catalog.query(inspection_type="ThermalImage") == []
+    assert [
+        e.inspection_id
+        for e in catalog.query(
+            start_time=START + timedelta(minutes=1),
+            end_time=START + timedelta(minutes=6),
+        )
+    ] == ["c"]
+
+
+def test_query_by_position(catalog: LocalInspectionCatalog) -> None:
+    _add(catalog, _inspection("near", x=1), "mission")
+    _add(catalog, _inspection("far", x=10), "mission")
+
+    entries = catalog.query(x=0, y=0, radius=2)
+
+    assert [entry.inspection_id for entry in entries] == ["near"]
+
+
+def test_evicted_inspections_are_removed_from_catalog(
+    tmp_path: Path, mocker: MockerFixture, catalog: LocalInspectionCatalog
+) -> None:
+    retention = LocalStorageRetention()
+    local_storage = LocalStorage(retention=retention, catalog=catalog)
+    inspection = _inspection("a", tag_id="tag")
+    local_storage.store(inspection, Mission(id="mission", name="m", tasks=[]))
+
+    entry = catalog.get("a")
+    assert entry is not None
+    assert entry.data_path.read_bytes() == b"data"
+
+    mocker.patch.object(settings, "LOCAL_STORAGE_QUOTA", 1)
+    retention.mark_uploaded("a")
+    retention.enforce()
+
+    assert catalog.get("a") is None
@@ -0,0 +1,90 @@
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from isar.config.settings import settings
+from isar.storage.local_retention import LocalStorageRetention
+
+
+@pytest.fixture()
+def retention(tmp_path: Path, mocker: MockerFixture) -> LocalStorageRetention:
+    mocker.patch.object(settings, "LOCAL_STORAGE_PATH", str(tmp_path))
+    mocker.patch.object(settings, "LOCAL_STORAGE_QUOTA", 250)
+    return LocalStorageRetention()
+
+
+def _write(tmp_path: Path, mission_folder: str, name: str) -> Path:
+    path = tmp_path / mission_folder / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * 100)
+    return path
+
+
+def test_least_recently_used_mission_folder_is_evicted_first(
+    retention: LocalStorageRetention, tmp_path: Path
+) -> None:
+    oldest = _write(tmp_path, "mission-1", "a.jpg")
+    retention.add("a", [oldest])
+    newer = _write(tmp_path, "mission-2", "b.jpg")
+    retention.add("b", [newer])
+    retention.touch(oldest)
+    for name in ("a", "b", "c"):
+        retention.mark_uploaded(name)
+    newest = _write(tmp_path, "mission-3", "c.jpg")
+    retention.add("c", [newest])
+
+    assert oldest.exists()
+    assert not newer.exists()
+    assert newest.exists()
+    assert retention.usage_bytes == 200
+    assert retention.usage_per_mission_folder() == {"mission-1": 100, "mission-3": 100}
+
+
+def test_results_which_are_not_uploaded_are_never_evicted(
+    retention: LocalStorageRetention, tmp_path: Path
+) -> None:
+    for name in ("a", "b", "c"):
+        retention.add(name, [_write(tmp_path, "mission-1", f"{name}.jpg")])
+
+    assert retention.usage_bytes == 300
+
+    retention.mark_uploaded("a")
+    retention.enforce()
+
+    assert not (tmp_path / "mission-1" / "a.jpg").exists()
+    assert retention.usage_bytes == 200
+
+
+def test_whole_inspections_are_evicted(
+    retention: LocalStorageRetention, tmp_path: Path
+) -> None:
+    paths = [_write(tmp_path, "mission-1", name) for name in ("a.jpg", "a.json")]
+    retention.add("a", paths)
+    retention.add("b", [_write(tmp_path, "mission-1", "b.jpg")])
+    retention.mark_uploaded("a")
+
+    retention.enforce()
+
+    assert not any(path.exists() for path in paths)
+    assert retention.usage_bytes == 100
+
+
+def test_results_found_at_startup_are_evicted_only_if_uploaded(
+    tmp_path: Path, mocker: MockerFixture
+) -> None:
+    mocker.patch.object(settings, "LOCAL_STORAGE_PATH", str(tmp_path))
+    mocker.patch.object(settings, "LOCAL_STORAGE_QUOTA", 0)
+    uploaded = [_write(tmp_path, "mission-1", name) for name in ("a.jpg.zst", "a.json")]
+    pending = [_write(tmp_path, "mission-1", name) for name in ("b.jpg", "b.json")]
+    retention = LocalStorageRetention()
+    retention.add("a", uploaded)
+    retention.mark_uploaded("a")
+    assert retention.usage_bytes == 400
+
+    mocker.patch.object(settings, "LOCAL_STORAGE_QUOTA", 1)
+    restarted = LocalStorageRetention()
+    restarted.enforce()
+
+    assert not any(path.exists() for path in uploaded)
+    assert all(path.exists() for path in pending)
@@ -0,0 +1,98 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from isar.config.settings import settings
+from isar.storage.local_storage import DirectorySyncer, LocalStorage
+from isar.storage.storage_interface import StorageException
+from robot_interface.models.inspection.inspection import Image
+from robot_interface.models.inspection.payload import (
+    DEFAULT_CHUNK_SIZE,
+    BytesPayload,
+    ChunkIteratorPayload,
+    FilePayload,
+    InspectionPayload,
+)
+from robot_interface.models.mission.mission import Mission
+from tests.test_mocks.inspection import stub_image_metadata
+
+DATA = b"Some binary image data" * 1000
+
+
+@pytest.fixture()
+def local_storage(tmp_path: Path, mocker: MockerFixture) -> LocalStorage:
+    mocker.patch.object(settings, "LOCAL_STORAGE_PATH", str(tmp_path / "results"))
+    return LocalStorage()
+
+
+def _store(local_storage: LocalStorage, data: bytes | InspectionPayload) -> Path:
+    inspection = Image(id="image-1", metadata=stub_image_metadata(), data=data)
+    paths = local_storage.store(inspection, Mission(id="id", name="m", tasks=[]))
+    return paths.data_path.file_path
+
+
+def test_store_bytes(local_storage: LocalStorage) -> None:
+    assert _store(local_storage, DATA).read_bytes() == DATA
+
+
+def test_store_streams_file_payload(
+    local_storage: LocalStorage, tmp_path: Path
+) -> None:
+    source = tmp_path / "recording.jpg"
+    source.write_bytes(DATA)
+
+    assert _store(local_storage, FilePayload(source)).read_bytes() == DATA
+
+
+def test_chunk_iterator_payload_can_be_stored_more_than_once(
+    local_storage: LocalStorage,
+) -> None:
+    payload = ChunkIteratorPayload(DATA[i : i + 100] for i in range(0, len(DATA), 100))
+
+    assert _store(local_storage, payload).read_bytes() == DATA
+    assert _store(local_storage, payload).read_bytes() == DATA
+
+
+def test_store_without_data_raises(local_storage: LocalStorage) -> None:
+    inspection = Image(id="image-1", metadata=stub_image_metadata())
+
+    with pytest.raises(StorageException):
+        local_storage.store(inspection, Mission(id="id", name="m", tasks=[]))
+
+
+def test_store_leaves_no_partial_files(local_storage: LocalStorage) -> None:
+    data_path = _store(local_storage, DATA)
+
+    assert sorted(path.suffix for path in data_path.parent.iterdir()) == [
+        ".jpg",
+        ".json",
+    ]
+
+
+class _InterruptedPayload(BytesPayload):
+    def iter_chunks(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        yield self.data
+        raise OSError("Disk disconnected")
+
+
+def test_interrupted_write_does_not_leave_result(local_storage: LocalStorage) -> None:
+    with pytest.raises(StorageException):
+        _store(local_storage, _InterruptedPayload(DATA))
+
+    assert list(local_storage.root_folder.rglob("*.*")) == []
+
+
+def test_directory_syncs_are_batched_per_folder(
+    tmp_path: Path, mocker: MockerFixture
+) -> None:
+    syncer = DirectorySyncer(interval=60)
+    fsync_directory = mocker.patch.object(syncer, "_fsync_directory")
+
+    for _ in range(10):
+        syncer.sync(tmp_path / "mission-1")
+    syncer.sync(tmp_path / "mission-2")
+    syncer.flush()
+
+    assert fsync_directory.call_count == 2
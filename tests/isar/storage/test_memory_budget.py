@@ -0,0 +1,188 @@
+import logging
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from isar.config.settings import settings
+from isar.robot.robot_inspection_service import fetch_and_upload_inspection
+from isar.storage.memory_budget import InspectionMemoryBudget
+from isar.storage.uploader import Uploader
+from robot_interface.models.inspection.inspection import Image, InspectionBlob
+from robot_interface.models.inspection.payload import BytesPayload, FilePayload
+from robot_interface.models.mission.mission import Mission
+from robot_interface.models.mission.task import InspectionTask
+from tests.test_mocks.inspection import stub_image_metadata
+from tests.test_mocks.task import StubTask
+
+DATA = b"0123456789" * 10
+
+
+@pytest.fixture()
+def memory_budget(tmp_path: Path, mocker: MockerFixture) -> InspectionMemoryBudget:
+    mocker.patch.object(settings, "INSPECTION_MEMORY_BUDGET", 150)
+    mocker.patch.object(settings, "INSPECTION_MEMORY_BUDGET_WAIT", 0.01)
+    mocker.patch.object(settings, "INSPECTION_SPILL_PATH", str(tmp_path / "spill"))
+    return InspectionMemoryBudget()
+
+
+def _image(inspection_id: str) -> Image:
+    return Image(id=inspection_id, metadata=stub_image_metadata(), data=DATA)
+
+
+def test_inspection_within_budget_is_kept_in_memory(
+    memory_budget: InspectionMemoryBudget,
+) -> None:
+    inspection = _image("first")
+
+    assert memory_budget.reserve(inspection) is inspection
+    assert memory_budget.in_flight_bytes == len(DATA)
+
+    memory_budget.release(inspection.id)
+    assert memory_budget.in_flight_bytes == 0
+
+
+def test_inspection_exceeding_budget_is_spilled_to_disk(
+    memory_budget: InspectionMemoryBudget,
+) -> None:
+    memory_budget.reserve(_image("first"))
+
+    spilled: InspectionBlob = memory_budget.reserve(_image("second"))
+
+    payload = spilled.get_payload()
+    assert isinstance(payload, FilePayload)
+    assert payload.read_bytes() == DATA
+    assert memory_budget.in_flight_bytes == len(DATA)
+    assert memory_budget.spilled_bytes == len(DATA)
+
+    memory_budget.release(spilled.id)
+    assert not payload.path.exists()
+    assert memory_budget.spilled_bytes == 0
+
+
+def test_compressed_copy_replaces_the_reservation_of_the_inspection(
+    memory_budget: InspectionMemoryBudget,
+) -> None:
+    inspection = _image("first")
+    memory_budget.reserve(inspection)
+    compressed = inspection.model_copy(
+        update={"data": BytesPayload(DATA[:10], content_encoding="gzip")}
+    )
+
+    assert memory_budget.replace(inspection, compressed) is compressed
+    assert memory_budget.in_flight_bytes == 10
+
+    memory_budget.release(inspection.id)
+    assert memory_budget.in_flight_bytes == 0
+
+
+def test_compressed_copy_of_spilled_inspection_is_spilled_next_to_it(
+    memory_budget: InspectionMemoryBudget,
+) -> None:
+    memory_budget.reserve(_image("first"))
+    spilled: InspectionBlob = memory_budget.reserve(_image("second"))
+    compressed = spilled.model_copy(
+        update={"data": BytesPayload(DATA, content_encoding="gzip")}
+    )
+
+    replacement: InspectionBlob = memory_budget.replace(spilled, compressed)
+
+    payload = replacement.get_payload()
+    assert isinstance(payload, FilePayload)
+    assert payload.path.name.endswith(".gzip")
+    assert memory_budget.spilled_bytes == 2 * len(DATA)
+
+    memory_budget.release(spilled.id)
+    assert not payload.path.exists()
+    assert memory_budget.spilled_bytes == 0
+
+
+def test_uploader_releases_budget_when_upload_is_done(uploader: Uploader) -> None:
+    inspection = _image("uploaded")
+
+    uploader.upload_inspection(inspection, Mission(id="id", name="m"))
+
+    assert uploader.memory_budget.in_flight_bytes == 0
+
+
+def test_fetch_is_reserved_before_the_inspection_is_fetched(
+    memory_budget: InspectionMemoryBudget,
+) -> None:
+    # The first fetch is estimated at one chunk, limited to the budget
+    fetch_reservation = memory_budget.reserve_fetch()
+    assert memory_budget.in_flight_bytes == fetch_reservation == 150
+
+    memory_budget.reserve(_image("first"), fetch_reservation)
+    assert memory_budget.in_flight_bytes == len(DATA)
+
+    # Later fetches are estimated from the size of the previous inspection
+    assert memory_budget.reserve_fetch() == len(DATA)
+
+
+def test_fetch_estimate_ignores_inspections_on_disk(
+    memory_budget: InspectionMemoryBudget, tmp_path: Path
+) -> None:
+    memory_budget.reserve(_image("first"), memory_budget.reserve_fetch())
+    memory_budget.release("first")
+    path = tmp_path / "video.mp4"
+    path.write_bytes(DATA)
+    on_disk = Image(id="second", metadata=stub_image_metadata(), data=FilePayload(path))
+
+    memory_budget.reserve(on_disk, memory_budget.reserve_fetch())
+
+    assert memory_budget.reserve_fetch() == len(DATA)
+
+
+def test_fetch_reservation_is_released_when_the_robot_raises(
+    memory_budget: InspectionMemoryBudget, mocker: MockerFixture
+) -> None:
+    upload_function = mocker.Mock()
+
+    def get_inspection(task: InspectionTask) -> Image:
+        raise ValueError("Unexpected error in the robot package")
+
+    with pytest.raises(ValueError):
+        fetch_and_upload_inspection(
+            get_inspection,
+            logging.getLogger("uploader"),
+            upload_function,
+            StubTask.take_image(),
+            Mission(id="id", name="m"),
+            memory_budget,
+        )
+
+    assert memory_budget.in_flight_bytes == 0
+    upload_function.assert_not_called()
+
+
+def test_fetch_reservation_is_handed_to_the_upload(
+    memory_budget: InspectionMemoryBudget, mocker: MockerFixture
+) -> None:
+    upload_function = mocker.Mock()
+    task = StubTask.take_image()
+
+    fetch_and_upload_inspection(
+        lambda _: _image(task.id),
+        logging.getLogger("uploader"),
+        upload_function,
+        task,
+        Mission(id="id", name="m"),
+        memory_budget,
+    )
+
+    assert memory_budget.in_flight_bytes == 150
+    assert upload_function.call_args.args[3] == 150
+
+
+def test_uploading_an_inspection_again_keeps_its_reservation(
+    uploader: Uploader, mocker: MockerFixture
+) -> None:
+    release = mocker.spy(uploader.memory_budget, "release")
+    inspection = _image("uploaded")
+    mission = Mission(id="id", name="m")
+    uploader._remaining_storage_handlers[inspection.id] = 1
+
+    uploader.upload_inspection(inspection, mission)
+
+    assert uploader._remaining_storage_handlers[inspection.id] == 1
+    release.assert_not_called()
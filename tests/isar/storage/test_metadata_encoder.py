@@ -0,0 +1,131 @@
+import json
+from datetime import UTC, datetime
+
+import pytest
+
+from isar.storage.metadata_encoder import MetadataEncoder
+from robot_interface.models.inspection.inspection import (
+    AcousticMeasurement,
+    Image,
+    Inspection,
+)
+from robot_interface.models.inspection.payload import BytesPayload
+from robot_interface.models.mission.mission import Mission
+from tests.test_mocks.inspection import (
+    stub_acoustic_measurement_metadata,
+    stub_image_metadata,
+)
+
+MISSION = Mission(id="mission-1", name="Weekly round", tasks=[])
+
+
+def _inspections() -> list[Inspection]:
+    image_metadata = stub_image_metadata(analysis_types=["Fencilla"])
+    image_metadata.tag_id = "313-PA-101A"
+    image_metadata.inspection_description = 'Pumpelager "nord" – æøå'
+    return [
+        Image(id="image-1", metadata=image_metadata),
+        AcousticMeasurement(
+            id="acoustic-1", metadata=stub_acoustic_measurement_metadata()
+        ),
+    ]
+
+
+@pytest.mark.parametrize("inspection", _inspections())
+def test_indented_output_is_indented_by_four_spaces(inspection: Inspection) -> None:
+    encoder = MetadataEncoder(compact=False)
+
+    raw = encoder.encode(inspection, MISSION, "f.jpg")
+
+    assert raw == json.dumps(json.loads(raw), indent=4).encode()
+    assert raw.startswith(b'{\n    "installation_code": ')
+
+
+@pytest.mark.parametrize("inspection", _inspections())
+def test_compact_output_has_the_same_content(inspection: Inspection) -> None:
+    indented = MetadataEncoder(compact=False).encode(inspection, MISSION, "f.jpg")
+
+    raw = MetadataEncoder(compact=True).encode(inspection, MISSION, "f.jpg")
+
+    assert b"\n" not in raw
+    assert json.loads(raw) == json.loads(indented)
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_content_encoding_is_spliced_into_the_data_file(compact: bool) -> None:
+    inspection = Image(
+        id="image-1",
+        metadata=stub_image_metadata(),
+        data=BytesPayload(b"compressed", content_encoding="gzip"),
+    )
+
+    raw = MetadataEncoder(compact=compact).encode(inspection, MISSION, "f.jpg")
+
+    data_file = json.loads(raw)["data_files"][0]
+    assert data_file["file_name"] == "f.jpg"
+    assert data_file["content_encoding"] == "gzip"
+    if not compact:
+        assert raw == json.dumps(json.loads(raw), indent=4).encode()
+
+
+def test_timestamps_are_formatted_without_offset() -> None:
+    inspection = _inspections()[0]
+    inspection.metadata.start_time = datetime(2026, 1, 2, 3, 4, 5, 6, tzinfo=UTC)
+
+    data = json.loads(MetadataEncoder().encode(inspection, MISSION, "f.jpg"))
+
+    assert data["additional_meta"]["timestamp"] == "2026-01-02T03:04:05.000006"
+
+
+def test_mission_fields_follow_the_mission() -> None:
+    encoder = MetadataEncoder()
+    inspection = _inspections()[0]
+    other_mission = Mission(id="mission-2", name="Other round", tasks=[])
+
+    encoder.encode(inspection, MISSION, "f.jpg")
+    data = json.loads(encoder.encode(inspection, other_mission, "f.jpg"))
+
+    assert data["additional_meta"]["mission_id"] == "mission-2"
+    assert data["additional_meta"]["mission_name"] == "Other round"
+
+
+def test_mission_date_is_the_mission_start() -> None:
+    mission = Mission(
+        id="id",
+        name="Inspect pumps",
+        tasks=[],
+        start_time=datetime(2026, 1, 2, 23, 59, tzinfo=UTC),
+    )
+
+    data = json.loads(MetadataEncoder().encode(_inspections()[0], mission, "f"))
+
+    assert data["additional_meta"]["mission_date"] == "2026-01-02T00:00:00.000000"
+    assert data["data_files"][0]["folder"].startswith("/2026-01-02__")
+
+
+def test_acoustic_measurement_includes_result_block() -> None:
+    inspection = AcousticMeasurement(
+        id="acoustic-1", metadata=stub_acoustic_measurement_metadata()
+    )
+
+    data = json.loads(MetadataEncoder().encode(inspection, MISSION, "f"))
+
+    assert data["additional_meta"]["acoustic_result"] == {
+        "snr_value": 87.5,
+        "leak_rate": 0.55,
+        "leak_rate_unit": "l/min",
+        "sound_pressure_level_at_sensor_db": 0.0,
+        "sound_pressure_level_at_source_db": 36.7,
+        "distance_to_source": 0.3,
+        "result": "RI_ANOMALY",
+        "frequency_from": 35000.0,
+        "frequency_to": 40000.0,
+    }
+
+
+def test_image_excludes_acoustic_result() -> None:
+    inspection = Image(id="image-1", metadata=stub_image_metadata())
+
+    data = json.loads(MetadataEncoder().encode(inspection, MISSION, "f"))
+
+    assert "acoustic_result" not in data["additional_meta"]
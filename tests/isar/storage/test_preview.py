@@ -0,0 +1,137 @@
+import json
+import threading
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from isar.config.settings import settings
+from isar.storage.blob_replicator import BlobReplicator
+from isar.storage.blob_storage import BlobStorage
+from isar.storage.local_storage import LocalStorage
+from isar.storage.memory_budget import InspectionMemoryBudget
+from isar.storage.preview import PREVIEW_FILE_TYPE, InspectionPreview, PreviewGenerator
+from isar.storage.retry_scheduler import UploadRetryScheduler
+from isar.storage.storage_interface import BlobStoragePath
+from isar.storage.uploader import Uploader
+from robot_interface.models.inspection.inspection import Image, InspectionBlob
+from robot_interface.models.mission.mission import Mission
+from tests.test_mocks.blob_storage import StorageFake
+from tests.test_mocks.inspection import stub_image_metadata
+from tests.test_mocks.mqtt_client import MqttPublisherFake
+from tests.wait import wait_until
+
+PillowImage = pytest.importorskip("PIL.Image")
+
+
+def _png(width: int, height: int) -> bytes:
+    output = BytesIO()
+    PillowImage.new("RGB", (width, height), color=(200, 40, 40)).save(
+        output, format="PNG"
+    )
+    return output.getvalue()
+
+
+@pytest.fixture()
+def preview_generator(mocker: MockerFixture) -> PreviewGenerator:
+    mocker.patch.object(settings, "UPLOAD_PREVIEW_MAX_SIZE", 64)
+    return PreviewGenerator()
+
+
+def test_preview_is_downscaled_jpeg(preview_generator: PreviewGenerator) -> None:
+    inspection = Image(
+        id="image-1", metadata=stub_image_metadata(), data=_png(400, 200)
+    )
+
+    preview = preview_generator.create(inspection)
+
+    assert preview is not None
+    assert preview.id == inspection.id
+    assert preview.metadata.file_type == PREVIEW_FILE_TYPE
+    with PillowImage.open(BytesIO(preview.get_payload().read_bytes())) as image:
+        assert image.format == "JPEG"
+        assert image.size == (64, 32)
+
+
+def test_no_preview_of_other_inspections(preview_generator: PreviewGenerator) -> None:
+    inspection = InspectionBlob(
+        id="blob-1", metadata=stub_image_metadata(), data=_png(400, 200)
+    )
+
+    assert preview_generator.create(inspection) is None
+
+
+def test_no_preview_of_undecodable_images(
+    preview_generator: PreviewGenerator,
+) -> None:
+    inspection = Image(id="image-1", metadata=stub_image_metadata(), data=b"no image")
+
+    assert preview_generator.create(inspection) is None
+
+
+def test_preview_is_published_before_the_inspection(
+    uploader: Uploader, preview_generator: PreviewGenerator, mocker: MockerFixture
+) -> None:
+    preview_storage = mocker.MagicMock(spec=BlobStorage)
+    preview_storage.store_preview.return_value = BlobStoragePath(
+        storage_account="acct", blob_container="cont", blob_name="preview"
+    )
+    mqtt_fake = MqttPublisherFake()
+    uploader.preview_generator = preview_generator
+    uploader.preview_storage = preview_storage
+    uploader.mqtt_publisher = mqtt_fake
+    inspection = Image(
+        id="image-1", metadata=stub_image_metadata(), data=_png(400, 200)
+    )
+
+    uploader.upload_inspection(inspection, Mission(id="id", name="m"))
+
+    preview_storage.store.assert_not_called()
+    assert preview_storage.store_preview.call_args.kwargs["preview"].id == "image-1"
+    assert [message["topic"] for message in mqtt_fake.published] == [
+        settings.TOPIC_ISAR_INSPECTION_PREVIEW,
+        settings.TOPIC_ISAR_INSPECTION_RESULT,
+    ]
+    preview_message = json.loads(mqtt_fake.published[0]["payload"])
+    assert preview_message["inspection_id"] == "image-1"
+    assert preview_message["inspection_type"] == "Image"
+
+
+def test_preview_is_uploaded_by_the_replicator_in_tiered_storage(
+    preview_generator: PreviewGenerator, tmp_path: Path, mocker: MockerFixture
+) -> None:
+    mocker.patch.object(settings, "LOCAL_STORAGE_PATH", str(tmp_path / "results"))
+    upload_threads: list[str] = []
+
+    def store_preview(preview: InspectionPreview, mission: Mission) -> BlobStoragePath:
+        upload_threads.append(threading.current_thread().name)
+        return BlobStoragePath(
+            storage_account="acct", blob_container="cont", blob_name="preview"
+        )
+
+    preview_storage = mocker.MagicMock(spec=BlobStorage)
+    preview_storage.store_preview.side_effect = store_preview
+    mqtt_fake = MqttPublisherFake()
+    retry_scheduler = UploadRetryScheduler()
+    uploader = Uploader(
+        storage_handlers=[LocalStorage()],
+        mqtt_publisher=mqtt_fake,
+        retry_scheduler=retry_scheduler,
+        memory_budget=InspectionMemoryBudget(),
+        blob_replicator=BlobReplicator(StorageFake(), retry_scheduler),
+        preview_generator=preview_generator,
+        preview_storage=preview_storage,
+    )
+    inspection = Image(
+        id="image-1", metadata=stub_image_metadata(), data=_png(400, 200)
+    )
+
+    uploader.upload_inspection(inspection, Mission(id="id", name="m"))
+
+    wait_until(lambda: mqtt_fake.count() == 2)
+    assert upload_threads == ["ISAR Blob Replicator"]
+    assert [message["topic"] for message in mqtt_fake.published] == [
+        settings.TOPIC_ISAR_INSPECTION_PREVIEW,
+        settings.TOPIC_ISAR_INSPECTION_RESULT,
+    ]
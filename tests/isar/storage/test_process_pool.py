@@ -0,0 +1,67 @@
+import gc
+import gzip
+import hashlib
+from collections.abc import Iterator
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+
+import pytest
+
+from isar.storage.compression import compress_bytes
+from isar.storage.process_pool import InspectionProcessPool, SharedMemoryPayload
+from isar.storage.utilities import compute_md5
+from robot_interface.models.inspection.payload import BytesPayload, FilePayload
+
+DATA = b"Some binary video data" * 100000
+
+
+@pytest.fixture(scope="module")
+def process_pool() -> Iterator[InspectionProcessPool]:
+    process_pool = InspectionProcessPool()
+    yield process_pool
+    process_pool._get_executor().shutdown()
+
+
+def test_hashes_payload_in_worker(process_pool: InspectionProcessPool) -> None:
+    md5 = process_pool.process(compute_md5, BytesPayload(DATA))
+
+    assert md5 == hashlib.md5(DATA).digest()
+
+
+def test_file_payload_is_read_by_the_worker(
+    process_pool: InspectionProcessPool, tmp_path: Path
+) -> None:
+    path = tmp_path / "video.mp4"
+    path.write_bytes(DATA)
+
+    md5 = process_pool.process(compute_md5, FilePayload(path))
+
+    assert md5 == hashlib.md5(DATA).digest()
+
+
+def test_transformed_payload_is_returned_in_shared_memory(
+    process_pool: InspectionProcessPool,
+) -> None:
+    payload = process_pool.transform(
+        compress_bytes, BytesPayload(DATA), "gzip", content_encoding="gzip"
+    )
+
+    assert isinstance(payload, SharedMemoryPayload)
+    assert payload.content_encoding == "gzip"
+    assert gzip.decompress(payload.read_bytes()) == DATA
+    with payload.memoryview() as view:
+        assert gzip.decompress(view) == DATA
+
+
+def test_shared_memory_is_unlinked_with_the_payload(
+    process_pool: InspectionProcessPool,
+) -> None:
+    payload = process_pool.transform(compress_bytes, BytesPayload(DATA), "gzip")
+    assert isinstance(payload, SharedMemoryPayload)
+    name: str = payload.name
+
+    del payload
+    gc.collect()
+
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=name)
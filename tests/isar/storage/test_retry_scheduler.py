@@ -0,0 +1,42 @@
+from threading import Event
+
+from pytest_mock import MockerFixture
+
+from isar.config.settings import settings
+from isar.storage.retry_scheduler import UploadRetryScheduler, retry_delay
+from tests.wait import wait_until
+
+
+def test_retry_delay_is_jittered_and_capped(mocker: MockerFixture) -> None:
+    mocker.patch.object(settings, "UPLOAD_FAILURE_MAX_WAIT", 10)
+
+    for attempt in range(1, 10):
+        ceiling = min(2**attempt, 10)
+        assert ceiling / 2 <= retry_delay(attempt) <= ceiling
+
+
+def test_scheduled_job_runs_when_due() -> None:
+    scheduler = UploadRetryScheduler()
+    ran = Event()
+
+    scheduler.schedule("endpoint", 0.01, ran.set)
+
+    assert ran.wait(timeout=5)
+    wait_until(lambda: scheduler.pending() == 0)
+
+
+def test_paused_endpoint_holds_back_retries_until_resumed() -> None:
+    scheduler = UploadRetryScheduler()
+    paused_job_ran = Event()
+    other_job_ran = Event()
+
+    scheduler.pause("down", 60)
+    scheduler.schedule("down", 0, paused_job_ran.set)
+    scheduler.schedule("up", 0, other_job_ran.set)
+
+    assert other_job_ran.wait(timeout=5)
+    assert not paused_job_ran.is_set()
+    assert scheduler.pending() == 1
+
+    scheduler.resume("down")
+    assert paused_job_ran.wait(timeout=5)
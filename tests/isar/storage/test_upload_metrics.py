@@ -0,0 +1,77 @@
+import time
+
+from pytest_mock import MockerFixture
+
+from isar.apis.models.models import UploadHandlerStatusResponse
+from isar.config.settings import settings
+from isar.storage.upload_metrics import UploadMetrics
+from isar.storage.uploader import Uploader
+from robot_interface.models.inspection.inspection import Image
+from robot_interface.models.mission.mission import Mission
+from tests.test_mocks.blob_storage import StorageFake
+from tests.test_mocks.inspection import stub_image_metadata
+from tests.wait import wait_until
+
+DATA = b"0123456789" * 10
+
+
+def _handler_status(
+    metrics: UploadMetrics, handler: str
+) -> UploadHandlerStatusResponse:
+    return next(status for status in metrics.status() if status.handler == handler)
+
+
+def test_pending_uploads_are_summarized_per_handler() -> None:
+    metrics = UploadMetrics()
+    metrics.queued("BlobStorage", "first", 100, completed_at=time.monotonic() - 5)
+    metrics.queued("BlobStorage", "second", 50)
+    metrics.queued("LocalStorage", "first", 100)
+
+    metrics.committed("LocalStorage", "first", duration=0.5)
+
+    blob_storage = _handler_status(metrics, "BlobStorage")
+    assert blob_storage.pending_inspections == 2
+    assert blob_storage.pending_bytes == 150
+    assert blob_storage.oldest_pending_seconds is not None
+    assert blob_storage.oldest_pending_seconds >= 5
+
+    local_storage = _handler_status(metrics, "LocalStorage")
+    assert local_storage.pending_inspections == 0
+    assert local_storage.uploaded == 1
+    assert local_storage.throughput_bytes_per_second == 200
+
+
+def test_uploader_records_retries_and_commits(
+    uploader: Uploader, mocker: MockerFixture
+) -> None:
+    mocker.patch.object(settings, "UPLOAD_FAILURE_MAX_WAIT", 0.0001)
+    mocker.patch.object(settings, "UPLOAD_FAILURE_ATTEMPTS_LIMIT", 4)
+    storage_handler: StorageFake = uploader.storage_handlers[0]  # type: ignore
+    storage_handler.failure_count = 3
+    assert uploader.metrics is not None
+
+    inspection = Image(id="image-1", metadata=stub_image_metadata(), data=DATA)
+    uploader.upload_inspection(inspection, Mission(id="id", name="m"))
+
+    wait_until(lambda: storage_handler.blob_exists(inspection))
+    wait_until(lambda: _handler_status(uploader.metrics, "StorageFake").uploaded == 1)
+    status = _handler_status(uploader.metrics, "StorageFake")
+    assert status.retries == 2
+    assert status.failures == 0
+    assert status.pending_inspections == 0
+
+
+def test_uploader_records_abandoned_uploads(
+    uploader: Uploader, mocker: MockerFixture
+) -> None:
+    mocker.patch.object(settings, "UPLOAD_FAILURE_MAX_WAIT", 0.0001)
+    mocker.patch.object(settings, "UPLOAD_FAILURE_ATTEMPTS_LIMIT", 2)
+    storage_handler: StorageFake = uploader.storage_handlers[0]  # type: ignore
+    storage_handler.failure_count = 5
+    assert uploader.metrics is not None
+
+    inspection = Image(id="image-1", metadata=stub_image_metadata(), data=DATA)
+    uploader.upload_inspection(inspection, Mission(id="id", name="m"))
+
+    wait_until(lambda: _handler_status(uploader.metrics, "StorageFake").failures == 1)
+    assert _handler_status(uploader.metrics, "StorageFake").pending_inspections == 0
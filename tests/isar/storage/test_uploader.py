@@ -7,11 +7,13 @@ from pytest_mock import MockerFixture
 from isar.config.settings import settings
 from isar.storage.uploader import Uploader
 from robot_interface.models.inspection.inspection import Inspection, InspectionBlob
+from robot_interface.models.inspection.payload import ChunkIteratorPayload
 from robot_interface.models.mission.mission import Mission
 from robot_interface.models.mission.task import TakeImage
 from tests.test_mocks.blob_storage import StorageEmptyBlobPathsFake, StorageFake
 from tests.test_mocks.inspection import stub_image_metadata
 from tests.test_mocks.mqtt_client import MqttPublisherFake
+from tests.wait import wait_until
 
 MISSION_ID = "some-mission-id"
 
@@ -58,7 +60,7 @@ def test_should_retry_failed_upload_from_queue(
     storage_handler.failure_count = 3
     uploader.upload_inspection(inspection, mission)
 
-    assert storage_handler.blob_exists(inspection)
+    wait_until(lambda: storage_handler.blob_exists(inspection))
 
 
 def test_should_eventually_give_up_failed_upload_from_queue(
@@ -75,9 +77,49 @@ def test_should_eventually_give_up_failed_upload_from_queue(
     storage_handler.failure_count = 5
     uploader.upload_inspection(inspection, mission)
 
+    wait_until(lambda: storage_handler.failure_count == 2)
+    assert uploader.retry_scheduler.pending() == 0
     assert not storage_handler.blob_exists(inspection)
 
 
+def test_failed_upload_does_not_block_caller(
+    uploader: Uploader, mocker: MockerFixture
+) -> None:
+    mocker.patch.object(settings, "UPLOAD_FAILURE_MAX_WAIT", 60)
+    inspection = InspectionBlob(metadata=stub_image_metadata(), id="123-456")
+    mission: Mission = Mission(id="id", name="Dummy Mission")
+
+    storage_handler: StorageFake = uploader.storage_handlers[0]  # type: ignore
+
+    storage_handler.failure_count = 2
+    uploader.upload_inspection(inspection, mission)
+
+    assert uploader.retry_scheduler.pending() == 1
+    assert uploader.retry_scheduler.is_paused("StorageFake")
+    assert not storage_handler.blob_exists(inspection)
+
+
+def test_closes_payload_once_every_storage_handler_is_done(
+    uploader: Uploader, mocker: MockerFixture
+) -> None:
+    mocker.patch.object(settings, "UPLOAD_FAILURE_MAX_WAIT", 0.0001)
+    payload = ChunkIteratorPayload([b"image data"])
+    close = mocker.spy(payload, "close")
+    inspection = InspectionBlob(
+        metadata=stub_image_metadata(), id="123-456", data=payload
+    )
+    mission: Mission = Mission(id="id", name="Dummy Mission")
+
+    storage_handler: StorageFake = uploader.storage_handlers[0]  # type: ignore
+
+    storage_handler.failure_count = 2
+    uploader.upload_inspection(inspection, mission)
+    close.assert_not_called()
+
+    wait_until(lambda: storage_handler.blob_exists(inspection))
+    wait_until(lambda: close.call_count == 1)
+
+
 def test_should_not_publish_when_blob_paths_are_empty(uploader: Uploader) -> None:
     mission: Mission = Mission(id="id", name="Dummy mission")
     inspection: Inspection = InspectionBlob(
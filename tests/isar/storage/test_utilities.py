@@ -1,47 +1,34 @@
-import json
+import hashlib
+from datetime import UTC, datetime
 
-from isar.storage.utilities import construct_metadata_file
-from robot_interface.models.inspection.inspection import AcousticMeasurement, Image
+from isar.storage.utilities import compute_content_md5, get_filename, get_foldername
+from robot_interface.models.inspection.inspection import Image
+from robot_interface.models.inspection.payload import BytesPayload
 from robot_interface.models.mission.mission import Mission
-from tests.test_mocks.inspection import (
-    stub_acoustic_measurement_metadata,
-    stub_image_metadata,
-)
+from tests.test_mocks.inspection import stub_image_metadata
 
 
-def test_construct_metadata_file_acoustic_includes_result_block() -> None:
-    inspection = AcousticMeasurement(
-        id="acoustic-1", metadata=stub_acoustic_measurement_metadata()
-    )
-
-    raw = construct_metadata_file(
-        inspection=inspection,
-        mission=Mission(id="id", name="m", tasks=[]),
-        filename="f",
-    )
-    data = json.loads(raw)
-
-    assert data["additional_meta"]["acoustic_result"] == {
-        "snr_value": 87.5,
-        "leak_rate": 0.55,
-        "leak_rate_unit": "l/min",
-        "sound_pressure_level_at_sensor_db": 0.0,
-        "sound_pressure_level_at_source_db": 36.7,
-        "distance_to_source": 0.3,
-        "result": "RI_ANOMALY",
-        "frequency_from": 35000.0,
-        "frequency_to": 40000.0,
-    }
-
-
-def test_construct_metadata_file_non_acoustic_excludes_acoustic_result() -> None:
+def test_get_filename_is_stable_for_the_same_inspection() -> None:
     inspection = Image(id="image-1", metadata=stub_image_metadata())
 
-    raw = construct_metadata_file(
-        inspection=inspection,
-        mission=Mission(id="id", name="m", tasks=[]),
-        filename="f",
+    assert get_filename(inspection) == get_filename(inspection)
+
+
+def test_get_foldername_is_dated_by_the_mission_start() -> None:
+    mission = Mission(
+        id="id",
+        name="Inspect pumps",
+        tasks=[],
+        start_time=datetime(2026, 1, 2, 23, 59, tzinfo=UTC),
     )
-    data = json.loads(raw)
 
-    assert "acoustic_result" not in data["additional_meta"]
+    assert get_foldername(mission).startswith("2026-01-02__")
+
+
+def test_compute_content_md5_matches_single_pass_digest() -> None:
+    data = bytes(range(256)) * 1000
+
+    assert (
+        compute_content_md5(BytesPayload(data), chunk_size=1000)
+        == hashlib.md5(data).digest()
+    )
@@ -0,0 +1,117 @@
+import json
+import time
+from queue import Queue
+from threading import Thread
+
+import pytest
+from pytest_mock import MockerFixture
+
+from isar.config.settings import settings
+from robot_interface.models.exceptions.robot_exceptions import RobotTelemetryException
+from robot_interface.telemetry.batching import TelemetryBatch
+from robot_interface.telemetry.mqtt_client import MqttTelemetryPublisher
+from robot_interface.telemetry.payload_encoder import PayloadEncoder
+from robot_interface.telemetry.payloads import TelemetryBatchPayload
+
+ENCODER = PayloadEncoder(isar_id="isar", robot_name="robot")
+
+
+def _sample(level: float) -> str:
+    return json.dumps(
+        {"isar_id": "isar", "robot_name": "robot", "timestamp": "t", "level": level}
+    )
+
+
+def test_batch_is_published_when_the_window_has_passed() -> None:
+    batch = TelemetryBatch(interval=0.1, window=0.3, max_latency=1.0)
+
+    for index in range(3):
+        batch.add(_sample(index), now=index * 0.1)
+        assert batch.take(ENCODER, now=index * 0.1) is None
+    batch.add(_sample(3), now=0.3)
+    payload = batch.take(ENCODER, now=0.3)
+
+    assert payload is not None
+    batch_payload = TelemetryBatchPayload.model_validate_json(payload)
+    assert batch_payload.isar_id == "isar"
+    assert batch_payload.samples == [
+        {"timestamp": "t", "level": float(index)} for index in range(4)
+    ]
+    assert batch.take(ENCODER, now=0.4) is None
+
+
+def test_batch_is_published_early_to_keep_to_the_max_latency() -> None:
+    batch = TelemetryBatch(interval=0.1, window=5.0, max_latency=0.25)
+
+    batch.add(_sample(0), now=0.0)
+    assert batch.take(ENCODER, now=0.1) is None
+    assert batch.take(ENCODER, now=0.2) is not None
+
+
+def test_samples_must_be_json_objects() -> None:
+    batch = TelemetryBatch(interval=0.1, window=0.3, max_latency=1.0)
+
+    with pytest.raises(TypeError):
+        batch.add("[1.0]")
+
+
+def test_infrequent_telemetry_is_published_one_sample_at_a_time() -> None:
+    batch = TelemetryBatch(interval=60.0, window=1.0, max_latency=2.0)
+
+    batch.add(_sample(0), now=0.0)
+    payload = batch.take(ENCODER, now=0.0)
+
+    assert payload is not None
+    assert len(json.loads(payload)["samples"]) == 1
+
+
+def test_telemetry_publisher_publishes_batches(mocker: MockerFixture) -> None:
+    mocker.patch.object(settings, "MQTT_TELEMETRY_BATCH_WINDOW", 0.05)
+    mocker.patch.object(settings, "MQTT_TELEMETRY_BATCH_MAX_LATENCY", 1.0)
+    queue: Queue = Queue()
+    publisher = MqttTelemetryPublisher(
+        mqtt_queue=queue,
+        telemetry_method=lambda isar_id, robot_name: _sample(1.0),
+        topic=f"isar/{settings.ISAR_ID}/pose",
+        interval=0.01,
+    )
+    Thread(
+        target=publisher.run, args=(settings.ISAR_ID, settings.ROBOT_NAME), daemon=True
+    ).start()
+
+    topic, payload, _, _, properties = queue.get(timeout=5)
+
+    assert topic == f"isar/{settings.ISAR_ID}/pose/batch"
+    assert len(json.loads(payload)["samples"]) > 1
+    assert properties.MessageExpiryInterval == settings.MQTT_TELEMETRY_EXPIRY
+
+
+def test_pending_batch_is_published_while_the_cloud_is_unhealthy(
+    mocker: MockerFixture,
+) -> None:
+    mocker.patch.object(settings, "MQTT_TELEMETRY_BATCH_WINDOW", 0.05)
+    mocker.patch.object(settings, "MQTT_TELEMETRY_BATCH_MAX_LATENCY", 1.0)
+    samples: list[str] = [_sample(1.0)]
+
+    def telemetry_method(isar_id: str, robot_name: str) -> str:
+        if not samples:
+            raise RobotTelemetryException("The cloud is unreachable")
+        return samples.pop()
+
+    queue: Queue = Queue()
+    publisher = MqttTelemetryPublisher(
+        mqtt_queue=queue,
+        telemetry_method=telemetry_method,
+        topic=f"isar/{settings.ISAR_ID}/pose",
+        interval=0.01,
+    )
+    publisher.setup(isar_id=settings.ISAR_ID, robot_name=settings.ROBOT_NAME)
+    publisher.publish_telemetry()
+    time.sleep(0.06)
+    publisher.publish_telemetry()
+
+    topics = [queue.get(block=False)[0] for _ in range(queue.qsize())]
+    assert topics == [
+        f"isar/{settings.ISAR_ID}/cloud_health",
+        f"isar/{settings.ISAR_ID}/pose/batch",
+    ]
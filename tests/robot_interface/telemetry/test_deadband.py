@@ -0,0 +1,70 @@
+import json
+import math
+
+import pytest
+from pytest_mock import MockerFixture
+
+from isar.config.settings import settings
+from robot_interface.telemetry.deadband import TelemetryDeadband
+
+
+def _pose(x: float, yaw: float = 0.0, timestamp: str = "now") -> str:
+    return json.dumps(
+        {
+            "isar_id": "isar",
+            "robot_name": "robot",
+            "timestamp": timestamp,
+            "pose": {
+                "position": {"x": x, "y": 0.0, "z": 0.0, "frame": {"name": "robot"}},
+                "orientation": {
+                    "x": 0.0,
+                    "y": 0.0,
+                    "z": math.sin(math.radians(yaw) / 2),
+                    "w": math.cos(math.radians(yaw) / 2),
+                    "frame": {"name": "robot"},
+                },
+                "frame": {"name": "robot"},
+            },
+        }
+    )
+
+
+def _battery(level: float, state: str | None = None) -> str:
+    return json.dumps(
+        {"timestamp": "now", "battery_level": level, "battery_state": state}
+    )
+
+
+@pytest.fixture(autouse=True)
+def deadbands(mocker: MockerFixture) -> None:
+    mocker.patch.object(settings, "MQTT_TELEMETRY_MAX_SILENCE", 10.0)
+    mocker.patch.object(settings, "MQTT_DEADBAND_POSITION", 0.05)
+    mocker.patch.object(settings, "MQTT_DEADBAND_ORIENTATION", 2.0)
+    mocker.patch.object(settings, "MQTT_DEADBAND_BATTERY", 1.0)
+
+
+def test_pose_is_published_once_moved_beyond_the_deadband() -> None:
+    deadband = TelemetryDeadband()
+
+    assert deadband.should_publish(_pose(0.0), now=0)
+    assert not deadband.should_publish(_pose(0.01, timestamp="later"), now=1)
+    assert not deadband.should_publish(_pose(0.04, yaw=1.0), now=2)
+    assert deadband.should_publish(_pose(0.06), now=3)
+    assert deadband.should_publish(_pose(0.06, yaw=3.0), now=4)
+
+
+def test_battery_is_published_on_level_or_state_change() -> None:
+    deadband = TelemetryDeadband()
+
+    assert deadband.should_publish(_battery(80.0), now=0)
+    assert not deadband.should_publish(_battery(80.5), now=1)
+    assert deadband.should_publish(_battery(80.5, state="Charging"), now=2)
+    assert deadband.should_publish(_battery(78.0, state="Charging"), now=3)
+
+
+def test_unchanged_telemetry_is_published_after_max_silence() -> None:
+    deadband = TelemetryDeadband()
+
+    assert deadband.should_publish(_pose(0.0), now=0)
+    assert not deadband.should_publish(_pose(0.0), now=9.9)
+    assert deadband.should_publish(_pose(0.0), now=10)
@@ -0,0 +1,95 @@
+import json
+import math
+from queue import Queue
+from threading import Event, Thread
+
+import pytest
+from pytest_mock import MockerFixture
+
+from isar.config.settings import settings
+from robot_interface.telemetry import cbor
+from robot_interface.telemetry.mqtt_client import (
+    MqttTelemetryPublisher,
+    telemetry_content_type,
+)
+from robot_interface.telemetry.payload_encoder import decode_payload
+
+
+def _telemetry_publisher(queue: Queue, payload: str) -> MqttTelemetryPublisher:
+    published = Event()
+
+    def telemetry_method(isar_id: str, robot_name: str) -> str:
+        if published.is_set():
+            Event().wait()
+        published.set()
+        return payload
+
+    return MqttTelemetryPublisher(
+        mqtt_queue=queue,
+        telemetry_method=telemetry_method,
+        topic=f"isar/{settings.ISAR_ID}/pose",
+        interval=0.01,
+    )
+
+
+def test_cbor_round_trip_yields_the_same_document() -> None:
+    document = {
+        "isar_id": "isar",
+        "robot_name": "Ærfugl",
+        "timestamp": "2026-01-02T03:04:05.000678Z",
+        "pose": {"x": 1.0, "y": -2.5, "z": 0.1, "w": 1e300},
+        "levels": [0, 23, 24, 255, 65536, -1, -500, 2**40],
+        "battery_state": None,
+        "charging": True,
+    }
+
+    encoded = cbor.encode(document)
+
+    assert cbor.decode(encoded) == document
+    assert len(encoded) < len(json.dumps(document, separators=(",", ":")))
+    assert math.isnan(cbor.decode(cbor.encode(float("nan"))))
+    with pytest.raises(ValueError):
+        cbor.decode(encoded[:-1])
+
+
+def test_telemetry_is_published_as_json_by_default() -> None:
+    queue: Queue = Queue()
+    payload = json.dumps({"isar_id": "isar", "battery_level": 42.0})
+    Thread(
+        target=_telemetry_publisher(queue, payload).run,
+        args=(settings.ISAR_ID, settings.ROBOT_NAME),
+        daemon=True,
+    ).start()
+
+    _, published, _, _, properties = queue.get(timeout=5)
+
+    assert published == payload
+    assert not hasattr(properties, "ContentType")
+
+
+def test_telemetry_is_published_as_cbor_when_configured(mocker: MockerFixture) -> None:
+    mocker.patch.object(settings, "MQTT_TELEMETRY_ENCODING", {"pose": "cbor"})
+    queue: Queue = Queue()
+    payload = json.dumps({"isar_id": "isar", "pose": {"x": 1.5, "y": 0.0}})
+    Thread(
+        target=_telemetry_publisher(queue, payload).run,
+        args=(settings.ISAR_ID, settings.ROBOT_NAME),
+        daemon=True,
+    ).start()
+
+    _, published, _, _, properties = queue.get(timeout=5)
+
+    assert isinstance(published, bytes)
+    assert properties.ContentType == cbor.CONTENT_TYPE
+    assert properties.MessageExpiryInterval == settings.MQTT_TELEMETRY_EXPIRY
+    assert decode_payload(published, properties.ContentType) == json.loads(payload)
+
+
+def test_encoding_is_chosen_by_the_topic_class(mocker: MockerFixture) -> None:
+    mocker.patch.object(settings, "MQTT_TELEMETRY_ENCODING", {"pose": "cbor"})
+
+    assert telemetry_content_type(f"isar/{settings.ISAR_ID}/pose") == cbor.CONTENT_TYPE
+    assert telemetry_content_type(f"isar/{settings.ISAR_ID}/pose/arm") == (
+        cbor.CONTENT_TYPE
+    )
+    assert telemetry_content_type(f"isar/{settings.ISAR_ID}/arm/pose") is None
@@ -0,0 +1,83 @@
+import json
+import time
+from collections.abc import Callable, Iterator
+from itertools import pairwise
+from queue import Queue
+from threading import Thread
+
+import pytest
+
+from isar.config.settings import settings
+from robot_interface.telemetry.mqtt_client import MqttTelemetryPublisher
+from robot_interface.telemetry.scheduler import TelemetryScheduler, TelemetrySource
+from tests.wait import wait_until
+
+
+@pytest.fixture()
+def scheduler() -> Iterator[TelemetryScheduler]:
+    scheduler = TelemetryScheduler()
+    thread = Thread(target=scheduler.run, daemon=True)
+    thread.start()
+    yield scheduler
+    scheduler.stop()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+
+def _record(calls: list[float]) -> Callable[[], None]:
+    return lambda: calls.append(time.monotonic())
+
+
+def test_sources_are_called_at_their_intervals(scheduler: TelemetryScheduler) -> None:
+    calls: dict[str, list[float]] = {"fast": [], "slow": []}
+    for name, interval in (("fast", 0.02), ("slow", 0.1)):
+        scheduler.add(
+            TelemetrySource(name=name, interval=interval, publish=_record(calls[name]))
+        )
+
+    wait_until(lambda: len(calls["slow"]) >= 4)
+
+    # Both are called on adding, then once per interval aligned to the clock
+    aligned: list[float] = calls["slow"][1:]
+    assert 5 <= len(calls["fast"]) <= 25
+    assert all(second - first > 0.05 for first, second in pairwise(aligned))
+
+
+def test_failing_source_does_not_stop_the_others(scheduler: TelemetryScheduler) -> None:
+    calls: list[str] = []
+
+    def fail() -> None:
+        calls.append("failing")
+        raise RuntimeError("Robot unavailable")
+
+    scheduler.add(TelemetrySource(name="failing", interval=0.01, publish=fail))
+    scheduler.add(
+        TelemetrySource(
+            name="working", interval=0.01, publish=lambda: calls.append("working")
+        )
+    )
+
+    wait_until(lambda: calls.count("working") >= 3 and calls.count("failing") >= 3)
+
+
+def test_telemetry_publisher_runs_as_a_source(scheduler: TelemetryScheduler) -> None:
+    queue: Queue = Queue()
+    publisher = MqttTelemetryPublisher(
+        mqtt_queue=queue,
+        telemetry_method=lambda isar_id, robot_name: json.dumps({"level": 1.0}),
+        topic=f"isar/{settings.ISAR_ID}/battery",
+        interval=0.01,
+    )
+
+    scheduler.add(publisher.telemetry_source(settings.ISAR_ID, settings.ROBOT_NAME))
+
+    topic, payload, _, _, _ = queue.get(timeout=5)
+    assert topic == f"isar/{settings.ISAR_ID}/battery"
+    assert json.loads(payload) == {"level": 1.0}
+
+
+def test_source_must_have_a_positive_interval() -> None:
+    with pytest.raises(ValueError):
+        TelemetryScheduler().add(
+            TelemetrySource(name="source", interval=0, publish=lambda: None)
+        )
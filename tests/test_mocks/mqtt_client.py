@@ -12,7 +12,7 @@ class MqttPublisherFake(MqttClientInterface):
     def publish(
         self,
         topic: str,
-        payload: str,
+        payload: str | bytes,
         qos: int = 0,
         retain: bool = False,
         properties: Any | None = None,